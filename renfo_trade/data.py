@@ -0,0 +1,56 @@
+# data.py
+import os
+import sys
+import time
+
+# Paquet market_core du bot (../test): seul ce paquet y est importé, pas le `src` du bot
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test'))
+
+from market_core.ohlcv_cache import OHLCVDiskCache
+
+# Historique persistant des bougies, commun aux scripts d'entraînement et de test
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ohlcv')
+
+
+def fetch_all_ohlcv(exchange, symbol, timeframe, since=None, until=None, total_limit=5000, cache_dir=CACHE_DIR):
+    """
+    Bougies de [since, until[ (au plus total_limit), lues sur disque quand elles y sont
+
+    Seule la partie absente du cache est téléchargée, puis enregistrée pour
+    les exécutions suivantes. cache_dir=None désactive le cache.
+    """
+    cache = OHLCVDiskCache(cache_dir) if cache_dir else None
+    coverage = cache.coverage(symbol, timeframe, at=since) if cache and since is not None else None
+
+    cached = []
+    current_since = since
+    if coverage is not None:
+        current_since = coverage[1]
+        end = coverage[1] if until is None else min(until, coverage[1])
+        cached = [[int(row[0]), *row[1:]]
+                  for row in cache.read(symbol, timeframe, since=since, until=end, limit=total_limit).tolist()]
+
+    left = total_limit - len(cached)
+
+    # Téléchargement de ce qui manque (rien si le cache couvre déjà jusqu'à until)
+    all_ohlcv = []
+    while left > 0 and (until is None or current_since is None or current_since < until):
+        limit = min(1000, left)
+        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=current_since, limit=limit)
+        if not ohlcv:
+            break
+        if cache is not None and current_since is not None:
+            cache.append(symbol, timeframe, ohlcv, since=current_since)
+        # Si until est défini, on ne garde que les bougies avant until
+        if until is not None:
+            ohlcv = [row for row in ohlcv if row[0] < until]
+            if not ohlcv:
+                break
+        all_ohlcv += ohlcv
+        left -= len(ohlcv)
+        if len(ohlcv) < limit:
+            break
+        current_since = ohlcv[-1][0] + 1  # +1ms pour éviter doublon
+        time.sleep(0.2)
+
+    return cached + all_ohlcv
@@ -0,0 +1,33 @@
+# features.py
+import os
+import sys
+
+import pandas as pd
+import ta
+
+# Paquet market_core du bot (../test): seul ce paquet y est importé, pas le `src` du bot
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test'))
+
+from market_core.levels import rolling_extreme
+
+
+def add_features(df):
+    """Ajoute les features observées par TradingEnv puis retire les lignes incomplètes"""
+    df['SMA_10'] = df['Close'].rolling(10).mean()
+    df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+    df['EMA_20'] = df['Close'].ewm(span=20).mean()
+    df['MACD'] = ta.trend.MACD(df['Close']).macd()
+    bollinger = ta.volatility.BollingerBands(df['Close'])
+    df['BB_UPPER'] = bollinger.bollinger_hband()
+    df['BB_LOWER'] = bollinger.bollinger_lband()
+    df['VOLUME_NORM'] = df['Volume'] / df['Volume'].rolling(20).mean()  # volume normalisé
+    df['RETURNS'] = df['Close'].pct_change().fillna(0)  # returns instantanés
+    df['VOLATILITY'] = df['Close'].rolling(20).std() / df['Close'].rolling(20).mean()  # volatilité relative
+
+    # Plus haut / plus bas sur 20 bougies, mêmes extrêmes que le support/résistance de l'analyseur
+    highest = pd.Series(rolling_extreme(df['High'].to_numpy(), 20, 'max'), index=df.index)
+    lowest = pd.Series(rolling_extreme(df['Low'].to_numpy(), 20, 'min'), index=df.index)
+    df['DIST_HIGH'] = (df['Close'] - highest) / highest
+    df['DIST_LOW'] = (df['Close'] - lowest) / lowest
+
+    return df.dropna().reset_index(drop=True)
@@ -1,36 +1,14 @@
 import ccxt
 import pandas as pd
 from trading_env import TradingEnv
+from features import add_features
+from data import fetch_all_ohlcv
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 import matplotlib.pyplot as plt
 import csv
-import ta
-import time
 import datetime
 
-def fetch_all_ohlcv(exchange, symbol, timeframe, since=None, until=None, total_limit=5000):
-    all_ohlcv = []
-    left = total_limit
-    current_since = since
-    while left > 0:
-        limit = min(1000, left)
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=current_since, limit=limit)
-        if not ohlcv:
-            break
-        # Si until est défini, on ne garde que les bougies avant until
-        if until is not None:
-            ohlcv = [row for row in ohlcv if row[0] < until]
-            if not ohlcv:
-                break
-        all_ohlcv += ohlcv
-        left -= len(ohlcv)
-        if len(ohlcv) < limit:
-            break
-        current_since = ohlcv[-1][0] + 1  # +1ms pour éviter doublon
-        time.sleep(0.2)
-    return all_ohlcv
-
 # Exemple : récupérer du 1er janvier 2024 au 1er avril 2024
 start_date = "2025-01-01"
 end_date = "2025-04-01"
@@ -44,18 +22,7 @@ ohlcv = fetch_all_ohlcv(exchange, 'XRP/USDT', '1h', since=since, until=until, to
 df = pd.DataFrame(ohlcv, columns=['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
 df['Date'] = pd.to_datetime(df['Timestamp'], unit='ms')
 df = df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-df['SMA_10'] = df['Close'].rolling(10).mean()
-df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
-df['EMA_20'] = df['Close'].ewm(span=20).mean()
-df['MACD'] = ta.trend.MACD(df['Close']).macd()
-df['BB_UPPER'] = ta.volatility.BollingerBands(df['Close']).bollinger_hband()
-df['BB_LOWER'] = ta.volatility.BollingerBands(df['Close']).bollinger_lband()
-df['VOLUME_NORM'] = df['Volume'] / df['Volume'].rolling(20).mean()  # volume normalisé
-df['RETURNS'] = df['Close'].pct_change().fillna(0)  # returns instantanés
-df['VOLATILITY'] = df['Close'].rolling(20).std() / df['Close'].rolling(20).mean()  # volatilité relative
-df['DIST_HIGH'] = (df['Close'] - df['High'].rolling(20).max()) / df['High'].rolling(20).max()
-df['DIST_LOW'] = (df['Close'] - df['Low'].rolling(20).min()) / df['Low'].rolling(20).min()
-df = df.dropna().reset_index(drop=True)
+df = add_features(df)
 
 split_idx = int(len(df) * 0.8)
 df_train = df.iloc[:split_idx].reset_index(drop=True)
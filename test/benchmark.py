@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmarks du pipeline d'analyse, étape par étape
+Mesure analyze_symbol (conteneur de bougies, indicateurs, patterns, volume, ML, signal
+final) et analyze_many selon le nombre de symboles et de bougies, hors ligne
+grâce à l'exchange simulé. Chaque exécution est ajoutée à un fichier JSON
+Lines et comparée à la précédente pour repérer les régressions.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+# Ajout du chemin pour les imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.trading.analyzer import TradingAnalyzer
+from src.trading.candles import Candles
+from src.trading.fake_exchange import AsyncFakeExchange
+from src.trading.ml_model import FEATURE_NAMES, ForestModel, train_model
+
+DEFAULT_OUTPUT = 'data/benchmarks/results.jsonl'
+
+
+def measure(func, repeat):
+    """Médiane et 95e centile (ms) de `repeat` appels à func(i)"""
+    durations = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        func(i)
+        durations.append((time.perf_counter() - started) * 1000)
+    return summarize(durations)
+
+
+async def measure_async(func, repeat):
+    """Variante de measure pour une coroutine func(i)"""
+    durations = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await func(i)
+        durations.append((time.perf_counter() - started) * 1000)
+    return summarize(durations)
+
+
+def summarize(durations):
+    return {
+        'median_ms': round(float(np.median(durations)), 4),
+        'p95_ms': round(float(np.percentile(durations, 95)), 4),
+        'runs': len(durations)
+    }
+
+
+def create_analyzer(symbols, timeframe, candles, seed):
+    """Analyseur branché sur l'exchange simulé, sans cache disque"""
+    analyzer = TradingAnalyzer()
+    analyzer.ohlcv_cache = None
+    # Une fois chargées, les bougies restent en mémoire: on mesure l'analyse, pas l'ordonnanceur réseau
+    analyzer.candle_store.min_refresh_seconds = float('inf')
+    analyzer.exchanges['binance'] = AsyncFakeExchange.synthetic(symbols, [timeframe], count=candles, seed=seed)
+
+    if analyzer.ml_model is None:
+        # Forêt de taille réaliste entraînée sur des features aléatoires
+        rng = np.random.default_rng(seed)
+        features = rng.normal(size=(2000, len(FEATURE_NAMES)))
+        labels = rng.integers(0, 3, 2000)
+        model, _ = train_model(features, labels, test_size=0)
+        analyzer.ml_model = ForestModel.from_sklearn(model)
+
+    return analyzer
+
+
+def bench_stages(analyzer, symbol, timeframe, candles, repeat):
+    """Durée de chaque étape d'analyze_symbol sur une série de `candles` bougies"""
+    series = analyzer.exchanges['binance'].candles[(symbol, timeframe)]
+    windows = [series[i:i + candles] for i in range(repeat + 1)]
+    ohlcv = windows[0]
+
+    candles = Candles.from_ohlcv(ohlcv)
+    indicators = analyzer._calculate_indicators(candles)
+    patterns = analyzer._detect_patterns(candles, indicators)
+    volume = analyzer._analyze_volume(candles)
+    ml_signal = analyzer._get_ml_prediction(candles, indicators, patterns)
+
+    # Mise à jour incrémentale: la fenêtre avance d'une bougie à chaque appel
+    frames = [Candles.from_ohlcv(window) for window in windows]
+    key = ('benchmark', timeframe)
+    analyzer._calculate_indicators(frames[0], key)
+
+    return {
+        'candles': measure(lambda i: Candles.from_ohlcv(ohlcv), repeat),
+        'indicators_full': measure(lambda i: analyzer._calculate_indicators(candles), repeat),
+        'indicators_incremental': measure(lambda i: analyzer._calculate_indicators(frames[i + 1], key), repeat),
+        'patterns': measure(lambda i: analyzer._detect_patterns(candles, indicators), repeat),
+        'volume': measure(lambda i: analyzer._analyze_volume(candles), repeat),
+        'ml_prediction': measure(lambda i: analyzer._get_ml_prediction(candles, indicators, patterns), repeat),
+        'final_signal': measure(
+            lambda i: analyzer._calculate_final_signal(indicators, patterns, volume, ml_signal), repeat
+        )
+    }
+
+
+async def bench_pipeline(analyzer, symbols, timeframe, candles, repeat, single=False):
+    """
+    analyze_many (et analyze_symbol si `single`) de bout en bout, bougies
+    déjà en mémoire et cache d'analyse vidé à chaque mesure
+    """
+    symbol = symbols[0]
+    await analyzer.analyze_many(symbols, timeframe, limit=candles)
+
+    async def analyze_symbol(i):
+        analyzer.analysis_cache.invalidate(symbol)
+        await analyzer.analyze_symbol(symbol, timeframe)
+
+    async def analyze_many(i):
+        for name in symbols:
+            analyzer.analysis_cache.invalidate(name)
+        await analyzer.analyze_many(symbols, timeframe, limit=candles)
+
+    results = {}
+    if single:
+        results['analyze_symbol'] = await measure_async(analyze_symbol, repeat)
+    results['analyze_many'] = await measure_async(analyze_many, repeat)
+    results['analyze_many']['per_symbol_ms'] = round(results['analyze_many']['median_ms'] / len(symbols), 4)
+    return results
+
+
+async def run_benchmarks(args):
+    results = {}
+    symbols = [f'SYM{i}/USDT' for i in range(max(args.symbols))]
+
+    for candles in args.candles:
+        analyzer = create_analyzer(symbols, args.timeframe, candles + args.repeat + 1, args.seed)
+        try:
+            for stage, stats in bench_stages(analyzer, symbols[0], args.timeframe, candles, args.repeat).items():
+                results[f'{stage}[candles={candles}]'] = stats
+                print(f"  {stage:<24} {candles:>6} bougies  {stats['median_ms']:>9.3f} ms")
+
+            for count in args.symbols:
+                # analyze_symbol travaille toujours sur 200 bougies: une seule mesure suffit
+                single = candles == args.candles[0] and count == args.symbols[0]
+                pipeline = await bench_pipeline(analyzer, symbols[:count], args.timeframe, candles,
+                                                args.repeat, single)
+                for name, stats in pipeline.items():
+                    label = f'{name}[symbols={count},candles={candles}]'
+                    results[label] = stats
+                    print(f"  {name:<24} {candles:>6} bougies x{count:<4} {stats['median_ms']:>9.3f} ms")
+        finally:
+            await analyzer.close()
+
+    return results
+
+
+def current_version():
+    """Commit courant (ou 'local' hors dépôt git)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'local'
+
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, threshold):
+    """Affiche les écarts de médiane avec l'exécution de référence, renvoie les régressions"""
+    print(f"\n📊 Comparaison avec {previous['version']} ({previous['timestamp']}):")
+    regressions = []
+
+    for name, stats in current['results'].items():
+        reference = previous['results'].get(name)
+        if not reference or not reference['median_ms']:
+            continue
+
+        change = stats['median_ms'] / reference['median_ms'] - 1
+        flag = ''
+        if change > threshold:
+            flag = ' ⚠️  régression'
+            regressions.append(name)
+        print(f"  {name:<48} {reference['median_ms']:>9.3f} -> {stats['median_ms']:>9.3f} ms ({change:+.1%}){flag}")
+
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline d'analyse")
+    parser.add_argument('--symbols', nargs='+', type=int, default=[1, 10, 50], help="Nombres de symboles analysés")
+    parser.add_argument('--candles', nargs='+', type=int, default=[200, 500, 2000], help="Longueurs de séries")
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--repeat', type=int, default=20, help="Mesures par benchmark")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Historique des résultats (JSON Lines)")
+    parser.add_argument('--baseline', help="Version de référence (par défaut l'exécution précédente)")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Hausse de médiane signalée comme régression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    args.symbols = sorted(args.symbols)
+
+    print("⏱️  Benchmarks du pipeline d'analyse")
+    run = {
+        'version': current_version(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'params': {key: getattr(args, key) for key in ('symbols', 'candles', 'timeframe', 'repeat', 'seed')},
+        'results': await run_benchmarks(args)
+    }
+
+    previous_runs = load_runs(args.output)
+    if args.baseline:
+        previous_runs = [previous for previous in previous_runs if previous['version'] == args.baseline]
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\n💾 Résultats ajoutés à {args.output}")
+
+    regressions = compare(previous_runs[-1], run, args.threshold) if previous_runs else []
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
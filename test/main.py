@@ -7,10 +7,16 @@ import logging
 from datetime import datetime
 import sqlite3
 from src.trading.analyzer import TradingAnalyzer
+from src.trading.market_context import MarketContextEngine
+from src.trading.market_feed import DEFAULT_STREAM_URL, MarketDataFeed
+from src.trading.market_scanner import MarketScanner, select_broadcast
+from src.trading.signal_dedup import SignalDeduplicator
+from src.trading.signal_evaluator import SignalEvaluator
 from src.trading.signal_generator import SignalGenerator
 from src.database.db_manager import DatabaseManager
 from src.utils.permissions import PermissionManager
 from src.trading.portfolio import PortfolioManager
+from src.utils.metrics import COMMAND_SECONDS, send_message, start_metrics_server, track_loop
 
 # Configuration du logging
 logging.basicConfig(
@@ -41,7 +47,51 @@ class TradingBot(commands.Bot):
         self.analyzer = TradingAnalyzer()
         self.signal_generator = SignalGenerator()
         self.permission_manager = PermissionManager()
-        self.portfolio_manager = PortfolioManager()
+        self.portfolio_manager = PortfolioManager(self.db_manager, self.analyzer)
+
+        # Contexte de marché recalculé à chaque cycle d'analyse, partagé par les signaux
+        self.market_context = MarketContextEngine(self.analyzer.candle_store, timeframe='1h')
+
+        # Un même signal n'est diffusé qu'une fois par bougie (le scan tourne toutes les 5 minutes)
+        self.signal_dedup = SignalDeduplicator(
+            min_confidence_change=float(os.getenv('SIGNAL_MIN_CONFIDENCE_CHANGE', 10))
+        )
+
+        # Résultat réel des signaux émis (take profit / stop loss) sur les bougies stockées
+        self.signal_evaluator = SignalEvaluator(
+            self.db_manager, self.analyzer, self.signal_generator,
+            horizon=int(os.getenv('SIGNAL_HORIZON_BARS', 48))
+        )
+
+        # Flux websocket des bougies: l'analyse part dès la clôture d'une bougie
+        self.market_symbols = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'ADA/USDT', 'SOL/USDT']
+        self.market_feed = None
+        if os.getenv('MARKET_FEED_ENABLED', 'true').lower() == 'true':
+            self.market_feed = MarketDataFeed(
+                self.analyzer.candle_store,
+                self.market_symbols,
+                timeframes=['1h'],
+                url=os.getenv('BINANCE_WS_URL', DEFAULT_STREAM_URL),
+                on_bar_close=self.on_bar_close
+            )
+        self._closed_bars = set()
+        self._closed_bars_task = None
+        self.metrics_started = False
+
+        # Scan de toutes les paires de la devise de cotation, calculs répartis sur un pool de processus
+        self.market_scanner = None
+        if os.getenv('MARKET_SCANNER_ENABLED', 'true').lower() == 'true':
+            workers = os.getenv('SCANNER_WORKERS')
+            self.market_scanner = MarketScanner(
+                self.analyzer,
+                interval=self.loop_interval(self.market_analysis),
+                workers=int(workers) if workers else None,
+                quote=os.getenv('SCANNER_QUOTE', 'USDT'),
+                max_symbols=int(os.getenv('SCANNER_MAX_SYMBOLS', 0))
+            )
+        # Signaux de l'univers diffusés par cycle (les symboles principaux le sont toujours)
+        self.scanner_max_signals = int(os.getenv('SCANNER_MAX_SIGNALS', 5))
+        self.scanner_min_confidence = float(os.getenv('SCANNER_MIN_CONFIDENCE', 75))
 
         # Configuration des canaux
         self.alert_channel_id = int(os.getenv('ALERT_CHANNEL_ID', 0))
@@ -52,13 +102,23 @@ class TradingBot(commands.Bot):
         logging.info(f'{self.user} est connecté!')
         logging.info(f'Bot connecté à {len(self.guilds)} serveurs')
 
+        # Endpoint Prometheus (/metrics) servi dans le processus du bot
+        if os.getenv('METRICS_ENABLED', 'true').lower() == 'true' and not self.metrics_started:
+            self.metrics_started = start_metrics_server(int(os.getenv('METRICS_PORT', 8000)))
+
         # Démarrage des tâches automatiques
+        if self.market_feed is not None:
+            self.market_feed.start()
+        if self.market_scanner is not None:
+            await self.market_scanner.start()
         if not self.market_analysis.is_running():
             self.market_analysis.start()
         if not self.portfolio_update.is_running():
             self.portfolio_update.start()
         if not self.daily_report.is_running():
             self.daily_report.start()
+        if not self.signal_evaluation.is_running():
+            self.signal_evaluation.start()
 
         # Synchronisation des commandes slash
         try:
@@ -67,33 +127,112 @@ class TradingBot(commands.Bot):
         except Exception as e:
             logging.error(f"Erreur lors de la synchronisation: {e}")
 
+    @staticmethod
+    def loop_interval(loop):
+        """Intervalle d'une tâche périodique, en secondes"""
+        return loop.hours * 3600 + loop.minutes * 60 + loop.seconds
+
+    async def on_app_command_completion(self, interaction, command):
+        """Temps de traitement des commandes slash, de la réception à la fin de la réponse"""
+        elapsed = (datetime.now(interaction.created_at.tzinfo) - interaction.created_at).total_seconds()
+        COMMAND_SECONDS.labels(command=command.qualified_name).observe(elapsed)
+
+    async def close(self):
+        """Arrêt propre du bot et des connexions aux exchanges"""
+        if self.market_feed is not None:
+            await asyncio.to_thread(self.market_feed.stop)
+        if self.market_scanner is not None:
+            await self.market_scanner.close()
+        await self.analyzer.close()
+        await super().close()
+
     @tasks.loop(minutes=5)
     async def market_analysis(self):
-        """Analyse du marché toutes les 5 minutes"""
+        """Scan du marché toutes les 5 minutes (secours si le flux websocket est coupé)"""
         try:
-            # Analyse des principales cryptomonnaies
-            symbols = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'ADA/USDT', 'SOL/USDT']
+            # Avec le flux connecté, ses symboles sont analysés à la clôture des bougies;
+            # le premier passage charge tout de même leur historique via REST
+            feed_live = (self.market_feed is not None and self.market_feed.connected
+                         and self.market_analysis.current_loop > 0)
+            if self.market_scanner is None and feed_live:
+                return
+
+            with track_loop('market_analysis', self.loop_interval(self.market_analysis)):
+                if self.market_scanner is None:
+                    await self.analyze_and_signal(self.market_symbols)
+                    return
+
+                scan = await self.market_scanner.scan(exclude=self.market_symbols if feed_live else ())
+                logging.info(f"Scan du marché: {scan['stats']['analyzed']}/{scan['stats']['universe']} "
+                             f"paires analysées en {scan['stats']['duration']:.1f}s, "
+                             f"{scan['stats']['skipped']} ignorées")
+                # Les symboles du flux sont exclus du scan mais comptent dans le contexte de marché
+                self.update_market_context(scan['analyses'])
+                await self.send_signals(select_broadcast(
+                    scan['analyses'], self.market_symbols, self.scanner_max_signals, self.scanner_min_confidence
+                ))
 
-            for symbol in symbols:
-                analysis = await self.analyzer.analyze_symbol(symbol)
+        except Exception as e:
+            logging.error(f"Erreur lors de l'analyse du marché: {e}")
 
-                if analysis['signal'] != 'HOLD':
-                    signal = await self.signal_generator.generate_signal(symbol, analysis)
-                    await self.send_signal(signal)
+    def on_bar_close(self, symbol, timeframe, candle):
+        """Clôture d'une bougie reçue en streaming: les symboles clôturés ensemble sont analysés en un lot"""
+        self._closed_bars.add(symbol)
+        if self._closed_bars_task is None or self._closed_bars_task.done():
+            self._closed_bars_task = asyncio.create_task(self._analyze_closed_bars())
+
+    async def _analyze_closed_bars(self):
+        try:
+            # Les bougies de tous les symboles se clôturent à quelques millisecondes d'écart
+            await asyncio.sleep(0.05)
+            symbols = [symbol for symbol in self.market_symbols if symbol in self._closed_bars]
+            self._closed_bars.clear()
+            await self.analyze_and_signal(symbols)
 
         except Exception as e:
-            logging.error(f"Erreur lors de l'analyse du marché: {e}")
+            logging.error(f"Erreur lors de l'analyse des bougies clôturées: {e}")
+
+    async def analyze_and_signal(self, symbols):
+        """Analyse groupée des symboles puis envoi des signaux"""
+        # Téléchargements en parallèle (ou lecture du flux) puis calculs vectorisés
+        analyses = await self.analyzer.analyze_many(symbols)
+        self.update_market_context(analyses)
+        await self.send_signals(analyses)
+
+    def update_market_context(self, analyses):
+        """Contexte de marché recalculé avec les nouvelles analyses, partagé par les signaux suivants"""
+        self.signal_generator.set_market_context(self.market_context.compute(analyses, symbols=self.market_symbols))
+
+    async def send_signals(self, analyses):
+        """Génération et envoi des signaux des analyses autres que HOLD, une fois par bougie"""
+        to_emit = [analysis for analysis in analyses
+                   if not analysis.get('error') and self.signal_dedup.should_emit(analysis)]
+        if not to_emit:
+            return
+
+        signals = [signal for signal in await self.signal_generator.generate_signals(to_emit)
+                   if not signal.get('error')]
+
+        # Seuls les signaux enregistrés (évaluation de leur résultat, voir signal_evaluation) sont
+        # diffusés et marqués comme émis; les autres seront regénérés au prochain cycle
+        saved = self.db_manager.save_signals(signals)
+        for signal in saved:
+            self.signal_dedup.record(signal)
+
+        for signal in saved:
+            await self.send_signal(signal)
 
     @tasks.loop(hours=1)
     async def portfolio_update(self):
         """Mise à jour des portfolios des utilisateurs premium"""
         try:
-            premium_users = self.db_manager.get_premium_users()
+            with track_loop('portfolio_update', self.loop_interval(self.portfolio_update)):
+                premium_users = self.db_manager.get_premium_users()
 
-            for user_id in premium_users:
-                portfolio = await self.portfolio_manager.update_portfolio(user_id)
-                if portfolio['alerts']:
-                    await self.send_portfolio_alert(user_id, portfolio)
+                for user_id in premium_users:
+                    portfolio = await self.portfolio_manager.update_portfolio(user_id)
+                    if portfolio['alerts']:
+                        await self.send_portfolio_alert(user_id, portfolio)
 
         except Exception as e:
             logging.error(f"Erreur lors de la mise à jour des portfolios: {e}")
@@ -102,14 +241,25 @@ class TradingBot(commands.Bot):
     async def daily_report(self):
         """Rapport quotidien de performance"""
         try:
-            report = await self.analyzer.generate_daily_report()
+            with track_loop('daily_report', self.loop_interval(self.daily_report)):
+                report = await self.analyzer.generate_daily_report(self.db_manager.get_signal_outcome_stats(days=7))
 
-            # Envoi aux différents niveaux d'abonnement
-            await self.send_daily_report(report)
+                # Envoi aux différents niveaux d'abonnement
+                await self.send_daily_report(report)
 
         except Exception as e:
             logging.error(f"Erreur lors de la génération du rapport: {e}")
 
+    @tasks.loop(minutes=15)
+    async def signal_evaluation(self):
+        """Clôture des signaux ouverts dont le take profit ou le stop loss a été atteint"""
+        try:
+            with track_loop('signal_evaluation', self.loop_interval(self.signal_evaluation)):
+                await self.signal_evaluator.evaluate()
+
+        except Exception as e:
+            logging.error(f"Erreur lors de l'évaluation des signaux: {e}")
+
     async def send_signal(self, signal):
         """Envoi des signaux selon le niveau d'abonnement"""
         try:
@@ -118,20 +268,20 @@ class TradingBot(commands.Bot):
                 channel = self.get_channel(self.alert_channel_id)
                 if channel:
                     embed = self.create_signal_embed(signal, 'basic')
-                    await channel.send(embed=embed)
+                    await send_message(channel, 'signal', embed=embed)
 
             # Signal premium
             if signal['confidence'] >= 75:
                 channel = self.get_channel(self.premium_channel_id)
                 if channel:
                     embed = self.create_signal_embed(signal, 'premium')
-                    await channel.send(embed=embed)
+                    await send_message(channel, 'signal', embed=embed)
 
             # Signal VIP (tous les signaux)
             channel = self.get_channel(self.vip_channel_id)
             if channel:
                 embed = self.create_signal_embed(signal, 'vip')
-                await channel.send(embed=embed)
+                await send_message(channel, 'signal', embed=embed)
 
         except Exception as e:
             logging.error(f"Erreur lors de l'envoi du signal: {e}")
@@ -188,7 +338,7 @@ class TradingBot(commands.Bot):
             for channel_id in [self.alert_channel_id, self.premium_channel_id, self.vip_channel_id]:
                 channel = self.get_channel(channel_id)
                 if channel:
-                    await channel.send(embed=embed)
+                    await send_message(channel, 'daily_report', embed=embed)
 
         except Exception as e:
             logging.error(f"Erreur lors de l'envoi du rapport: {e}")
@@ -0,0 +1,4 @@
+# Code de données de marché sans dépendance au bot (ni réseau, ni Discord)
+#
+# Importé par le bot (src.trading) et par les scripts renfo_trade: les
+# timeframes et le format du cache disque des bougies sont définis une seule fois.
@@ -0,0 +1,202 @@
+# Extrêmes glissants et niveaux de support/résistance
+#
+# Module sans dépendance autre que NumPy: RollingExtreme sert au moteur
+# d'indicateurs incrémental, rolling_extreme aux colonnes complètes (analyse
+# groupée, features de renfo_trade), avec la même convention NaN.
+
+import math
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List
+
+import numpy as np
+
+NAN = math.nan
+
+
+class RollingExtreme:
+    """
+    Maximum ou minimum glissant sur une fenêtre fixe
+
+    File monotone de (position, valeur): chaque valeur y entre et en sort au
+    plus une fois, soit O(1) amorti par mise à jour quelle que soit la fenêtre.
+    """
+
+    __slots__ = ('window', 'is_max', 'queue', 'count')
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.queue = deque()
+        self.count = 0
+
+    def _dominates(self, x: float, y: float) -> bool:
+        return x >= y if self.is_max else x <= y
+
+    @property
+    def value(self) -> float:
+        """Extrême de la fenêtre courante (NaN tant qu'elle n'est pas remplie)"""
+        return self.queue[0][1] if self.count >= self.window else NAN
+
+    def update(self, x: float, commit: bool = True) -> float:
+        """
+        Ajoute une valeur et renvoie l'extrême des `window` dernières
+
+        Avec commit=False, renvoie l'extrême qu'on obtiendrait sans modifier l'état.
+        """
+        position = self.count
+        expired = position - self.window
+
+        if not commit:
+            if position + 1 < self.window:
+                return NAN
+            # Seule la tête de file peut sortir de la fenêtre; la suivante est l'extrême du reste
+            queue = self.queue
+            best = queue[0] if queue and queue[0][0] > expired else (queue[1] if len(queue) > 1 else None)
+            return x if best is None or self._dominates(x, best[1]) else best[1]
+
+        queue = self.queue
+        while queue and self._dominates(x, queue[-1][1]):
+            queue.pop()
+        queue.append((position, x))
+        if queue[0][0] <= expired:
+            queue.popleft()
+
+        self.count += 1
+        return self.value
+
+
+def rolling_extreme(values, window: int, mode: str = 'max') -> np.ndarray:
+    """
+    Maximum ou minimum glissant sur toute une colonne, en vectoriel
+
+    Même résultat que RollingExtreme appliqué valeur par valeur: NaN pour les
+    `window - 1` premières positions, puis l'extrême des `window` dernières.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), NAN)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        result[window - 1:] = windows.max(axis=1) if mode == 'max' else windows.min(axis=1)
+    return result
+
+
+class SupportResistanceIndex:
+    """
+    Index des niveaux de support/résistance issus des pivots
+
+    Un pivot haut (bas) est une bougie dont le plus haut (plus bas) est
+    l'extrême des `strength` bougies de part et d'autre; il est confirmé
+    `strength` bougies plus tard. Les pivots proches (à `tolerance` près) sont
+    fusionnés en un niveau dont la force est le nombre de contacts. Les
+    niveaux sont triés par prix; au-delà de `max_levels`, le niveau le moins
+    récemment touché est supprimé.
+    """
+
+    def __init__(self, strength: int = 3, tolerance: float = 0.005, max_levels: int = 50):
+        self.strength = strength
+        self.tolerance = tolerance
+        self.max_levels = max_levels
+
+        window = 2 * strength + 1
+        self._window_high = RollingExtreme(window, 'max')
+        self._window_low = RollingExtreme(window, 'min')
+        self._recent = deque(maxlen=window)
+        self.count = 0
+
+        self.prices: List[float] = []
+        self.touches: List[int] = []
+        self.last_seen: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_history(cls, highs, lows, **kwargs) -> 'SupportResistanceIndex':
+        """Construit l'index d'une série de bougies clôturées, pivots détectés en vectoriel"""
+        index = cls(**kwargs)
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        window = 2 * index.strength + 1
+
+        if len(highs) >= window:
+            centers = np.arange(index.strength, len(highs) - index.strength)
+            window_high = np.lib.stride_tricks.sliding_window_view(highs, window).max(axis=1)
+            window_low = np.lib.stride_tricks.sliding_window_view(lows, window).min(axis=1)
+            pivot_high = highs[centers] == window_high
+            pivot_low = lows[centers] == window_low
+
+            for center in np.flatnonzero(pivot_high | pivot_low):
+                confirmed_at = int(centers[center]) + index.strength
+                if pivot_high[center]:
+                    index.add_level(float(highs[centers[center]]), confirmed_at)
+                if pivot_low[center]:
+                    index.add_level(float(lows[centers[center]]), confirmed_at)
+
+        index.count = len(highs)
+        index._recent.extend(zip(highs[-window:].tolist(), lows[-window:].tolist()))
+        for high, low in index._recent:
+            index._window_high.update(high)
+            index._window_low.update(low)
+        return index
+
+    def update(self, high: float, low: float):
+        """Intègre une bougie clôturée"""
+        self._recent.append((high, low))
+        window_high = self._window_high.update(high)
+        window_low = self._window_low.update(low)
+        self.count += 1
+
+        if len(self._recent) == self._recent.maxlen:
+            center_high, center_low = self._recent[self.strength]
+            if center_high == window_high:
+                self.add_level(center_high, self.count - 1)
+            if center_low == window_low:
+                self.add_level(center_low, self.count - 1)
+
+    def add_level(self, price: float, seen_at: int = None):
+        """Ajoute un pivot, fusionné avec le niveau voisin s'il est assez proche"""
+        seen_at = self.count if seen_at is None else seen_at
+        position = bisect_left(self.prices, price)
+
+        for neighbor in (position - 1, position):
+            if 0 <= neighbor < len(self.prices) and \
+                    abs(self.prices[neighbor] - price) <= self.tolerance * self.prices[neighbor]:
+                touches = self.touches[neighbor]
+                merged = (self.prices[neighbor] * touches + price) / (touches + 1)
+                self._remove(neighbor)
+                self._insert(merged, touches + 1, seen_at)
+                return
+
+        self._insert(price, 1, seen_at)
+
+        if len(self.prices) > self.max_levels:
+            self._remove(self.last_seen.index(min(self.last_seen)))
+
+    def nearest(self, price: float, count: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Niveaux les plus proches de part et d'autre d'un prix
+
+        Returns:
+            Dict: 'supports' (décroissants) et 'resistances' (croissantes),
+                chacun une liste de {'price', 'touches'}
+        """
+        position = bisect_left(self.prices, price)
+        below = range(position - 1, max(position - 1 - count, -1), -1)
+        above = range(position, min(position + count, len(self.prices)))
+
+        return {
+            'supports': [{'price': self.prices[i], 'touches': self.touches[i]} for i in below],
+            'resistances': [{'price': self.prices[i], 'touches': self.touches[i]} for i in above]
+        }
+
+    def _insert(self, price: float, touches: int, seen_at: int):
+        position = bisect_left(self.prices, price)
+        self.prices.insert(position, price)
+        self.touches.insert(position, touches)
+        self.last_seen.insert(position, seen_at)
+
+    def _remove(self, position: int):
+        del self.prices[position]
+        del self.touches[position]
+        del self.last_seen[position]
@@ -0,0 +1,271 @@
+# Cache disque des bougies OHLCV (colonnes mappées en mémoire)
+#
+# Chaque série (symbole, timeframe) est un dossier contenant une colonne par
+# fichier binaire (timestamp en int64, prix et volume en float64) et un index
+# JSON. Les colonnes sont lues par np.memmap: recharger des années d'historique
+# ne copie que la plage demandée, trouvée par recherche dichotomique sur les
+# timestamps. Module sans dépendance réseau, partagé avec renfo_trade.
+
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from market_core.timeframes import OHLCV_COLUMNS, timeframe_to_ms
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+COLUMN_DTYPES = {name: np.int64 if name == 'timestamp' else np.float64 for name in COLUMNS}
+INDEX_FILE = 'index.json'
+
+
+class OHLCVDiskCache:
+    """
+    Historique persistant des bougies clôturées
+
+    L'index de chaque série enregistre le nombre de lignes valides et les
+    segments [start, end[ dont toutes les bougies sont connues; les bougies
+    qui manquent chez l'exchange dans un segment ne sont donc pas
+    redemandées. Un bloc disjoint de l'historique (bot arrêté plus longtemps
+    que la capacité du CandleStore) ouvre un nouveau segment: aucune bougie
+    stockée n'est jamais supprimée.
+
+    Les ajouts après la dernière bougie se font en fin de fichier et l'index
+    est réécrit en dernier: une écriture interrompue laisse des octets en
+    trop, ignorés puis tronqués au prochain ajout. Les autres cas (bloc
+    antérieur ou comblant un trou) réécrivent la série fusionnée dans une
+    nouvelle génération de fichiers, qui ne devient visible qu'une fois
+    l'index écrit.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Dossier racine du cache
+        """
+        self.directory = directory
+        self._indexes: Dict[Tuple[str, str], Dict] = {}
+        self._columns: Dict[Tuple[str, str], Dict[str, np.memmap]] = {}
+
+        self.stats = {
+            'reads': 0,
+            'rows_read': 0,
+            'appends': 0,
+            'rows_written': 0,
+            'rewrites': 0
+        }
+
+    def _path(self, symbol: str, timeframe: str, name: str = '') -> str:
+        return os.path.join(self.directory, symbol.replace('/', '-'), timeframe, name)
+
+    @staticmethod
+    def _column_file(index: Dict, name: str) -> str:
+        # Les index antérieurs aux générations désignent directement `<colonne>.bin`
+        generation = index.get('generation')
+        return f'{name}.bin' if generation is None else f'{name}.{generation}.bin'
+
+    def _index(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        key = (symbol, timeframe)
+        if key not in self._indexes:
+            try:
+                with open(self._path(symbol, timeframe, INDEX_FILE)) as f:
+                    index = json.load(f)
+            except FileNotFoundError:
+                return None
+            except ValueError as e:
+                logging.error(f"Index du cache OHLCV illisible pour {symbol} {timeframe}: {e}")
+                return None
+
+            # Index à segment unique des versions précédentes
+            if 'segments' not in index:
+                index['segments'] = [[index['start'], index['end']]] if index['rows'] else []
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def segments(self, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """Intervalles [start, end[ (ms) entièrement connus, du plus ancien au plus récent"""
+        index = self._index(symbol, timeframe)
+        if index is None or index['rows'] == 0:
+            return []
+        return [tuple(segment) for segment in index['segments']]
+
+    def coverage(self, symbol: str, timeframe: str, at: int = None) -> Optional[Tuple[int, int]]:
+        """
+        Intervalle [start, end[ (ms) entièrement connu
+
+        Args:
+            at (int): Timestamp (ms) que l'intervalle doit contenir; par défaut
+                le segment le plus récent
+
+        Returns:
+            Tuple[int, int]: Segment trouvé, None si la série est absente ou
+                si `at` n'est couvert par aucun segment
+        """
+        segments = self.segments(symbol, timeframe)
+        if at is None:
+            return segments[-1] if segments else None
+        return next((segment for segment in segments if segment[0] <= at < segment[1]), None)
+
+    def _memmaps(self, symbol: str, timeframe: str) -> Optional[Dict[str, np.memmap]]:
+        index = self._index(symbol, timeframe)
+        if index is None or index['rows'] == 0:
+            return None
+
+        key = (symbol, timeframe)
+        if key not in self._columns:
+            self._columns[key] = {
+                name: np.memmap(self._path(symbol, timeframe, self._column_file(index, name)),
+                                dtype=COLUMN_DTYPES[name], mode='r', shape=(index['rows'],))
+                for name in COLUMNS
+            }
+        return self._columns[key]
+
+    def read(self, symbol: str, timeframe: str, since: int = None, until: int = None,
+             limit: int = None) -> np.ndarray:
+        """
+        Bougies stockées dont le timestamp est dans [since, until[
+
+        Returns:
+            np.ndarray: Tableau (N x 6) au format du CandleStore, vide si rien n'est stocké
+        """
+        columns = self._memmaps(symbol, timeframe)
+        if columns is None:
+            return np.empty((0, OHLCV_COLUMNS), dtype=np.float64)
+
+        timestamps = columns['timestamp']
+        first = 0 if since is None else int(np.searchsorted(timestamps, since, side='left'))
+        last = len(timestamps) if until is None else int(np.searchsorted(timestamps, until, side='left'))
+        if limit is not None:
+            last = min(last, first + limit)
+
+        candles = np.empty((max(last - first, 0), OHLCV_COLUMNS), dtype=np.float64)
+        for position, name in enumerate(COLUMNS):
+            candles[:, position] = columns[name][first:last]
+
+        self.stats['reads'] += 1
+        self.stats['rows_read'] += len(candles)
+        return candles
+
+    def append(self, symbol: str, timeframe: str, candles, since: int = None) -> int:
+        """
+        Enregistre des bougies téléchargées
+
+        Seules les bougies clôturées sont conservées. Un bloc qui commence
+        dans le dernier segment ou après lui est ajouté en fin de fichier;
+        sinon la série est réécrite fusionnée. L'intervalle couvert par le bloc
+        est réuni aux segments existants qu'il touche.
+
+        Args:
+            candles: Bougies au format ccxt, triées par timestamp
+            since (int): Timestamp demandé à l'exchange (début de l'intervalle
+                couvert), par défaut celui de la première bougie
+
+        Returns:
+            int: Nombre de bougies écrites
+        """
+        timeframe_ms = timeframe_to_ms(timeframe)
+        candles = np.asarray(candles, dtype=np.float64).reshape(-1, OHLCV_COLUMNS)
+        now_ms = int(time.time() * 1000)
+        candles = candles[candles[:, 0] + timeframe_ms <= now_ms]
+        if len(candles) == 0:
+            return 0
+
+        start = int(candles[0, 0]) if since is None else min(int(since), int(candles[0, 0]))
+        end = int(candles[-1, 0]) + timeframe_ms
+        segments = self.segments(symbol, timeframe)
+        merged_segments = _merge_segments(segments, start, end)
+
+        try:
+            if not segments:
+                return self._rewrite(symbol, timeframe, candles, merged_segments)
+
+            if start >= segments[-1][0]:
+                # Les bougies antérieures à la dernière stockée sont déjà connues (segment couvert)
+                new = candles[candles[:, 0] > self._memmaps(symbol, timeframe)['timestamp'][-1]]
+                return self._append_rows(symbol, timeframe, new, merged_segments)
+
+            # Bloc antérieur ou comblant un trou: fusion, les lignes stockées sont toutes conservées
+            stored = self.read(symbol, timeframe)
+            known = np.isin(candles[:, 0], stored[:, 0])
+            merged = np.concatenate([stored, candles[~known]])
+            merged = merged[np.argsort(merged[:, 0], kind='stable')]
+            self._rewrite(symbol, timeframe, merged, merged_segments)
+            return int((~known).sum())
+
+        except OSError as e:
+            logging.error(f"Erreur lors de l'écriture du cache OHLCV {symbol} {timeframe}: {e}")
+            return 0
+
+    def _append_rows(self, symbol: str, timeframe: str, candles: np.ndarray, segments: List[List[int]]) -> int:
+        index = dict(self._index(symbol, timeframe))
+        rows = index['rows']
+
+        for position, name in enumerate(COLUMNS):
+            with open(self._path(symbol, timeframe, self._column_file(index, name)), 'r+b') as f:
+                # Supprime les octets d'une écriture interrompue
+                f.truncate(rows * 8)
+                f.seek(0, os.SEEK_END)
+                f.write(candles[:, position].astype(COLUMN_DTYPES[name]).tobytes())
+
+        index.update(rows=rows + len(candles), segments=segments, start=segments[0][0], end=segments[-1][1])
+        self._write_index(symbol, timeframe, index)
+        if len(candles):
+            self.stats['appends'] += 1
+            self.stats['rows_written'] += len(candles)
+        return len(candles)
+
+    def _rewrite(self, symbol: str, timeframe: str, candles: np.ndarray, segments: List[List[int]]) -> int:
+        path = self._path(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        previous = self._index(symbol, timeframe)
+
+        # Nouvelle génération de fichiers: l'ancienne reste valide tant que l'index n'est pas remplacé
+        generation = (previous or {}).get('generation', 0) + 1
+        index = {'symbol': symbol, 'timeframe': timeframe, 'rows': len(candles), 'generation': generation,
+                 'segments': segments, 'start': segments[0][0], 'end': segments[-1][1]}
+        for position, name in enumerate(COLUMNS):
+            with open(os.path.join(path, self._column_file(index, name)), 'wb') as f:
+                f.write(candles[:, position].astype(COLUMN_DTYPES[name]).tobytes())
+
+        self._write_index(symbol, timeframe, index)
+
+        if previous is not None:
+            for name in COLUMNS:
+                try:
+                    os.remove(os.path.join(path, self._column_file(previous, name)))
+                except FileNotFoundError:
+                    pass
+
+        self.stats['rewrites'] += 1
+        self.stats['rows_written'] += len(candles)
+        return len(candles)
+
+    def _write_index(self, symbol: str, timeframe: str, index: Dict):
+        target = self._path(symbol, timeframe, INDEX_FILE)
+        with open(target + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(target + '.tmp', target)
+
+        # Les memmaps ont une taille fixe: elles sont rouvertes à la prochaine lecture
+        self._indexes[(symbol, timeframe)] = index
+        self._columns.pop((symbol, timeframe), None)
+
+    def clear(self, symbol: str = None, timeframe: str = None):
+        """Oublie les index en mémoire (les fichiers sont relus au prochain accès)"""
+        for key in list(self._indexes):
+            if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                self._indexes.pop(key, None)
+                self._columns.pop(key, None)
+
+
+def _merge_segments(segments: List[Tuple[int, int]], start: int, end: int) -> List[List[int]]:
+    """Réunion de [start, end[ avec les segments qui le recouvrent ou le touchent"""
+    merged = []
+    for segment_start, segment_end in sorted([*segments, (start, end)]):
+        if merged and segment_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], segment_end)
+        else:
+            merged.append([segment_start, segment_end])
+    return merged
@@ -0,0 +1,27 @@
+# Timeframes ccxt et format des bougies
+
+# Durée d'une unité de timeframe ccxt en millisecondes
+TIMEFRAME_UNITS_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+    'M': 30 * 24 * 60 * 60 * 1000
+}
+
+# Colonnes d'une bougie: timestamp (ms), open, high, low, close, volume
+OHLCV_COLUMNS = 6
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Convertit un timeframe ccxt ('1m', '4h', '1d'...) en millisecondes"""
+    try:
+        return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[timeframe[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Timeframe non supporté: {timeframe}")
+
+
+def timeframe_origin_ms(timeframe: str) -> int:
+    """Décalage d'alignement des bougies par rapport à l'epoch Unix"""
+    # Les bougies hebdomadaires Binance démarrent le lundi, l'epoch tombe un jeudi
+    return 4 * TIMEFRAME_UNITS_MS['d'] if timeframe.endswith('w') else 0
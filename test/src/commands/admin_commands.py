@@ -83,6 +83,28 @@ class AdminCommands(commands.Cog):
                 inline=True
             )
 
+            # Cache d'analyse
+            cache_stats = self.bot.analyzer.analysis_cache.get_stats()
+            embed.add_field(
+                name="⚡ Cache d'Analyse",
+                value=f"Entrées: {cache_stats['entries']:,}\n"
+                      f"Hits: {cache_stats['hits'] + cache_stats['coalesced']:,} / Miss: {cache_stats['misses']:,}\n"
+                      f"Taux de hit: {cache_stats['hit_rate']:.1f}%\n"
+                      f"Évictions: {cache_stats['evictions']:,}",
+                inline=True
+            )
+
+            # File d'attente des requêtes exchange
+            scheduler_stats = self.bot.analyzer.request_scheduler.get_stats()
+            embed.add_field(
+                name="🚦 Requêtes Binance",
+                value=f"En attente: {scheduler_stats['queue_size']}\n"
+                      f"Utilisateurs: {scheduler_stats['user']['requests']:,} (attente moy. {scheduler_stats['user']['avg_wait'] * 1000:.0f} ms)\n"
+                      f"Tâches de fond: {scheduler_stats['background']['requests']:,} (attente moy. {scheduler_stats['background']['avg_wait'] * 1000:.0f} ms)\n"
+                      f"Limitations: {scheduler_stats['throttled']}",
+                inline=True
+            )
+
             # Top symboles
             top_symbols = perf_stats.get('top_symbols', [])[:5]
             if top_symbols:
@@ -300,12 +322,13 @@ class AdminCommands(commands.Cog):
                 return
 
             elif action.lower() == "cache":
-                # Vidage du cache des permissions
+                # Vidage des caches de permissions et d'analyse
                 self.bot.permission_manager.invalidate_cache()
+                self.bot.analyzer.analysis_cache.invalidate()
 
                 embed = discord.Embed(
                     title="🗑️ Cache Vidé",
-                    description="Cache des permissions réinitialisé",
+                    description="Caches des permissions et des analyses réinitialisés",
                     color=discord.Color.green()
                 )
 
@@ -11,10 +11,17 @@ import matplotlib.pyplot as plt
 import io
 import base64
 
+from src.trading.rate_limiter import PRIORITY_USER, set_request_priority
+
 class PortfolioCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Les requêtes exchange des commandes passent avant celles des tâches de fond"""
+        set_request_priority(PRIORITY_USER)
+        return True
+
     @app_commands.command(name="add_position", description="Ajouter une position à votre portfolio")
     @app_commands.describe(
         symbol="Symbole de la cryptomonnaie (ex: BTC, ETH)",
@@ -11,10 +11,17 @@ import matplotlib.pyplot as plt
 import io
 import base64
 
+from src.trading.rate_limiter import PRIORITY_USER, set_request_priority
+
 class TradingCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Les requêtes exchange des commandes passent avant celles des tâches de fond"""
+        set_request_priority(PRIORITY_USER)
+        return True
+
     @app_commands.command(name="signal", description="Obtenir un signal de trading pour une crypto")
     @app_commands.describe(
         symbol="Symbole de la cryptomonnaie (ex: BTC, ETH, BNB)",
@@ -97,13 +104,11 @@ class TradingCommands(commands.Cog):
             if '/' not in symbol:
                 symbol = f"{symbol.upper()}/USDT"
 
-            # Analyse complète
-            analysis = await self.bot.analyzer.analyze_symbol(symbol, '1h')
-            analysis_4h = await self.bot.analyzer.analyze_symbol(symbol, '4h')
-            analysis_1d = await self.bot.analyzer.analyze_symbol(symbol, '1d')
+            # Analyse complète (4h et 1d reconstruits à partir des bougies 1h)
+            analyses = await self.bot.analyzer.analyze_timeframes(symbol, ['1h', '4h', '1d'])
 
             # Création de l'embed d'analyse complète
-            embed = await self._create_analysis_embed(symbol, analysis, analysis_4h, analysis_1d, user_tier)
+            embed = await self._create_analysis_embed(symbol, analyses['1h'], analyses['4h'], analyses['1d'], user_tier)
 
             await interaction.followup.send(embed=embed)
 
@@ -268,6 +273,14 @@ class TradingCommands(commands.Cog):
                     inline=False
                 )
 
+            # Rapport partiel: symboles en échec ou hors délai
+            if report.get('failed_symbols'):
+                embed.add_field(
+                    name="⚠️ Données Indisponibles",
+                    value=", ".join(report['failed_symbols']),
+                    inline=False
+                )
+
             embed.set_footer(text="Données mises à jour en temps réel")
 
             await interaction.followup.send(embed=embed)
@@ -424,6 +437,18 @@ class TradingCommands(commands.Cog):
                 inline=True
             )
 
+        # Niveaux de support/résistance (pivots 1H)
+        if user_tier in ['premium', 'vip'] and not analysis_1h.get('error'):
+            levels = analysis_1h.get('levels', {})
+            supports = " / ".join(f"${level['price']:.4f}" for level in levels.get('supports', [])[:2]) or "N/A"
+            resistances = " / ".join(f"${level['price']:.4f}" for level in levels.get('resistances', [])[:2]) or "N/A"
+
+            embed.add_field(
+                name="🎯 Support / Résistance",
+                value=f"🟢 {supports}\n🔴 {resistances}",
+                inline=True
+            )
+
         # Patterns détectés
         if not analysis_1h.get('error'):
             patterns = analysis_1h.get('patterns', {})
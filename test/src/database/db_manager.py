@@ -7,12 +7,16 @@ from typing import Dict, List, Optional, Tuple
 import json
 import os
 
+from src.trading.signal_record import SignalRecord
+from src.utils.metrics import DB_QUERY_SECONDS, timed_operation
+
 class DatabaseManager:
     def __init__(self, db_path: str = "trading_bot.db"):
         """Initialisation du gestionnaire de base de données"""
         self.db_path = db_path
         self.init_database()
 
+    @timed_operation(DB_QUERY_SECONDS)
     def init_database(self):
         """Initialise la base de données avec toutes les tables nécessaires"""
         try:
@@ -52,6 +56,7 @@ class DatabaseManager:
                     patterns TEXT,
                     recommendations TEXT,
                     market_context TEXT,
+                    payload BLOB,
                     is_sent INTEGER DEFAULT 0,
                     performance_updated INTEGER DEFAULT 0,
                     actual_outcome TEXT,
@@ -134,10 +139,16 @@ class DatabaseManager:
                 )
                 ''')
 
+                # Bases créées avant l'encodage binaire des signaux (SignalRecord)
+                signal_columns = {row[1] for row in cursor.execute('PRAGMA table_info(signals)')}
+                if 'payload' not in signal_columns:
+                    cursor.execute('ALTER TABLE signals ADD COLUMN payload BLOB')
+
                 # Index pour améliorer les performances
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_subscription ON users(subscription_tier)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_signals_symbol ON signals(symbol)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_signals_created_at ON signals(created_at)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_signals_open ON signals(performance_updated, created_at)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)')
 
@@ -150,6 +161,7 @@ class DatabaseManager:
 
     # GESTION DES UTILISATEURS
 
+    @timed_operation(DB_QUERY_SECONDS)
     def add_user(self, user_id: int, username: str, subscription_tier: str = 'free') -> bool:
         """Ajoute un nouvel utilisateur"""
         try:
@@ -166,6 +178,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de l'ajout de l'utilisateur {user_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_user(self, user_id: int) -> Optional[Dict]:
         """Récupère les informations d'un utilisateur"""
         try:
@@ -183,6 +196,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération de l'utilisateur {user_id}: {e}")
             return None
 
+    @timed_operation(DB_QUERY_SECONDS)
     def update_subscription(self, user_id: int, tier: str, duration_days: int = 30) -> bool:
         """Met à jour l'abonnement d'un utilisateur"""
         try:
@@ -205,6 +219,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la mise à jour de l'abonnement pour {user_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_premium_users(self) -> List[int]:
         """Récupère la liste des utilisateurs premium actifs"""
         try:
@@ -223,6 +238,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération des utilisateurs premium: {e}")
             return []
 
+    @timed_operation(DB_QUERY_SECONDS)
     def update_user_activity(self, user_id: int):
         """Met à jour la dernière activité d'un utilisateur"""
         try:
@@ -238,34 +254,48 @@ class DatabaseManager:
 
     # GESTION DES SIGNAUX
 
+    # INSERT simple: un identifiant déjà présent fait échouer la sauvegarde au lieu d'écraser un signal
+    SIGNAL_INSERT = '''
+    INSERT INTO signals (
+        id, symbol, action, confidence, price, timeframe,
+        take_profit, stop_loss, risk_reward, priority,
+        created_at, market_context, payload
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    # Champs d'un signal sans colonne dédiée, relus depuis l'encodage binaire (payload)
+    SIGNAL_PAYLOAD_FIELDS = (
+        'indicators', 'patterns', 'recommendations', 'volume_analysis', 'volume_change', 'ml_prediction',
+        'max_risk_pct', 'risk_profile', 'position_sizing'
+    )
+
+    @staticmethod
+    def _signal_row(signal, market_context_json: str = None) -> Tuple:
+        """Paramètres d'insertion d'un signal (indicateurs, patterns, ML et recommandations encodés en binaire)"""
+        record = signal if isinstance(signal, SignalRecord) else SignalRecord.from_dict(signal)
+        return (
+            record.id,
+            record.symbol,
+            record.action,
+            record.confidence,
+            record.price,
+            record.timeframe,
+            record.take_profit,
+            record.stop_loss,
+            record.risk_reward,
+            record.priority,
+            record.timestamp,
+            market_context_json if market_context_json is not None else json.dumps(record.market_context),
+            record.encode()
+        )
+
+    @timed_operation(DB_QUERY_SECONDS)
     def save_signal(self, signal: Dict) -> bool:
         """Sauvegarde un signal en base de données"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                INSERT OR REPLACE INTO signals (
-                    id, symbol, action, confidence, price, timeframe,
-                    take_profit, stop_loss, risk_reward, priority,
-                    created_at, indicators, patterns, recommendations, market_context
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    signal['id'],
-                    signal['symbol'],
-                    signal['action'],
-                    signal['confidence'],
-                    signal['price'],
-                    signal['timeframe'],
-                    signal.get('take_profit'),
-                    signal.get('stop_loss'),
-                    signal.get('risk_reward'),
-                    signal.get('priority', 'MEDIUM'),
-                    signal['timestamp'],
-                    json.dumps(signal.get('indicators', {})),
-                    json.dumps(signal.get('patterns', {})),
-                    json.dumps(signal.get('recommendations', [])),
-                    json.dumps(signal.get('market_context', {}))
-                ))
+                cursor.execute(self.SIGNAL_INSERT, self._signal_row(signal))
                 conn.commit()
                 return True
 
@@ -273,6 +303,61 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la sauvegarde du signal {signal.get('id', 'unknown')}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
+    def save_signals(self, signals: List[Dict]) -> List[Dict]:
+        """
+        Sauvegarde les signaux d'un cycle, en une seule transaction si possible
+
+        Si la transaction groupée échoue (collision d'identifiant, contrainte),
+        les signaux sont réinsérés un par un: seuls ceux en erreur sont
+        écartés, avec leur identifiant dans les logs.
+
+        Args:
+            signals: Signaux à enregistrer
+
+        Returns:
+            List[Dict]: Signaux effectivement enregistrés, dans l'ordre reçu
+        """
+        if not signals:
+            return []
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                # Le contexte de marché est partagé par les signaux d'un cycle: encodé une seule fois
+                contexts = {}
+                rows = []
+                for signal in signals:
+                    context = signal.get('market_context', {})
+                    if id(context) not in contexts:
+                        contexts[id(context)] = json.dumps(context)
+                    rows.append(self._signal_row(signal, contexts[id(context)]))
+
+                try:
+                    cursor.executemany(self.SIGNAL_INSERT, rows)
+                    conn.commit()
+                    return list(signals)
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    logging.warning(f"Sauvegarde groupée de {len(signals)} signaux en échec ({e}), "
+                                    f"insertion un par un")
+
+                saved = []
+                for signal, row in zip(signals, rows):
+                    try:
+                        cursor.execute(self.SIGNAL_INSERT, row)
+                        conn.commit()
+                        saved.append(signal)
+                    except sqlite3.Error as e:
+                        conn.rollback()
+                        logging.error(f"Erreur lors de la sauvegarde du signal {signal.get('id', 'unknown')}: {e}")
+                return saved
+
+        except Exception as e:
+            logging.error(f"Erreur lors de la sauvegarde de {len(signals)} signaux: {e}")
+            return []
+
+    @timed_operation(DB_QUERY_SECONDS)
     def get_signals(self, limit: int = 50, symbol: str = None, days: int = 7) -> List[Dict]:
         """Récupère les signaux récents"""
         try:
@@ -307,6 +392,14 @@ class DatabaseManager:
                                 signal[field] = json.loads(signal[field])
                             except:
                                 signal[field] = {}
+
+                    # Signaux encodés par SignalRecord (les anciennes lignes gardent leurs colonnes JSON)
+                    payload = signal.pop('payload', None)
+                    if payload:
+                        record = SignalRecord.decode(payload, signal['id'], signal['created_at'], signal['symbol'],
+                                                     signal['timeframe'], signal.get('market_context') or {})
+                        for field in self.SIGNAL_PAYLOAD_FIELDS:
+                            signal[field] = record[field]
                     signals.append(signal)
 
                 return signals
@@ -315,6 +408,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération des signaux: {e}")
             return []
 
+    @timed_operation(DB_QUERY_SECONDS)
     def update_signal_performance(self, signal_id: str, outcome: str, profit_loss: float) -> bool:
         """Met à jour la performance d'un signal"""
         try:
@@ -332,8 +426,93 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la mise à jour de performance du signal {signal_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
+    def get_open_signals(self, days: int = 30) -> List[Dict]:
+        """Signaux BUY/SELL pas encore évalués, avec take profit et stop loss, du plus ancien au plus récent"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                SELECT id, symbol, action, price, timeframe, take_profit, stop_loss, created_at
+                FROM signals
+                WHERE performance_updated = 0 AND created_at > ?
+                    AND action IN ('BUY', 'SELL') AND take_profit IS NOT NULL AND stop_loss IS NOT NULL
+                ORDER BY created_at
+                ''', (datetime.utcnow() - timedelta(days=days),))
+
+                columns = [description[0] for description in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        except Exception as e:
+            logging.error(f"Erreur lors de la récupération des signaux ouverts: {e}")
+            return []
+
+    @timed_operation(DB_QUERY_SECONDS)
+    def update_signal_outcomes(self, outcomes: List[Tuple[str, str, float]]) -> int:
+        """
+        Enregistre le résultat de plusieurs signaux en une seule transaction
+
+        Args:
+            outcomes: Tuples (signal_id, résultat, profit/perte en %)
+
+        Returns:
+            int: Nombre de signaux mis à jour
+        """
+        if not outcomes:
+            return 0
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                UPDATE signals
+                SET actual_outcome = ?, profit_loss = ?, performance_updated = 1
+                WHERE id = ?
+                ''', [(outcome, profit_loss, signal_id) for signal_id, outcome, profit_loss in outcomes])
+                conn.commit()
+                return cursor.rowcount
+
+        except Exception as e:
+            logging.error(f"Erreur lors de l'enregistrement des résultats de {len(outcomes)} signaux: {e}")
+            return 0
+
+    @timed_operation(DB_QUERY_SECONDS)
+    def get_signal_outcome_stats(self, days: int = 7) -> Dict:
+        """Taux de réussite réel des signaux évalués sur la période"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                SELECT
+                    COUNT(*) as evaluated,
+                    SUM(CASE WHEN actual_outcome = 'profitable' THEN 1 ELSE 0 END) as profitable,
+                    SUM(CASE WHEN actual_outcome = 'loss' THEN 1 ELSE 0 END) as losses,
+                    SUM(CASE WHEN actual_outcome = 'expired' THEN 1 ELSE 0 END) as expired,
+                    AVG(profit_loss) as avg_profit_loss
+                FROM signals
+                WHERE performance_updated = 1 AND created_at > ?
+                ''', (datetime.utcnow() - timedelta(days=days),))
+
+                evaluated, profitable, losses, expired, avg_profit_loss = cursor.fetchone()
+                evaluated = evaluated or 0
+
+                return {
+                    'period_days': days,
+                    'evaluated': evaluated,
+                    'profitable': profitable or 0,
+                    'losses': losses or 0,
+                    'expired': expired or 0,
+                    'win_rate': (profitable / evaluated * 100) if evaluated else 0,
+                    'avg_profit_loss': round(avg_profit_loss or 0, 2)
+                }
+
+        except Exception as e:
+            logging.error(f"Erreur lors du calcul du taux de réussite: {e}")
+            return {}
+
     # GESTION DES PORTFOLIOS
 
+    @timed_operation(DB_QUERY_SECONDS)
     def add_portfolio_position(self, user_id: int, symbol: str, quantity: float, entry_price: float) -> bool:
         """Ajoute une position au portfolio d'un utilisateur"""
         try:
@@ -350,6 +529,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de l'ajout de position pour {user_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_user_portfolio(self, user_id: int) -> List[Dict]:
         """Récupère le portfolio d'un utilisateur"""
         try:
@@ -370,6 +550,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération du portfolio pour {user_id}: {e}")
             return []
 
+    @timed_operation(DB_QUERY_SECONDS)
     def update_portfolio_prices(self, price_updates: Dict[str, float]) -> bool:
         """Met à jour les prix actuels des positions en portfolio"""
         try:
@@ -392,6 +573,7 @@ class DatabaseManager:
 
     # GESTION DES TRANSACTIONS
 
+    @timed_operation(DB_QUERY_SECONDS)
     def add_transaction(self, user_id: int, transaction_type: str, amount: float, description: str = None) -> bool:
         """Ajoute une transaction"""
         try:
@@ -416,6 +598,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de l'ajout de transaction pour {user_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_user_transactions(self, user_id: int, limit: int = 50) -> List[Dict]:
         """Récupère les transactions d'un utilisateur"""
         try:
@@ -439,6 +622,7 @@ class DatabaseManager:
 
     # GESTION DES ALERTES
 
+    @timed_operation(DB_QUERY_SECONDS)
     def add_user_alert(self, user_id: int, symbol: str, alert_type: str, target_price: float = None, condition_type: str = None) -> bool:
         """Ajoute une alerte utilisateur"""
         try:
@@ -455,6 +639,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de l'ajout d'alerte pour {user_id}: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_active_alerts(self) -> List[Dict]:
         """Récupère toutes les alertes actives"""
         try:
@@ -477,6 +662,7 @@ class DatabaseManager:
 
     # STATISTIQUES ET RAPPORTS
 
+    @timed_operation(DB_QUERY_SECONDS)
     def save_daily_stats(self, stats: Dict) -> bool:
         """Sauvegarde les statistiques quotidiennes"""
         try:
@@ -504,6 +690,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la sauvegarde des statistiques: {e}")
             return False
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_performance_stats(self, days: int = 30) -> Dict:
         """Récupère les statistiques de performance"""
         try:
@@ -553,6 +740,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération des statistiques: {e}")
             return {}
 
+    @timed_operation(DB_QUERY_SECONDS)
     def log_activity(self, user_id: int, action: str, details: str = None, ip_address: str = None):
         """Enregistre une activité utilisateur"""
         try:
@@ -567,6 +755,7 @@ class DatabaseManager:
         except Exception as e:
             logging.error(f"Erreur lors de l'enregistrement de l'activité: {e}")
 
+    @timed_operation(DB_QUERY_SECONDS)
     def cleanup_old_data(self, days_to_keep: int = 90):
         """Nettoyage des anciennes données"""
         try:
@@ -593,6 +782,7 @@ class DatabaseManager:
         except Exception as e:
             logging.error(f"Erreur lors du nettoyage des données: {e}")
 
+    @timed_operation(DB_QUERY_SECONDS)
     def get_database_stats(self) -> Dict:
         """Récupère les statistiques de la base de données"""
         try:
@@ -617,6 +807,7 @@ class DatabaseManager:
             logging.error(f"Erreur lors de la récupération des statistiques de la DB: {e}")
             return {}
 
+    @timed_operation(DB_QUERY_SECONDS)
     def backup_database(self, backup_path: str = None) -> bool:
         """Créer une sauvegarde de la base de données"""
         try:
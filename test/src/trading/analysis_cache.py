@@ -0,0 +1,188 @@
+# Cache des résultats d'analyse aligné sur la clôture des bougies
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.trading.candle_store import timeframe_origin_ms, timeframe_to_ms
+
+# Clé d'une entrée: (symbole, timeframe, nombre de bougies, origine des bougies)
+CacheKey = Tuple[str, str, int, str]
+
+
+def analysis_key(symbol: str, timeframe: str, limit: int, resampled: bool = False, scanned: bool = False) -> CacheKey:
+    """
+    Clé d'une analyse
+
+    Le nombre de bougies et leur origine (klines natives de l'exchange ou
+    agrégées depuis un timeframe inférieur) font partie de la clé: ces
+    analyses ne donnent pas le même résultat et ne doivent pas se remplacer.
+    Les analyses du scan de marché, calculées sans moteur d'indicateurs
+    chaud, ont leur propre origine et ne sont jamais servies à analyze_symbol.
+    """
+    if scanned:
+        return symbol, timeframe, limit, 'scan'
+    return symbol, timeframe, limit, 'resampled' if resampled else 'native'
+
+
+def next_bar_close_ms(timeframe: str, now_ms: int = None) -> int:
+    """Timestamp (ms) de clôture de la bougie en cours"""
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+
+    timeframe_ms = timeframe_to_ms(timeframe)
+    origin = timeframe_origin_ms(timeframe)
+    return now_ms - (now_ms - origin) % timeframe_ms + timeframe_ms
+
+
+class AnalysisCache:
+    """
+    Mémoïsation des analyses par (symbole, timeframe, bougies, origine)
+
+    Une entrée reste valide jusqu'à la clôture de la bougie en cours. Les
+    demandes simultanées d'une même clé partagent un seul calcul, et le nombre
+    d'entrées est borné par une éviction LRU.
+    """
+
+    def __init__(self, max_entries: int = 512,
+                 cacheable: Callable[[Any], bool] = lambda value: True):
+        """
+        Args:
+            max_entries (int): Nombre maximum d'entrées conservées
+            cacheable: Prédicat indiquant si un résultat peut être mis en cache
+        """
+        self.max_entries = max_entries
+        self.cacheable = cacheable
+
+        self._entries: 'OrderedDict[CacheKey, Tuple[int, Any]]' = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Pourcentage de demandes servies sans nouveau calcul"""
+        served = self.stats['hits'] + self.stats['coalesced']
+        total = served + self.stats['misses']
+        return served / total * 100 if total else 0.0
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Valeur en cache si elle est encore valide, sans compter de statistiques"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if int(time.time() * 1000) >= expires_at:
+            del self._entries[key]
+            self.stats['expirations'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: CacheKey, value: Any):
+        """Enregistre une valeur valable jusqu'à la clôture de la bougie en cours"""
+        if not self.cacheable(value):
+            return
+
+        self._entries[key] = (next_bar_close_ms(key[1]), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, symbol: str = None, timeframe: str = None):
+        """Supprime les entrées dont le symbole et le timeframe correspondent aux filtres"""
+        for key in list(self._entries):
+            if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                del self._entries[key]
+
+    async def get_or_compute(self, key: CacheKey, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Valeur en cache, ou calculée une seule fois pour tous les appelants"""
+        results = await self.get_or_compute_many([key], lambda missing: self._compute_one(compute))
+        return results[0]
+
+    async def get_or_compute_many(self, keys: Sequence[CacheKey],
+                                  compute_many: Callable[[List[CacheKey]], Awaitable[List[Any]]]) -> List[Any]:
+        """
+        Variante groupée: seules les clés absentes sont calculées, en un appel
+
+        Args:
+            keys: Clés (voir analysis_key) demandées
+            compute_many: Coroutine `compute_many(missing_keys)` renvoyant les
+                valeurs dans l'ordre des clés manquantes
+
+        Returns:
+            list: Valeurs dans l'ordre des clés
+        """
+        results: Dict[CacheKey, Any] = {}
+        waiting: Dict[CacheKey, asyncio.Future] = {}
+        missing: List[CacheKey] = []
+
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is not None:
+                self.stats['hits'] += 1
+                results[key] = value
+            elif key in self._inflight:
+                self.stats['coalesced'] += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.stats['misses'] += 1
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+
+            try:
+                values = await compute_many(missing)
+                for key, value in zip(missing, values):
+                    self.put(key, value)
+                    futures[key].set_result(value)
+                    results[key] = value
+            except BaseException as e:
+                for future in futures.values():
+                    if future.done():
+                        continue
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        # L'exception est relancée ici, les autres appelants la reçoivent aussi
+                        future.set_exception(e)
+                        future.exception()
+                raise
+            finally:
+                for key in missing:
+                    self._inflight.pop(key, None)
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+
+        return [results[key] for key in keys]
+
+    @staticmethod
+    async def _compute_one(compute: Callable[[], Awaitable[Any]]) -> List[Any]:
+        return [await compute()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hit_rate': self.hit_rate
+        }
@@ -0,0 +1,494 @@
+# Calculs d'analyse purs: indicateurs, patterns, volume, ML et signal final
+
+import logging
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+
+from market_core.levels import SupportResistanceIndex
+from src.trading.candles import Candles
+from src.trading.indicators import IndicatorEngine, compute_indicators_batch
+from src.trading.ml_model import SIGNAL_LABELS
+from src.trading.patterns import DOUBLE_PATTERN_WINDOW, classify_patterns, detect_double_patterns, patterns_at
+from src.trading.volume import classify_volume
+from src.utils.metrics import ANALYSIS_STAGE_SECONDS, timed
+
+
+class AnalysisCore:
+    """
+    Analyse de bougies déjà récupérées, sans réseau ni cache
+
+    Base de TradingAnalyzer; les processus du scan de marché
+    (market_scanner) n'instancient que cette partie.
+    """
+
+    # Nombre minimum de bougies pour passer par l'analyse vectorisée
+    MIN_BATCH_CANDLES = 60
+
+    def __init__(self, indicators_config: Dict, ml_model=None):
+        """
+        Args:
+            indicators_config (dict): Périodes des indicateurs (voir IndicatorEngine)
+            ml_model: Modèle ML entraîné (voir ml_model.py), None pour désactiver le ML
+        """
+        self.indicators_config = indicators_config
+        self.ml_model = ml_model
+
+        # Moteurs d'indicateurs incrémentaux par (symbole, timeframe)
+        self.indicator_engines = {}
+
+    def _analyze_ohlcv(self, symbol, timeframe, ohlcv):
+        """Analyse d'une série de bougies déjà récupérée"""
+        # Colonnes NumPy contiguës, sans DataFrame
+        with timed(ANALYSIS_STAGE_SECONDS, stage='candles'):
+            candles = Candles.from_ohlcv(ohlcv)
+
+        # Calcul des indicateurs techniques
+        with timed(ANALYSIS_STAGE_SECONDS, stage='indicators'):
+            indicators = self._calculate_indicators(candles, (symbol, timeframe))
+
+        # Analyse des patterns
+        with timed(ANALYSIS_STAGE_SECONDS, stage='patterns'):
+            patterns = self._detect_patterns(candles, indicators)
+
+        # Analyse de volume
+        with timed(ANALYSIS_STAGE_SECONDS, stage='volume'):
+            volume_analysis = self._analyze_volume(candles)
+
+        # Signal de machine learning
+        with timed(ANALYSIS_STAGE_SECONDS, stage='ml_prediction'):
+            ml_signal = self._get_ml_prediction(candles, indicators, patterns)
+
+        # Calcul du signal final
+        with timed(ANALYSIS_STAGE_SECONDS, stage='final_signal'):
+            final_signal = self._calculate_final_signal(indicators, patterns, volume_analysis, ml_signal)
+
+        # Niveaux pivots maintenus par le moteur d'indicateurs de la série
+        price = float(candles.close[-1])
+        engine = self.indicator_engines.get((symbol, timeframe))
+        levels = engine.levels.nearest(price) if engine is not None else None
+
+        return self._build_analysis(symbol, timeframe, price, indicators,
+                                    patterns, volume_analysis, ml_signal, final_signal, levels)
+
+    def _analyze_batch(self, stacked, keys=None):
+        """
+        Indicateurs, patterns, volume et features ML d'un tableau de bougies alignées (N x T x 6)
+
+        Les lignes dont la clé (symbole, timeframe) de `keys` a déjà un moteur
+        d'indicateurs réutilisent son état incrémental; le calcul vectorisé,
+        qui reparcourt toute la série, est réservé aux autres lignes.
+        """
+        opens, highs, lows, closes, volumes = (stacked[:, :, column] for column in range(1, 6))
+
+        with timed(ANALYSIS_STAGE_SECONDS, stage='batch_indicators'):
+            engines = [self.indicator_engines.get(key) for key in keys] if keys else [None] * len(stacked)
+            indicators_list = [
+                engine.sync(stacked[row, :, 0], highs[row], lows[row], closes[row]) if engine is not None else None
+                for row, engine in enumerate(engines)
+            ]
+
+            cold = [row for row, engine in enumerate(engines) if engine is None]
+            if cold:
+                cold_indicators = compute_indicators_batch(highs[cold], lows[cold], closes[cold], self.indicators_config)
+                for position, row in enumerate(cold):
+                    indicators_list[row] = {name: float(values[position]) for name, values in cold_indicators.items()}
+
+            batch_indicators = {
+                name: np.array([indicators[name] for indicators in indicators_list], dtype=np.float64)
+                for name in indicators_list[0]
+            }
+
+        with timed(ANALYSIS_STAGE_SECONDS, stage='batch_patterns'):
+            patterns = self._detect_patterns_batch(highs, lows, batch_indicators)
+
+        with timed(ANALYSIS_STAGE_SECONDS, stage='batch_volume'):
+            volume = self._analyze_volume_batch(closes, volumes)
+
+        return {
+            'highs': highs,
+            'lows': lows,
+            'closes': closes,
+            'indicators': batch_indicators,
+            'indicators_list': indicators_list,
+            'engines': engines,
+            'patterns': patterns,
+            'volume': volume,
+            'features': [
+                self._prepare_features({'close': closes[row]}, indicators_list[row], patterns_at(patterns, row))
+                for row in range(len(stacked))
+            ]
+        }
+
+    def _finalize_batch(self, symbols, timeframe, stage, ml_signals):
+        """Signal final et résultats d'un groupe analysé par _analyze_batch"""
+        closes, batch_patterns, batch_volume = stage['closes'], stage['patterns'], stage['volume']
+        final_signals = self._calculate_final_signal_batch(stage['indicators'], batch_patterns, batch_volume, ml_signals)
+
+        analyses = []
+        for row, symbol in enumerate(symbols):
+            patterns = patterns_at(batch_patterns, row)
+            volume_analysis = classify_volume(float(batch_volume['volume_ratio'][row]), float(batch_volume['vpt'][row]))
+            # Niveaux pivots du moteur chaud, comme analyze_symbol; sinon des bougies clôturées de la fenêtre
+            engine = stage['engines'][row]
+            if engine is not None:
+                levels = engine.levels
+            else:
+                levels = SupportResistanceIndex.from_history(stage['highs'][row, :-1], stage['lows'][row, :-1])
+            analyses.append(self._build_analysis(
+                symbol, timeframe, float(closes[row, -1]), stage['indicators_list'][row],
+                patterns, volume_analysis, ml_signals[row], final_signals[row],
+                levels.nearest(float(closes[row, -1]))
+            ))
+
+        return analyses
+
+    def _build_analysis(self, symbol, timeframe, price, indicators, patterns, volume_analysis, ml_signal, final_signal,
+                        levels=None):
+        """Assemblage du résultat d'analyse d'un symbole"""
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'timestamp': datetime.utcnow(),
+            'price': price,
+            'signal': final_signal['action'],
+            'confidence': final_signal['confidence'],
+            'indicators': indicators,
+            'patterns': patterns,
+            'volume_analysis': volume_analysis,
+            'ml_prediction': ml_signal,
+            'take_profit': final_signal.get('take_profit'),
+            'stop_loss': final_signal.get('stop_loss'),
+            'risk_reward': final_signal.get('risk_reward', 0),
+            'levels': levels or {'supports': [], 'resistances': []}
+        }
+
+    def _calculate_indicators(self, candles, key=None):
+        """
+        Calcul des indicateurs techniques
+
+        Les indicateurs sont maintenus de façon incrémentale par un moteur propre
+        à chaque (symbole, timeframe): seules les nouvelles bougies sont intégrées.
+        Sans clé, un moteur temporaire est recalculé sur toute la série.
+        """
+        try:
+            engine = self.indicator_engines.get(key) if key is not None else None
+            if engine is None:
+                engine = IndicatorEngine(self.indicators_config)
+                if key is not None:
+                    self.indicator_engines[key] = engine
+
+            return engine.sync(candles.timestamps, candles.high, candles.low, candles.close)
+
+        except Exception as e:
+            logging.error(f"Erreur lors du calcul des indicateurs: {e}")
+            return {}
+
+    def _detect_patterns(self, candles, indicators):
+        """Détection des patterns de trading"""
+        patterns = {
+            'bullish_patterns': [],
+            'bearish_patterns': [],
+            'continuation_patterns': [],
+            'reversal_patterns': []
+        }
+
+        try:
+            # Mêmes règles que l'historique complet, évaluées sur la dernière bougie
+            double_top, double_bottom = detect_double_patterns(
+                candles.high[-DOUBLE_PATTERN_WINDOW:], candles.low[-DOUBLE_PATTERN_WINDOW:]
+            )
+            values = {name: np.array([value], dtype=np.float64) for name, value in indicators.items()}
+
+            return patterns_at(classify_patterns(values, double_top[-1:], double_bottom[-1:]))
+
+        except Exception as e:
+            logging.error(f"Erreur lors de la détection des patterns: {e}")
+            return patterns
+
+    def _analyze_volume(self, candles):
+        """Analyse du volume de trading"""
+        try:
+            volume, close = candles.volume, candles.close
+            recent_volume = volume[-10:].mean()
+            long_term_volume = volume[-50:].mean()
+
+            volume_ratio = float(recent_volume / long_term_volume) if long_term_volume > 0 else 1
+
+            # Volume Price Trend tel que calculé par ta (somme des deux derniers termes)
+            price_change = (close[-2:] - close[-3:-1]) / close[-3:-1]
+            vpt = float((volume[-2:] * price_change).sum())
+
+            return classify_volume(volume_ratio, vpt)
+
+        except Exception as e:
+            logging.error(f"Erreur lors de l'analyse du volume: {e}")
+            return classify_volume(np.nan, np.nan)
+
+    def _detect_patterns_batch(self, highs, lows, indicators):
+        """
+        Détection vectorisée des patterns sur la dernière bougie de chaque symbole
+
+        Returns:
+            dict: Par catégorie, liste ordonnée de (nom du pattern, masque booléen par symbole)
+        """
+        double_top, double_bottom = detect_double_patterns(
+            highs[:, -DOUBLE_PATTERN_WINDOW:], lows[:, -DOUBLE_PATTERN_WINDOW:]
+        )
+        return classify_patterns(indicators, double_top[:, -1], double_bottom[:, -1])
+
+    def _analyze_volume_batch(self, closes, volumes):
+        """Analyse vectorisée du volume (mêmes règles que _analyze_volume)"""
+        recent_volume = volumes[:, -10:].mean(axis=1)
+        long_term_volume = volumes[:, -50:].mean(axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(long_term_volume > 0, recent_volume / long_term_volume, 1.0)
+
+            # Volume Price Trend tel que calculé par ta (somme des deux derniers termes)
+            price_change = (closes[:, -2:] - closes[:, -3:-1]) / closes[:, -3:-1]
+            vpt = (volumes[:, -2:] * price_change).sum(axis=1)
+
+        return {'volume_ratio': volume_ratio, 'vpt': vpt}
+
+    def _get_ml_prediction(self, candles, indicators, patterns=None):
+        """Prédiction utilisant le machine learning"""
+        if self.ml_model is None:
+            return {'prediction': 'HOLD', 'confidence': 0.5}
+
+        return self._get_ml_predictions([self._prepare_features(candles, indicators, patterns)])[0]
+
+    def _get_ml_predictions(self, features_list):
+        """
+        Prédictions ML groupées
+
+        Toutes les lignes de features passent dans un seul appel predict_proba;
+        la classe prédite est déduite des probabilités.
+        """
+        predictions = [{'prediction': 'HOLD', 'confidence': 0.5} for _ in features_list]
+        rows = [i for i, features in enumerate(features_list) if len(features) > 0]
+
+        if self.ml_model is None or not rows:
+            return predictions
+
+        try:
+            labels = [SIGNAL_LABELS[int(label)] for label in self.ml_model.classes_]
+            probas = self.ml_model.predict_proba(np.asarray([features_list[i] for i in rows], dtype=np.float64))
+
+            for i, prediction_proba in zip(rows, probas):
+                probabilities = dict(zip(labels, prediction_proba.tolist()))
+                prediction = max(probabilities, key=probabilities.get)
+
+                predictions[i] = {
+                    'prediction': prediction,
+                    'confidence': probabilities[prediction],
+                    'probabilities': {
+                        'sell': probabilities.get('SELL', 0),
+                        'hold': probabilities.get('HOLD', 0),
+                        'buy': probabilities.get('BUY', 0)
+                    }
+                }
+
+        except Exception as e:
+            logging.error(f"Erreur lors de la prédiction ML: {e}")
+
+        return predictions
+
+    def _prepare_features(self, candles, indicators, patterns=None):
+        """
+        Préparation des features pour le ML (`candles`: Candles ou dict avec 'close')
+
+        `patterns` (format de _detect_patterns) donne l'équilibre entre patterns
+        haussiers et baissiers de la dernière bougie.
+        """
+        try:
+            close = np.asarray(candles['close'], dtype=np.float64)
+            patterns = patterns or {}
+            features = [
+                indicators.get('rsi', 50) / 100,
+                indicators.get('macd', 0),
+                indicators.get('bb_position', 0.5),
+                indicators.get('stoch_k', 50) / 100,
+                indicators.get('adx', 20) / 100,
+                indicators.get('volume_ratio', 1),
+                (close[-1] - close[-2]) / close[-2],  # Price change
+                len(patterns.get('bullish_patterns', [])) - len(patterns.get('bearish_patterns', []))
+            ]
+
+            return [f if not np.isnan(f) else 0 for f in features]
+
+        except Exception as e:
+            logging.error(f"Erreur lors de la préparation des features: {e}")
+            return []
+
+    def _calculate_final_signal(self, indicators, patterns, volume_analysis, ml_signal):
+        """Calcul du signal final basé sur tous les indicateurs"""
+        try:
+            signals = []
+            weights = []
+
+            # Signal RSI
+            rsi = indicators.get('rsi', 50)
+            if rsi < 30:
+                signals.append(1)  # BUY
+                weights.append(0.15)
+            elif rsi > 70:
+                signals.append(-1)  # SELL
+                weights.append(0.15)
+            else:
+                signals.append(0)  # HOLD
+                weights.append(0.05)
+
+            # Signal MACD
+            if indicators.get('macd', 0) > indicators.get('macd_signal', 0):
+                signals.append(1)
+                weights.append(0.2)
+            else:
+                signals.append(-1)
+                weights.append(0.2)
+
+            # Signal EMA
+            if indicators.get('ema_9', 0) > indicators.get('ema_21', 0):
+                signals.append(1)
+                weights.append(0.15)
+            else:
+                signals.append(-1)
+                weights.append(0.15)
+
+            # Signal Patterns
+            bullish_count = len(patterns.get('bullish_patterns', []))
+            bearish_count = len(patterns.get('bearish_patterns', []))
+
+            if bullish_count > bearish_count:
+                signals.append(1)
+                weights.append(0.2)
+            elif bearish_count > bullish_count:
+                signals.append(-1)
+                weights.append(0.2)
+            else:
+                signals.append(0)
+                weights.append(0.1)
+
+            # Signal Volume
+            if volume_analysis.get('volume_confirmation', False):
+                signals.append(1 if volume_analysis.get('volume_ratio', 1) > 1 else -1)
+                weights.append(0.1)
+            else:
+                signals.append(0)
+                weights.append(0.05)
+
+            # Signal ML
+            ml_pred = ml_signal.get('prediction', 'HOLD')
+            ml_conf = ml_signal.get('confidence', 0.5)
+
+            if ml_pred == 'BUY':
+                signals.append(1)
+                weights.append(0.2 * ml_conf)
+            elif ml_pred == 'SELL':
+                signals.append(-1)
+                weights.append(0.2 * ml_conf)
+            else:
+                signals.append(0)
+                weights.append(0.1)
+
+            # Calcul du signal pondéré
+            if sum(weights) > 0:
+                weighted_signal = sum(s * w for s, w in zip(signals, weights)) / sum(weights)
+            else:
+                weighted_signal = 0
+
+            # Détermination de l'action finale
+            if weighted_signal > 0.3:
+                action = 'BUY'
+                confidence = min(95, abs(weighted_signal) * 100)
+            elif weighted_signal < -0.3:
+                action = 'SELL'
+                confidence = min(95, abs(weighted_signal) * 100)
+            else:
+                action = 'HOLD'
+                confidence = 50
+
+            result = {
+                'action': action,
+                'confidence': confidence,
+                'weighted_signal': weighted_signal
+            }
+
+            # Calcul des niveaux de Take Profit et Stop Loss
+            self._add_risk_levels(result, indicators.get('current_price', 0))
+
+            return result
+
+        except Exception as e:
+            logging.error(f"Erreur lors du calcul du signal final: {e}")
+            return {'action': 'HOLD', 'confidence': 0}
+
+    def _calculate_final_signal_batch(self, indicators, patterns, volume, ml_signals):
+        """Calcul vectorisé du signal final (mêmes pondérations que _calculate_final_signal)"""
+        rsi = indicators['rsi']
+        bullish_count = sum(mask.astype(int) for _, mask in patterns['bullish_patterns'])
+        bearish_count = sum(mask.astype(int) for _, mask in patterns['bearish_patterns'])
+        volume_confirmation = volume['volume_ratio'] > 1.1
+        ml_pred = np.array([ml.get('prediction', 'HOLD') for ml in ml_signals])
+        ml_conf = np.array([ml.get('confidence', 0.5) for ml in ml_signals], dtype=np.float64)
+
+        signals = np.column_stack([
+            np.select([rsi < 30, rsi > 70], [1, -1], 0),
+            np.where(indicators['macd'] > indicators['macd_signal'], 1, -1),
+            np.where(indicators['ema_9'] > indicators['ema_21'], 1, -1),
+            np.sign(bullish_count - bearish_count),
+            np.where(volume_confirmation, np.where(volume['volume_ratio'] > 1, 1, -1), 0),
+            np.select([ml_pred == 'BUY', ml_pred == 'SELL'], [1, -1], 0)
+        ])
+        weights = np.column_stack([
+            np.where((rsi < 30) | (rsi > 70), 0.15, 0.05),
+            np.full(len(rsi), 0.2),
+            np.full(len(rsi), 0.15),
+            np.where(bullish_count != bearish_count, 0.2, 0.1),
+            np.where(volume_confirmation, 0.1, 0.05),
+            np.where(np.isin(ml_pred, ['BUY', 'SELL']), 0.2 * ml_conf, 0.1)
+        ])
+
+        weighted_signal = (signals * weights).sum(axis=1) / weights.sum(axis=1)
+
+        results = []
+        for row, value in enumerate(weighted_signal):
+            value = float(value)
+            if value > 0.3:
+                action, confidence = 'BUY', min(95, abs(value) * 100)
+            elif value < -0.3:
+                action, confidence = 'SELL', min(95, abs(value) * 100)
+            else:
+                action, confidence = 'HOLD', 50
+
+            result = {'action': action, 'confidence': confidence, 'weighted_signal': value}
+            self._add_risk_levels(result, 0)
+            results.append(result)
+
+        return results
+
+    def _add_risk_levels(self, result, current_price):
+        """Ajoute les niveaux de Take Profit et Stop Loss à un signal"""
+        action = result['action']
+
+        if action != 'HOLD' and current_price > 0:
+            if action == 'BUY':
+                result['take_profit'] = current_price * 1.03  # 3% profit
+                result['stop_loss'] = current_price * 0.98    # 2% loss
+                result['risk_reward'] = 1.5
+            else:  # SELL
+                result['take_profit'] = current_price * 0.97  # 3% profit sur short
+                result['stop_loss'] = current_price * 1.02    # 2% loss sur short
+                result['risk_reward'] = 1.5
+
+    def _get_error_response(self, symbol, error_msg):
+        """Response d'erreur standardisée"""
+        return {
+            'symbol': symbol,
+            'timestamp': datetime.utcnow(),
+            'error': True,
+            'error_message': error_msg,
+            'signal': 'HOLD',
+            'confidence': 0
+        }
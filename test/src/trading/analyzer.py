@@ -1,19 +1,32 @@
 # Module d'analyse technique avancée pour le trading automatisé
 
-import ccxt
-import pandas as pd
+import os
+import aiohttp
+import ccxt.async_support as ccxt
 import numpy as np
-import ta
 from datetime import datetime, timedelta
 import logging
 import asyncio
+import time
 import yfinance as yf
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.ensemble import RandomForestClassifier
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from src.trading.analysis_cache import AnalysisCache, analysis_key
+from src.trading.analysis_core import AnalysisCore
+from src.trading.candle_store import CandleStore, resample_ohlcv, timeframe_to_ms
+from market_core.ohlcv_cache import OHLCVDiskCache
+from src.trading.ml_model import load_latest_model
+from src.trading.rate_limiter import RequestScheduler, binance_request_weight
+from src.utils.metrics import ANALYSIS_STAGE_SECONDS, EXCHANGE_ERRORS, EXCHANGE_REQUEST_SECONDS, timed
+
+class TradingAnalyzer(AnalysisCore):
+    # Nombre de bougies d'une analyse unitaire (analyze_symbol)
+    DEFAULT_LIMIT = 200
+    # Bougies du plus grand timeframe reconstruit demandées au réseau au démarrage à froid
+    # (chauffe de l'EMA 50, du MACD et de l'ADX); le cache disque fournit le reste de l'historique
+    RESAMPLE_WARMUP = 60
 
-class TradingAnalyzer:
     def __init__(self):
         """Initialisation de l'analyseur de trading"""
         self.exchanges = {
@@ -21,34 +34,70 @@ class TradingAnalyzer:
                 'apiKey': os.getenv('BINANCE_API_KEY'),
                 'secret': os.getenv('BINANCE_SECRET_KEY'),
                 'sandbox': False,
-                'enableRateLimit': True,
+                # Les limites sont gérées par self.request_scheduler
+                'enableRateLimit': False,
+                # Seuls les marchés spot sont analysés
+                'options': {'fetchMarkets': {'types': ['spot']}},
             })
         }
 
+        # Session HTTP partagée (créée à la demande dans la boucle asyncio)
+        self.http_session = None
+        self.http_pool_size = int(os.getenv('HTTP_POOL_SIZE', 20))
+
+        # File d'attente commune des requêtes Binance (poids par minute, priorités)
+        self.request_scheduler = RequestScheduler.for_binance(
+            weight_per_minute=int(os.getenv('BINANCE_WEIGHT_PER_MINUTE', 4800)),
+            requests_per_second=int(os.getenv('BINANCE_REQUESTS_PER_SECOND', 20))
+        )
+
+        # Analyses groupées: téléchargements simultanés et délai par symbole
+        self.fetch_semaphore = asyncio.Semaphore(int(os.getenv('ANALYSIS_CONCURRENCY', 5)))
+        self.symbol_timeout = float(os.getenv('ANALYSIS_SYMBOL_TIMEOUT', 10))
+
+        # Historique persistant des bougies clôturées (désactivé si OHLCV_CACHE_DIR est vide)
+        cache_dir = os.getenv('OHLCV_CACHE_DIR', 'data/ohlcv')
+        self.ohlcv_cache = OHLCVDiskCache(cache_dir) if cache_dir else None
+
+        # Cache incrémental des bougies, source unique pour l'analyse et les prix
+        self.candle_store = CandleStore(
+            self._fetch_candles,
+            capacity=int(os.getenv('CANDLE_STORE_CAPACITY', 500))
+        )
+
         self.timeframes = ['1h', '4h', '1d']
-        self.indicators_config = {
+        # Périodes des indicateurs (moteurs incrémentaux et modèle ML: voir AnalysisCore)
+        super().__init__({
             'rsi_period': int(os.getenv('RSI_PERIOD', 14)),
             'macd_fast': int(os.getenv('MACD_FAST', 12)),
             'macd_slow': int(os.getenv('MACD_SLOW', 26)),
             'macd_signal': int(os.getenv('MACD_SIGNAL', 9)),
             'bb_period': int(os.getenv('BB_PERIOD', 20)),
             'bb_std': float(os.getenv('BB_STD', 2))
-        }
+        })
 
-        self.ml_model = None
+        # Résultats d'analyse partagés jusqu'à la clôture de la bougie en cours
+        self.analysis_cache = AnalysisCache(
+            max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', 1024)),
+            cacheable=lambda analysis: not analysis.get('error', False)
+        )
+
+        self.ml_metadata = None
         self.scaler = MinMaxScaler()
         self._initialize_ml_model()
 
     def _initialize_ml_model(self):
-        """Initialisation du modèle de machine learning"""
+        """Chargement du modèle de machine learning entraîné (voir train_model.py)"""
         try:
-            self.ml_model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            logging.info("Modèle ML initialisé avec succès")
+            model_dir = os.getenv('ML_MODEL_DIR', 'data/models')
+            self.ml_model, self.ml_metadata = load_latest_model(model_dir)
+
+            if self.ml_model is None:
+                logging.warning(f"Aucun modèle ML dans {model_dir}, prédictions ML désactivées")
+            else:
+                logging.info(f"Modèle ML v{self.ml_metadata.get('version')} chargé avec succès")
         except Exception as e:
+            self.ml_model = None
             logging.error(f"Erreur lors de l'initialisation du ML: {e}")
 
     async def analyze_symbol(self, symbol, timeframe='1h'):
@@ -62,439 +111,320 @@ class TradingAnalyzer:
         Returns:
             dict: Résultats de l'analyse
         """
+        return await self.analysis_cache.get_or_compute(
+            analysis_key(symbol, timeframe, self.DEFAULT_LIMIT), lambda: self._run_symbol_analysis(symbol, timeframe)
+        )
+
+    async def _run_symbol_analysis(self, symbol, timeframe):
+        """Analyse d'un symbole sans passer par le cache"""
         try:
             # Récupération des données OHLCV
-            ohlcv = await self._fetch_ohlcv_data(symbol, timeframe)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-
-            # Calcul des indicateurs techniques
-            indicators = self._calculate_indicators(df)
-
-            # Analyse des patterns
-            patterns = self._detect_patterns(df, indicators)
-
-            # Analyse de volume
-            volume_analysis = self._analyze_volume(df)
-
-            # Signal de machine learning
-            ml_signal = self._get_ml_prediction(df, indicators)
-
-            # Calcul du signal final
-            final_signal = self._calculate_final_signal(indicators, patterns, volume_analysis, ml_signal)
-
-            return {
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'timestamp': datetime.utcnow(),
-                'price': float(df['close'].iloc[-1]),
-                'signal': final_signal['action'],
-                'confidence': final_signal['confidence'],
-                'indicators': indicators,
-                'patterns': patterns,
-                'volume_analysis': volume_analysis,
-                'ml_prediction': ml_signal,
-                'take_profit': final_signal.get('take_profit'),
-                'stop_loss': final_signal.get('stop_loss'),
-                'risk_reward': final_signal.get('risk_reward', 0)
-            }
+            ohlcv = await self._fetch_ohlcv_data(symbol, timeframe, self.DEFAULT_LIMIT)
+            return self._analyze_ohlcv(symbol, timeframe, ohlcv)
 
         except Exception as e:
             logging.error(f"Erreur lors de l'analyse de {symbol}: {e}")
             return self._get_error_response(symbol, str(e))
 
-    async def _fetch_ohlcv_data(self, symbol, timeframe, limit=200):
-        """Récupération des données OHLCV"""
-        try:
-            exchange = self.exchanges['binance']
-            ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            return ohlcv
-        except Exception as e:
-            logging.error(f"Erreur lors de la récupération des données pour {symbol}: {e}")
-            raise
-
-    def _calculate_indicators(self, df):
-        """Calcul des indicateurs techniques"""
-        indicators = {}
-
-        try:
-            # RSI
-            indicators['rsi'] = ta.momentum.RSIIndicator(df['close'], window=self.indicators_config['rsi_period']).rsi().iloc[-1]
-
-            # MACD
-            macd = ta.trend.MACD(df['close'],
-                               window_fast=self.indicators_config['macd_fast'],
-                               window_slow=self.indicators_config['macd_slow'],
-                               window_sign=self.indicators_config['macd_signal'])
-            indicators['macd'] = macd.macd().iloc[-1]
-            indicators['macd_signal'] = macd.macd_signal().iloc[-1]
-            indicators['macd_histogram'] = macd.macd_diff().iloc[-1]
-
-            # Bollinger Bands
-            bb = ta.volatility.BollingerBands(df['close'],
-                                            window=self.indicators_config['bb_period'],
-                                            window_dev=self.indicators_config['bb_std'])
-            indicators['bb_upper'] = bb.bollinger_hband().iloc[-1]
-            indicators['bb_middle'] = bb.bollinger_mavg().iloc[-1]
-            indicators['bb_lower'] = bb.bollinger_lband().iloc[-1]
-            indicators['bb_position'] = (df['close'].iloc[-1] - indicators['bb_lower']) / (indicators['bb_upper'] - indicators['bb_lower'])
-
-            # EMA
-            indicators['ema_9'] = ta.trend.EMAIndicator(df['close'], window=9).ema_indicator().iloc[-1]
-            indicators['ema_21'] = ta.trend.EMAIndicator(df['close'], window=21).ema_indicator().iloc[-1]
-            indicators['ema_50'] = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator().iloc[-1]
-
-            # Stochastic
-            stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
-            indicators['stoch_k'] = stoch.stoch().iloc[-1]
-            indicators['stoch_d'] = stoch.stoch_signal().iloc[-1]
-
-            # ADX (Average Directional Index)
-            adx = ta.trend.ADXIndicator(df['high'], df['low'], df['close'])
-            indicators['adx'] = adx.adx().iloc[-1]
-            indicators['di_plus'] = adx.adx_pos().iloc[-1]
-            indicators['di_minus'] = adx.adx_neg().iloc[-1]
-
-            # Support et Résistance
-            support_resistance = self._calculate_support_resistance(df)
-            indicators.update(support_resistance)
-
-            return indicators
+    async def analyze_timeframes(self, symbol, timeframes=None, limit=200):
+        """
+        Analyse multi-timeframes à partir d'une seule série de bougies
 
-        except Exception as e:
-            logging.error(f"Erreur lors du calcul des indicateurs: {e}")
-            return {}
-
-    def _detect_patterns(self, df, indicators):
-        """Détection des patterns de trading"""
-        patterns = {
-            'bullish_patterns': [],
-            'bearish_patterns': [],
-            'continuation_patterns': [],
-            'reversal_patterns': []
-        }
+        Seule la série du plus petit timeframe est récupérée; les timeframes
+        supérieurs sont reconstruits localement par agrégation. Au-delà de
+        RESAMPLE_WARMUP bougies du plus grand timeframe, l'historique n'est
+        lu que dans le cache disque, jamais téléchargé.
 
-        try:
-            current_price = df['close'].iloc[-1]
-            prev_prices = df['close'].iloc[-5:].tolist()
-
-            # Pattern Golden Cross
-            if indicators.get('ema_9', 0) > indicators.get('ema_21', 0) and indicators.get('ema_21', 0) > indicators.get('ema_50', 0):
-                patterns['bullish_patterns'].append('golden_cross')
-
-            # Pattern Death Cross
-            if indicators.get('ema_9', 0) < indicators.get('ema_21', 0) and indicators.get('ema_21', 0) < indicators.get('ema_50', 0):
-                patterns['bearish_patterns'].append('death_cross')
-
-            # Pattern MACD Divergence
-            if indicators.get('macd', 0) > indicators.get('macd_signal', 0) and indicators.get('macd_histogram', 0) > 0:
-                patterns['bullish_patterns'].append('macd_bullish_crossover')
-            elif indicators.get('macd', 0) < indicators.get('macd_signal', 0) and indicators.get('macd_histogram', 0) < 0:
-                patterns['bearish_patterns'].append('macd_bearish_crossover')
-
-            # Pattern RSI Oversold/Overbought
-            rsi = indicators.get('rsi', 50)
-            if rsi < 30:
-                patterns['reversal_patterns'].append('rsi_oversold')
-            elif rsi > 70:
-                patterns['reversal_patterns'].append('rsi_overbought')
-
-            # Pattern Bollinger Band Squeeze
-            bb_width = (indicators.get('bb_upper', 0) - indicators.get('bb_lower', 0)) / indicators.get('bb_middle', 1)
-            if bb_width < 0.05:  # Bandes très rapprochées
-                patterns['continuation_patterns'].append('bb_squeeze')
-
-            # Pattern Double Top/Bottom (simplifié)
-            if len(prev_prices) >= 5:
-                highs = [df['high'].iloc[i] for i in range(-5, 0)]
-                lows = [df['low'].iloc[i] for i in range(-5, 0)]
-
-                if self._is_double_top(highs):
-                    patterns['reversal_patterns'].append('double_top')
-                elif self._is_double_bottom(lows):
-                    patterns['reversal_patterns'].append('double_bottom')
-
-            return patterns
+        Args:
+            symbol (str): Symbole à analyser
+            timeframes (list): Timeframes souhaités (par défaut ceux de l'analyseur)
+            limit (int): Nombre de bougies par timeframe
 
-        except Exception as e:
-            logging.error(f"Erreur lors de la détection des patterns: {e}")
-            return patterns
+        Returns:
+            dict: Résultat d'analyse par timeframe
+        """
+        timeframes = timeframes or self.timeframes
+        base = min(timeframes, key=timeframe_to_ms)
+        # Le timeframe de base est natif: son analyse est partagée avec analyze_symbol / analyze_many
+        analyses = await self.analysis_cache.get_or_compute_many(
+            [analysis_key(symbol, timeframe, limit, resampled=timeframe != base) for timeframe in timeframes],
+            lambda missing: self._run_timeframes_analysis(symbol, base, [key[1] for key in missing], limit)
+        )
+        return dict(zip(timeframes, analyses))
+
+    async def _run_timeframes_analysis(self, symbol, base, timeframes, limit):
+        """Analyse multi-timeframes à partir des bougies `base`, sans passer par le cache"""
 
-    def _analyze_volume(self, df):
-        """Analyse du volume de trading"""
         try:
-            recent_volume = df['volume'].iloc[-10:].mean()
-            long_term_volume = df['volume'].iloc[-50:].mean()
-
-            volume_ratio = recent_volume / long_term_volume if long_term_volume > 0 else 1
-            volume_trend = 'increasing' if volume_ratio > 1.2 else 'decreasing' if volume_ratio < 0.8 else 'stable'
-
-            # Volume Price Trend (VPT)
-            vpt = ta.volume.VolumePriceTrendIndicator(df['close'], df['volume']).volume_price_trend().iloc[-1]
-
-            return {
-                'volume_ratio': volume_ratio,
-                'volume_trend': volume_trend,
-                'vpt': vpt,
-                'volume_confirmation': volume_ratio > 1.1  # Volume confirme le mouvement
-            }
-
+            # `limit` bougies du plus grand timeframe: seule la période de chauffe passe par le réseau
+            ratio = max(timeframe_to_ms(tf) for tf in timeframes) // timeframe_to_ms(base)
+            wanted = limit * ratio + ratio
+            fetched = min(wanted, max(limit, (self.RESAMPLE_WARMUP + 1) * ratio))
+            ohlcv = await self._fetch_ohlcv_data(symbol, base, fetched)
+            ohlcv = self._prepend_cached(symbol, base, ohlcv, wanted)
         except Exception as e:
-            logging.error(f"Erreur lors de l'analyse du volume: {e}")
-            return {'volume_ratio': 1, 'volume_trend': 'unknown', 'vpt': 0, 'volume_confirmation': False}
-
-    def _get_ml_prediction(self, df, indicators):
-        """Prédiction utilisant le machine learning"""
-        try:
-            if self.ml_model is None:
-                return {'prediction': 'HOLD', 'confidence': 0.5}
-
-            # Préparation des features
-            features = self._prepare_features(df, indicators)
-
-            if len(features) > 0:
-                # Prédiction
-                prediction_proba = self.ml_model.predict_proba([features])[0]
-                prediction = self.ml_model.predict([features])[0]
+            logging.error(f"Erreur lors de l'analyse de {symbol}: {e}")
+            return [self._get_error_response(symbol, str(e)) for _ in timeframes]
+
+        results = []
+        for timeframe in timeframes:
+            try:
+                candles = resample_ohlcv(ohlcv, base, timeframe)[-limit:]
+                results.append(self._analyze_ohlcv(symbol, timeframe, candles))
+            except Exception as e:
+                logging.error(f"Erreur lors de l'analyse de {symbol} en {timeframe}: {e}")
+                results.append(self._get_error_response(symbol, str(e)))
+
+        return results
+
+    def _prepend_cached(self, symbol, timeframe, ohlcv, count):
+        """Complète une série par les bougies antérieures du cache disque, jusqu'à `count`, sans appel réseau"""
+        if self.ohlcv_cache is None or len(ohlcv) == 0 or len(ohlcv) >= count:
+            return ohlcv
 
-                confidence = max(prediction_proba)
+        # Seul le segment contigu à la première bougie est utilisé, pour ne pas créer de trou
+        first = int(ohlcv[0, 0])
+        timeframe_ms = timeframe_to_ms(timeframe)
+        segment = self.ohlcv_cache.coverage(symbol, timeframe, at=first - timeframe_ms)
+        if segment is None:
+            return ohlcv
 
-                signal_map = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
+        since = max(segment[0], first - (count - len(ohlcv)) * timeframe_ms)
+        older = self.ohlcv_cache.read(symbol, timeframe, since=since, until=first)
+        return np.concatenate([older, ohlcv]) if len(older) else ohlcv
 
-                return {
-                    'prediction': signal_map.get(prediction, 'HOLD'),
-                    'confidence': confidence,
-                    'probabilities': {
-                        'sell': prediction_proba[0] if len(prediction_proba) > 0 else 0,
-                        'hold': prediction_proba[1] if len(prediction_proba) > 1 else 0,
-                        'buy': prediction_proba[2] if len(prediction_proba) > 2 else 0
-                    }
-                }
+    async def analyze_many(self, symbols, timeframe='1h', limit=200, timeout=None, timings=None):
+        """
+        Analyse groupée de plusieurs symboles
 
-        except Exception as e:
-            logging.error(f"Erreur lors de la prédiction ML: {e}")
+        Les bougies sont récupérées en parallèle (concurrence bornée, délai
+        maximum par symbole); un symbole en échec ou hors délai reçoit une
+        réponse d'erreur sans bloquer les autres. Les bougies des symboles
+        alignés sur les mêmes timestamps sont ensuite empilées dans des
+        tableaux (symboles x bougies) et analysées en une seule passe
+        vectorisée. Les résultats ont le même format que ceux d'analyze_symbol.
 
-        return {'prediction': 'HOLD', 'confidence': 0.5}
+        Args:
+            symbols (list): Symboles à analyser
+            timeframe (str): Timeframe d'analyse
+            limit (int): Nombre de bougies par symbole
+            timeout (float): Délai maximum de récupération par symbole, en secondes
+            timings (dict): Si fourni, reçoit la durée des étapes en secondes
+                ('fetch' par symbole, 'compute', 'total') et les symboles 'cached'
 
-    def _prepare_features(self, df, indicators):
-        """Préparation des features pour le ML"""
+        Returns:
+            list: Résultats dans l'ordre des symboles
+        """
+        started = time.perf_counter()
+        timings = timings if timings is not None else {}
+        timings.update({'fetch': {}, 'compute': 0.0, 'cached': list(symbols)})
+
+        analyses = await self.analysis_cache.get_or_compute_many(
+            [analysis_key(symbol, timeframe, limit) for symbol in symbols],
+            lambda missing: self._run_batch_analysis(
+                [key[0] for key in missing], timeframe, limit, timeout or self.symbol_timeout, timings
+            )
+        )
+
+        timings['cached'] = [symbol for symbol in timings['cached'] if symbol not in timings['fetch']]
+        timings['total'] = time.perf_counter() - started
+        return analyses
+
+    async def _fetch_with_deadline(self, symbol, timeframe, limit, timeout, durations):
+        """Récupération des bougies d'un symbole, concurrence bornée et délai maximum"""
+        async with self.fetch_semaphore:
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(self._fetch_ohlcv_data(symbol, timeframe, limit), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Délai de {timeout:.0f}s dépassé pour {symbol}")
+            finally:
+                durations[symbol] = time.perf_counter() - started
+
+    async def _run_batch_analysis(self, symbols, timeframe, limit, timeout, timings):
+        """Analyse groupée sans passer par le cache"""
+        results = {}
+        groups = {}
+
+        fetched = await asyncio.gather(
+            *(self._fetch_with_deadline(symbol, timeframe, limit, timeout, timings['fetch']) for symbol in symbols),
+            return_exceptions=True
+        )
+        compute_started = time.perf_counter()
+
+        # Regroupement des séries partageant exactement les mêmes timestamps
+        for symbol, ohlcv in zip(symbols, fetched):
+            if isinstance(ohlcv, Exception):
+                logging.error(f"Erreur lors de l'analyse de {symbol}: {ohlcv}")
+                results[symbol] = self._get_error_response(symbol, str(ohlcv))
+                continue
+
+            ohlcv = np.asarray(ohlcv, dtype=np.float64)
+            if len(ohlcv) < self.MIN_BATCH_CANDLES:
+                try:
+                    results[symbol] = self._analyze_ohlcv(symbol, timeframe, ohlcv)
+                except Exception as e:
+                    logging.error(f"Erreur lors de l'analyse de {symbol}: {e}")
+                    results[symbol] = self._get_error_response(symbol, str(e))
+                continue
+
+            groups.setdefault(ohlcv[:, 0].tobytes(), []).append((symbol, ohlcv))
+
+        stages = []
+        for members in groups.values():
+            group_symbols = [symbol for symbol, _ in members]
+            try:
+                stacked = np.stack([ohlcv for _, ohlcv in members])
+                keys = [(symbol, timeframe) for symbol in group_symbols]
+                stages.append((group_symbols, self._analyze_batch(stacked, keys)))
+            except Exception as e:
+                logging.error(f"Erreur lors de l'analyse groupée de {', '.join(group_symbols)}: {e}")
+                for symbol in group_symbols:
+                    results[symbol] = self._get_error_response(symbol, str(e))
+
+        # Une seule inférence ML pour tous les symboles du cycle
+        with timed(ANALYSIS_STAGE_SECONDS, stage='batch_ml_prediction'):
+            ml_signals = self._get_ml_predictions([row for _, stage in stages for row in stage['features']])
+
+        offset = 0
+        for group_symbols, stage in stages:
+            group_ml = ml_signals[offset:offset + len(group_symbols)]
+            offset += len(group_symbols)
+            try:
+                with timed(ANALYSIS_STAGE_SECONDS, stage='batch_final_signal'):
+                    analyses = self._finalize_batch(group_symbols, timeframe, stage, group_ml)
+                results.update(zip(group_symbols, analyses))
+            except Exception as e:
+                logging.error(f"Erreur lors de l'analyse groupée de {', '.join(group_symbols)}: {e}")
+                for symbol in group_symbols:
+                    results[symbol] = self._get_error_response(symbol, str(e))
+
+        timings['compute'] += time.perf_counter() - compute_started
+        return [results[symbol] for symbol in symbols]
+
+    async def _fetch_ohlcv_data(self, symbol, timeframe, limit=DEFAULT_LIMIT):
+        """Récupération des données OHLCV depuis le cache de bougies"""
         try:
-            features = [
-                indicators.get('rsi', 50) / 100,
-                indicators.get('macd', 0),
-                indicators.get('bb_position', 0.5),
-                indicators.get('stoch_k', 50) / 100,
-                indicators.get('adx', 20) / 100,
-                indicators.get('volume_ratio', 1),
-                (df['close'].iloc[-1] - df['close'].iloc[-2]) / df['close'].iloc[-2],  # Price change
-                len(indicators.get('bullish_patterns', [])) - len(indicators.get('bearish_patterns', []))
-            ]
-
-            return [f if not np.isnan(f) else 0 for f in features]
-
+            with timed(ANALYSIS_STAGE_SECONDS, stage='fetch'):
+                return await self.candle_store.get_ohlcv(symbol, timeframe, limit)
         except Exception as e:
-            logging.error(f"Erreur lors de la préparation des features: {e}")
-            return []
-
-    def _calculate_final_signal(self, indicators, patterns, volume_analysis, ml_signal):
-        """Calcul du signal final basé sur tous les indicateurs"""
-        try:
-            signals = []
-            weights = []
-
-            # Signal RSI
-            rsi = indicators.get('rsi', 50)
-            if rsi < 30:
-                signals.append(1)  # BUY
-                weights.append(0.15)
-            elif rsi > 70:
-                signals.append(-1)  # SELL
-                weights.append(0.15)
-            else:
-                signals.append(0)  # HOLD
-                weights.append(0.05)
-
-            # Signal MACD
-            if indicators.get('macd', 0) > indicators.get('macd_signal', 0):
-                signals.append(1)
-                weights.append(0.2)
-            else:
-                signals.append(-1)
-                weights.append(0.2)
-
-            # Signal EMA
-            if indicators.get('ema_9', 0) > indicators.get('ema_21', 0):
-                signals.append(1)
-                weights.append(0.15)
-            else:
-                signals.append(-1)
-                weights.append(0.15)
-
-            # Signal Patterns
-            bullish_count = len(patterns.get('bullish_patterns', []))
-            bearish_count = len(patterns.get('bearish_patterns', []))
-
-            if bullish_count > bearish_count:
-                signals.append(1)
-                weights.append(0.2)
-            elif bearish_count > bullish_count:
-                signals.append(-1)
-                weights.append(0.2)
-            else:
-                signals.append(0)
-                weights.append(0.1)
-
-            # Signal Volume
-            if volume_analysis.get('volume_confirmation', False):
-                signals.append(1 if volume_analysis.get('volume_ratio', 1) > 1 else -1)
-                weights.append(0.1)
-            else:
-                signals.append(0)
-                weights.append(0.05)
-
-            # Signal ML
-            ml_pred = ml_signal.get('prediction', 'HOLD')
-            ml_conf = ml_signal.get('confidence', 0.5)
-
-            if ml_pred == 'BUY':
-                signals.append(1)
-                weights.append(0.2 * ml_conf)
-            elif ml_pred == 'SELL':
-                signals.append(-1)
-                weights.append(0.2 * ml_conf)
-            else:
-                signals.append(0)
-                weights.append(0.1)
+            logging.error(f"Erreur lors de la récupération des données pour {symbol}: {e}")
+            raise
 
-            # Calcul du signal pondéré
-            if sum(weights) > 0:
-                weighted_signal = sum(s * w for s, w in zip(signals, weights)) / sum(weights)
-            else:
-                weighted_signal = 0
-
-            # Détermination de l'action finale
-            if weighted_signal > 0.3:
-                action = 'BUY'
-                confidence = min(95, abs(weighted_signal) * 100)
-            elif weighted_signal < -0.3:
-                action = 'SELL'
-                confidence = min(95, abs(weighted_signal) * 100)
-            else:
-                action = 'HOLD'
-                confidence = 50
+    async def _fetch_candles(self, symbol, timeframe, since=None, limit=None):
+        """Bougies depuis le cache disque, complétées par l'exchange au-delà de la plage connue"""
+        coverage = None
+        if self.ohlcv_cache is not None and since is not None:
+            coverage = self.ohlcv_cache.coverage(symbol, timeframe, at=since)
 
-            # Calcul des niveaux de Take Profit et Stop Loss
-            current_price = indicators.get('current_price', 0)
+        if coverage is None:
+            candles = await self._fetch_exchange_ohlcv(symbol, timeframe, since=since, limit=limit)
+            if self.ohlcv_cache is not None and since is not None:
+                self.ohlcv_cache.append(symbol, timeframe, candles, since=since)
+            return candles
 
-            result = {
-                'action': action,
-                'confidence': confidence,
-                'weighted_signal': weighted_signal
-            }
+        cached = self.ohlcv_cache.read(symbol, timeframe, since=since, until=coverage[1], limit=limit).tolist()
+        if limit is not None and len(cached) >= limit:
+            return cached
 
-            if action != 'HOLD' and current_price > 0:
-                if action == 'BUY':
-                    result['take_profit'] = current_price * 1.03  # 3% profit
-                    result['stop_loss'] = current_price * 0.98    # 2% loss
-                    result['risk_reward'] = 1.5
-                else:  # SELL
-                    result['take_profit'] = current_price * 0.97  # 3% profit sur short
-                    result['stop_loss'] = current_price * 1.02    # 2% loss sur short
-                    result['risk_reward'] = 1.5
+        remaining = None if limit is None else limit - len(cached)
+        candles = await self._fetch_exchange_ohlcv(symbol, timeframe, since=coverage[1], limit=remaining)
+        self.ohlcv_cache.append(symbol, timeframe, candles, since=coverage[1])
+        return cached + candles
 
-            return result
+    async def _fetch_exchange_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        """Téléchargement brut des bougies depuis l'exchange"""
+        exchange = self._get_exchange('binance')
+        await self.request_scheduler.acquire(binance_request_weight('klines'))
 
-        except Exception as e:
-            logging.error(f"Erreur lors du calcul du signal final: {e}")
-            return {'action': 'HOLD', 'confidence': 0}
-
-    def _calculate_support_resistance(self, df):
-        """Calcul des niveaux de support et résistance"""
         try:
-            highs = df['high'].rolling(window=20).max()
-            lows = df['low'].rolling(window=20).min()
-
-            current_price = df['close'].iloc[-1]
-
-            resistance = highs.iloc[-1]
-            support = lows.iloc[-1]
-
-            return {
-                'support': support,
-                'resistance': resistance,
-                'distance_to_support': (current_price - support) / current_price * 100,
-                'distance_to_resistance': (resistance - current_price) / current_price * 100
-            }
-
+            with timed(EXCHANGE_REQUEST_SECONDS, exchange='binance', endpoint='klines'):
+                candles = await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        except ccxt.DDoSProtection:
+            # 429/418: on suspend les requêtes le temps que les jetons reviennent
+            EXCHANGE_ERRORS.labels(exchange='binance', endpoint='klines', error='DDoSProtection').inc()
+            self.request_scheduler.throttle()
+            raise
         except Exception as e:
-            logging.error(f"Erreur lors du calcul support/résistance: {e}")
-            return {'support': 0, 'resistance': 0, 'distance_to_support': 0, 'distance_to_resistance': 0}
+            EXCHANGE_ERRORS.labels(exchange='binance', endpoint='klines', error=type(e).__name__).inc()
+            raise
 
-    def _is_double_top(self, highs):
-        """Détection du pattern Double Top"""
-        if len(highs) < 5:
-            return False
+        # Recalage sur le poids réellement consommé selon Binance
+        headers = exchange.last_response_headers or {}
+        used_weight = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+        if used_weight is not None:
+            self.request_scheduler.throttle(int(used_weight))
 
-        # Logique simplifiée pour détecter un double top
-        peak1_idx = highs.index(max(highs[:3]))
-        peak2_idx = highs.index(max(highs[2:]))
+        return candles
 
-        if abs(highs[peak1_idx] - highs[peak2_idx]) / highs[peak1_idx] < 0.02:  # Pics similaires (2% de différence)
-            return True
+    def _get_exchange(self, name):
+        """Retourne le client d'échange branché sur la session HTTP partagée"""
+        exchange = self.exchanges[name]
 
-        return False
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(limit=self.http_pool_size, ttl_dns_cache=300)
+            self.http_session = aiohttp.ClientSession(connector=connector)
 
-    def _is_double_bottom(self, lows):
-        """Détection du pattern Double Bottom"""
-        if len(lows) < 5:
-            return False
+        if exchange.session is not self.http_session:
+            exchange.session = self.http_session
+            exchange.own_session = False
 
-        # Logique similaire pour double bottom
-        valley1_idx = lows.index(min(lows[:3]))
-        valley2_idx = lows.index(min(lows[2:]))
+        return exchange
 
-        if abs(lows[valley1_idx] - lows[valley2_idx]) / lows[valley1_idx] < 0.02:
-            return True
+    async def close(self):
+        """Fermeture des clients d'échange et de la session HTTP partagée"""
+        for name, exchange in self.exchanges.items():
+            try:
+                await exchange.close()
+            except Exception as e:
+                logging.error(f"Erreur lors de la fermeture de {name}: {e}")
 
-        return False
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        self.http_session = None
 
-    def _get_error_response(self, symbol, error_msg):
-        """Response d'erreur standardisée"""
-        return {
-            'symbol': symbol,
-            'timestamp': datetime.utcnow(),
-            'error': True,
-            'error_message': error_msg,
-            'signal': 'HOLD',
-            'confidence': 0
-        }
+    async def generate_daily_report(self, outcome_stats=None):
+        """
+        Génération du rapport quotidien
 
-    async def generate_daily_report(self):
-        """Génération du rapport quotidien"""
+        Args:
+            outcome_stats (dict): Résultats des signaux évalués
+                (DatabaseManager.get_signal_outcome_stats), pour le taux de réussite
+        """
         try:
             # Analyse des principales cryptos
             symbols = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'ADA/USDT', 'SOL/USDT', 'MATIC/USDT', 'DOT/USDT']
 
-            analyses = []
-            for symbol in symbols:
-                analysis = await self.analyze_symbol(symbol, '1d')
-                analyses.append(analysis)
+            timings = {}
+            analyses = await self.analyze_many(symbols, '1d', timings=timings)
+
+            if timings['fetch']:
+                slowest = max(timings['fetch'], key=timings['fetch'].get)
+                logging.info(f"Rapport quotidien: {timings['total']:.2f}s "
+                             f"(plus lent: {slowest} {timings['fetch'][slowest]:.2f}s)")
 
             # Calcul des statistiques globales
             buy_signals = len([a for a in analyses if a['signal'] == 'BUY'])
             sell_signals = len([a for a in analyses if a['signal'] == 'SELL'])
             hold_signals = len([a for a in analyses if a['signal'] == 'HOLD'])
 
-            avg_confidence = np.mean([a['confidence'] for a in analyses if not a.get('error', False)])
+            # Les symboles en échec sont exclus des moyennes, le rapport reste partiel
+            valid_analyses = [a for a in analyses if not a.get('error', False)]
+            avg_confidence = np.mean([a['confidence'] for a in valid_analyses]) if valid_analyses else 0
 
             # Top performer
-            valid_analyses = [a for a in analyses if not a.get('error', False)]
             if valid_analyses:
                 top_performer = max(valid_analyses, key=lambda x: x['confidence'])
             else:
                 top_performer = {'symbol': 'N/A', 'gain': 0}
 
+            # Performance du jour calculée sur les bougies journalières déjà en cache
+            daily_changes = []
+            for symbol in symbols:
+                candles = self.candle_store.peek(symbol, '1d', 1)
+                if candles is not None and candles[-1, 1] > 0:
+                    daily_changes.append((candles[-1, 4] - candles[-1, 1]) / candles[-1, 1] * 100)
+
             report = {
                 'date': datetime.utcnow().strftime('%Y-%m-%d'),
                 'total_analyzed': len(analyses),
@@ -508,9 +438,12 @@ class TradingAnalyzer:
                     'gain': top_performer.get('confidence', 0)
                 },
                 'analyses': analyses,
-                'global_performance': np.random.uniform(-2, 5),  # Simulation - à remplacer par vraies données
+                'global_performance': float(np.mean(daily_changes)) if daily_changes else 0,
                 'signals_sent': buy_signals + sell_signals,
-                'success_rate': np.random.uniform(65, 85)  # Simulation - à calculer réellement
+                'success_rate': (outcome_stats or {}).get('win_rate', 0),
+                'evaluated_signals': (outcome_stats or {}).get('evaluated', 0),
+                'failed_symbols': [a['symbol'] for a in analyses if a.get('error', False)],
+                'timings': timings
             }
 
             return report
@@ -0,0 +1,342 @@
+# Stockage incrémental des bougies OHLCV partagé entre les modules de trading
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from market_core.timeframes import OHLCV_COLUMNS, timeframe_origin_ms, timeframe_to_ms
+
+# Nombre maximum de bougies renvoyées par Binance en une requête
+MAX_FETCH_LIMIT = 1000
+
+
+def resample_ohlcv(candles: np.ndarray, timeframe: str, target_timeframe: str) -> np.ndarray:
+    """
+    Agrège des bougies vers un timeframe supérieur
+
+    Les bougies sont regroupées par intervalle aligné sur l'UTC comme sur
+    l'exchange. Le premier intervalle est écarté s'il est incomplet; le
+    dernier est conservé même s'il est en cours de formation, à l'image de
+    la bougie courante renvoyée par l'exchange.
+
+    Args:
+        candles (np.ndarray): Tableau (n x 6) trié par timestamp
+        timeframe (str): Timeframe des bougies d'origine
+        target_timeframe (str): Timeframe cible (multiple du timeframe d'origine)
+
+    Returns:
+        np.ndarray: Tableau (m x 6) des bougies agrégées
+    """
+    source_ms = timeframe_to_ms(timeframe)
+    target_ms = timeframe_to_ms(target_timeframe)
+
+    if target_timeframe.endswith('M') or target_ms % source_ms != 0:
+        raise ValueError(f"Impossible de construire des bougies {target_timeframe} à partir de {timeframe}")
+
+    if target_ms == source_ms or len(candles) == 0:
+        return candles.copy()
+
+    timestamps = candles[:, 0].astype(np.int64)
+    origin = timeframe_origin_ms(target_timeframe)
+    buckets = timestamps - (timestamps - origin) % target_ms
+
+    # Intervalle de départ incomplet: la série commence après son ouverture
+    if timestamps[0] != buckets[0]:
+        keep = buckets != buckets[0]
+        candles, buckets = candles[keep], buckets[keep]
+        if len(candles) == 0:
+            return np.empty((0, OHLCV_COLUMNS), dtype=np.float64)
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+
+    resampled = np.empty((len(starts), OHLCV_COLUMNS), dtype=np.float64)
+    resampled[:, 0] = buckets[starts]
+    resampled[:, 1] = candles[starts, 1]
+    resampled[:, 2] = np.maximum.reduceat(candles[:, 2], starts)
+    resampled[:, 3] = np.minimum.reduceat(candles[:, 3], starts)
+    resampled[:, 4] = candles[ends, 4]
+    resampled[:, 5] = np.add.reduceat(candles[:, 5], starts)
+
+    return resampled
+
+
+class CandleRingBuffer:
+    """Tampon circulaire de taille fixe contenant une série de bougies triées"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, OHLCV_COLUMNS), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        """Timestamp de la plus ancienne bougie stockée"""
+        if self._size == 0:
+            return None
+        return int(self._data[self._start, 0])
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp de la bougie la plus récente (souvent en cours de formation)"""
+        if self._size == 0:
+            return None
+        return int(self._data[(self._start + self._size - 1) % self.capacity, 0])
+
+    def clear(self):
+        """Vide le tampon sans réallouer la mémoire"""
+        self._start = 0
+        self._size = 0
+
+    def push(self, candle) -> bool:
+        """
+        Ajoute une bougie en fin de série
+
+        Une bougie portant le même timestamp que la dernière la remplace
+        (mise à jour de la bougie en cours), une bougie plus ancienne est ignorée.
+
+        Returns:
+            bool: True si la bougie a été ajoutée ou mise à jour
+        """
+        timestamp = candle[0]
+        last_timestamp = self.last_timestamp
+
+        if last_timestamp is not None and timestamp < last_timestamp:
+            return False
+
+        if last_timestamp is not None and timestamp == last_timestamp:
+            self._data[(self._start + self._size - 1) % self.capacity] = candle[:OHLCV_COLUMNS]
+        elif self._size < self.capacity:
+            self._data[(self._start + self._size) % self.capacity] = candle[:OHLCV_COLUMNS]
+            self._size += 1
+        else:
+            # Tampon plein: la bougie la plus ancienne est écrasée
+            self._data[self._start] = candle[:OHLCV_COLUMNS]
+            self._start = (self._start + 1) % self.capacity
+
+        return True
+
+    def extend(self, candles) -> int:
+        """Ajoute une liste de bougies triées par timestamp croissant"""
+        return sum(1 for candle in candles if self.push(candle))
+
+    def to_array(self, limit: int = None) -> np.ndarray:
+        """Copie ordonnée des `limit` bougies les plus récentes (tableau n x 6)"""
+        count = self._size if limit is None else min(limit, self._size)
+        first = (self._start + self._size - count) % self.capacity
+        end = first + count
+
+        if end <= self.capacity:
+            return self._data[first:end].copy()
+
+        return np.concatenate((self._data[first:], self._data[:end - self.capacity]))
+
+
+class CandleStore:
+    """
+    Cache en mémoire des bougies OHLCV par (symbole, timeframe)
+
+    Seules les bougies postérieures au dernier timestamp stocké sont téléchargées.
+    Un trou dans la série (bot en pause, bougies manquantes) déclenche un
+    rechargement complet de la fenêtre. Une série plus courte que demandé
+    dont l'exchange n'a pas plus d'historique (paire récemment listée,
+    timeframes 1d/1w) reste en mise à jour incrémentale.
+    """
+
+    def __init__(self, fetcher: Callable[..., Awaitable[List[list]]], capacity: int = 500,
+                 min_refresh_seconds: float = 1.0, stream_timeout: float = 90.0):
+        """
+        Args:
+            fetcher: Coroutine `fetcher(symbol, timeframe, since=None, limit=None)`
+                renvoyant des bougies au format ccxt
+            capacity (int): Nombre de bougies conservées par série
+            min_refresh_seconds (float): Délai minimum entre deux appels réseau pour une même série
+            stream_timeout (float): Durée pendant laquelle une série alimentée en
+                streaming est considérée à jour sans appel réseau
+        """
+        self.fetcher = fetcher
+        self.capacity = capacity
+        self.min_refresh_seconds = min_refresh_seconds
+        self.stream_timeout = stream_timeout
+
+        self._series: Dict[Tuple[str, str], CandleRingBuffer] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._last_refresh: Dict[Tuple[str, str], float] = {}
+        self._last_stream: Dict[Tuple[str, str], float] = {}
+        # Séries dont le dernier chargement complet a épuisé l'historique de l'exchange
+        self._exhausted: set = set()
+        self._prices: Dict[str, Tuple[float, float]] = {}
+
+        self.stats = {
+            'full_loads': 0,
+            'incremental_fetches': 0,
+            'gap_repairs': 0,
+            'cached_reads': 0,
+            'streamed_candles': 0,
+            'stream_gaps': 0
+        }
+
+    async def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 200) -> np.ndarray:
+        """
+        Récupère les `limit` dernières bougies d'une série
+
+        Returns:
+            np.ndarray: Tableau (n x 6) timestamp, open, high, low, close, volume
+        """
+        buffer = await self.refresh(symbol, timeframe, limit)
+        return buffer.to_array(limit)
+
+    async def get_latest_price(self, symbol: str, timeframe: str = '1h') -> Optional[float]:
+        """Dernier prix connu (ticker en streaming, sinon clôture de la bougie en cours)"""
+        streamed = self._prices.get(symbol)
+        if streamed is not None and time.time() - streamed[1] < self.stream_timeout:
+            return streamed[0]
+
+        buffer = await self.refresh(symbol, timeframe, 1)
+        if len(buffer) == 0:
+            return None
+        return float(buffer.to_array(1)[-1, 4])
+
+    def peek(self, symbol: str, timeframe: str, limit: int = None) -> Optional[np.ndarray]:
+        """Lecture des bougies déjà stockées, sans appel réseau"""
+        buffer = self._series.get((symbol, timeframe))
+        if buffer is None or len(buffer) == 0:
+            return None
+        return buffer.to_array(limit)
+
+    def apply_stream_candle(self, symbol: str, timeframe: str, candle) -> bool:
+        """
+        Intègre une bougie reçue en streaming dans une série déjà chargée
+
+        Seule la mise à jour de la dernière bougie ou l'ouverture de la
+        suivante est acceptée; un trou (connexion perdue) rend la série à
+        nouveau dépendante du REST, qui le comblera au prochain accès.
+
+        Returns:
+            bool: True si la bougie a été intégrée
+        """
+        key = (symbol, timeframe)
+        buffer = self._series.get(key)
+        if buffer is None or len(buffer) == 0:
+            return False
+
+        timestamp = int(candle[0])
+        last_timestamp = buffer.last_timestamp
+        if timestamp != last_timestamp and timestamp != last_timestamp + timeframe_to_ms(timeframe):
+            if timestamp > last_timestamp:
+                self._last_stream.pop(key, None)
+                self.stats['stream_gaps'] += 1
+            return False
+
+        buffer.push(candle)
+        self._last_stream[key] = time.time()
+        self.stats['streamed_candles'] += 1
+        return True
+
+    def update_price(self, symbol: str, price: float):
+        """Enregistre le dernier prix reçu en streaming"""
+        self._prices[symbol] = (price, time.time())
+
+    def clear(self, symbol: str = None, timeframe: str = None):
+        """Supprime les séries correspondant aux filtres donnés"""
+        for key in list(self._series):
+            if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                del self._series[key]
+                self._last_refresh.pop(key, None)
+                self._last_stream.pop(key, None)
+                self._exhausted.discard(key)
+
+    async def refresh(self, symbol: str, timeframe: str, limit: int = 200) -> CandleRingBuffer:
+        """Met à jour une série depuis l'exchange si nécessaire"""
+        key = (symbol, timeframe)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            buffer = self._series.get(key)
+
+            if buffer is None or buffer.capacity < limit:
+                buffer = CandleRingBuffer(max(self.capacity, limit))
+                self._series[key] = buffer
+                self._exhausted.discard(key)
+
+            # Historique épuisé: la série ne peut pas être plus longue que celle stockée
+            needed = min(limit, buffer.capacity)
+            complete = len(buffer) >= needed or (len(buffer) > 0 and key in self._exhausted)
+            now = time.time()
+
+            fresh = now - self._last_refresh.get(key, 0) < self.min_refresh_seconds or \
+                now - self._last_stream.get(key, 0) < self.stream_timeout
+            if complete and fresh:
+                self.stats['cached_reads'] += 1
+                return buffer
+
+            timeframe_ms = timeframe_to_ms(timeframe)
+            missing = (int(now * 1000) - (buffer.last_timestamp or 0)) // timeframe_ms + 1
+
+            if not complete or missing >= buffer.capacity:
+                await self._full_load(buffer, symbol, timeframe, timeframe_ms)
+            else:
+                await self._incremental_update(buffer, symbol, timeframe, timeframe_ms, missing)
+
+            self._last_refresh[key] = now
+            return buffer
+
+    async def _incremental_update(self, buffer: CandleRingBuffer, symbol: str, timeframe: str,
+                                  timeframe_ms: int, missing: int):
+        """Télécharge uniquement les bougies à partir de la dernière stockée"""
+        last_timestamp = buffer.last_timestamp
+        candles = await self.fetcher(symbol, timeframe, since=last_timestamp,
+                                     limit=min(missing + 1, MAX_FETCH_LIMIT))
+        self.stats['incremental_fetches'] += 1
+
+        if not candles:
+            return
+
+        # La première bougie reçue doit être la dernière stockée, les suivantes contiguës
+        timestamps = [candle[0] for candle in candles]
+        contiguous = timestamps[0] == last_timestamp and \
+            all(b - a == timeframe_ms for a, b in zip(timestamps, timestamps[1:]))
+
+        if not contiguous:
+            logging.warning(f"Trou détecté dans les bougies {symbol} {timeframe}, rechargement complet")
+            self.stats['gap_repairs'] += 1
+            await self._full_load(buffer, symbol, timeframe, timeframe_ms)
+            return
+
+        buffer.extend(candles)
+
+    async def _full_load(self, buffer: CandleRingBuffer, symbol: str, timeframe: str, timeframe_ms: int):
+        """Recharge toute la fenêtre, par pages si elle dépasse la limite de l'exchange"""
+        count = buffer.capacity
+        now_ms = int(time.time() * 1000)
+        # Début de la fenêtre aligné sur les bougies de l'exchange (lundi pour 1w, comme resample_ohlcv)
+        since = now_ms - (now_ms - timeframe_origin_ms(timeframe)) % timeframe_ms - (count - 1) * timeframe_ms
+        candles = []
+
+        while len(candles) < count:
+            request = min(MAX_FETCH_LIMIT, count - len(candles))
+            page = await self.fetcher(symbol, timeframe, since=since, limit=request)
+            if not page:
+                break
+
+            candles.extend(page)
+            if len(page) < request:
+                break
+            since = page[-1][0] + timeframe_ms
+
+        buffer.clear()
+        buffer.extend(candles[-count:])
+        self.stats['full_loads'] += 1
+
+        # Moins de bougies que la fenêtre: l'exchange n'a pas d'historique plus ancien
+        if len(candles) < count:
+            self._exhausted.add((symbol, timeframe))
+        else:
+            self._exhausted.discard((symbol, timeframe))
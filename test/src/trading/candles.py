@@ -0,0 +1,89 @@
+# Conteneur de bougies en colonnes NumPy contiguës
+
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from src.trading.candle_store import OHLCV_COLUMNS
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Candles:
+    """
+    Série de bougies stockée par colonnes
+
+    Les timestamps (ms) sont un tableau int64; open, high, low, close et
+    volume sont les lignes d'un unique tableau float64 (5 x T), chacune
+    contiguë en mémoire. Le découpage (`candles[-50:]`, `tail`) renvoie des
+    vues sans copie et `candles['close']` s'utilise comme une colonne de
+    DataFrame par le code d'analyse.
+    """
+
+    __slots__ = ('timestamps', 'values')
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray):
+        """
+        Args:
+            timestamps (np.ndarray): Timestamps en millisecondes (T)
+            values (np.ndarray): Colonnes open, high, low, close, volume (5 x T)
+        """
+        self.timestamps = timestamps
+        self.values = values
+
+    @classmethod
+    def from_ohlcv(cls, ohlcv) -> 'Candles':
+        """Conversion d'un tableau ou d'une liste de bougies au format ccxt (T x 6), une seule copie"""
+        ohlcv = np.asarray(ohlcv, dtype=np.float64).reshape(-1, OHLCV_COLUMNS)
+        return cls(ohlcv[:, 0].astype(np.int64), np.ascontiguousarray(ohlcv[:, 1:].T))
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.values[0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.values[1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.values[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.values[3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.values[4]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, key: Union[str, slice]) -> Union[np.ndarray, 'Candles']:
+        if isinstance(key, str):
+            if key == 'timestamp':
+                return self.timestamps
+            return self.values[PRICE_COLUMNS.index(key)]
+        if isinstance(key, slice):
+            return Candles(self.timestamps[key], self.values[:, key])
+        raise TypeError(f"Index de bougies non supporté: {key!r}")
+
+    def tail(self, count: int) -> 'Candles':
+        """Vue sur les `count` dernières bougies"""
+        return self[-count:] if count else self[len(self):]
+
+    def to_ohlcv(self) -> np.ndarray:
+        """Tableau (T x 6) au format du CandleStore"""
+        ohlcv = np.empty((len(self), OHLCV_COLUMNS), dtype=np.float64)
+        ohlcv[:, 0] = self.timestamps
+        ohlcv[:, 1:] = self.values.T
+        return ohlcv
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame indexé par date (graphiques, exports)"""
+        df = pd.DataFrame(self.values.T, columns=list(PRICE_COLUMNS),
+                          index=pd.to_datetime(self.timestamps, unit='ms'))
+        df.index.name = 'timestamp'
+        return df
@@ -0,0 +1,261 @@
+# Exchange simulé, compatible ccxt, pour les tests et mesures hors ligne
+
+import asyncio
+import random
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+import ccxt
+import numpy as np
+
+from src.trading.candle_store import MAX_FETCH_LIMIT, OHLCV_COLUMNS, timeframe_to_ms
+from src.trading.rate_limiter import binance_request_weight
+
+# Nombre de bougies renvoyées par Binance quand aucune limite n'est donnée
+DEFAULT_FETCH_LIMIT = 500
+
+Latency = Union[float, Tuple[float, float]]
+CandleSeries = Dict[Tuple[str, str], np.ndarray]
+
+
+def synthetic_ohlcv(symbol: str, timeframe: str, count: int, end_ms: int = None, seed: int = 42,
+                    start_price: float = None, volatility: float = 0.01) -> np.ndarray:
+    """
+    Marche aléatoire géométrique au format du CandleStore
+
+    Le générateur dépend de `seed`, du symbole et du timeframe: une même
+    série est identique d'une exécution à l'autre (seuls les timestamps
+    suivent l'horloge si `end_ms` n'est pas fixé).
+
+    Returns:
+        np.ndarray: Tableau (count x 6), dernière bougie ouverte à `end_ms`
+            (bougie en cours par défaut)
+    """
+    timeframe_ms = timeframe_to_ms(timeframe)
+    if end_ms is None:
+        now_ms = int(time.time() * 1000)
+        end_ms = now_ms - now_ms % timeframe_ms
+
+    rng = np.random.default_rng([seed, zlib.crc32(f'{symbol}:{timeframe}'.encode())])
+    start_price = start_price or float(rng.uniform(0.5, 50000))
+
+    closes = start_price * np.exp(np.cumsum(rng.normal(0, volatility, count)))
+    opens = np.concatenate([[start_price], closes[:-1]])
+    spread = np.abs(rng.normal(0, volatility / 2, (2, count)))
+
+    candles = np.empty((count, OHLCV_COLUMNS), dtype=np.float64)
+    candles[:, 0] = end_ms - timeframe_ms * np.arange(count - 1, -1, -1)
+    candles[:, 1] = opens
+    candles[:, 2] = np.maximum(opens, closes) * (1 + spread[0])
+    candles[:, 3] = np.minimum(opens, closes) * (1 - spread[1])
+    candles[:, 4] = closes
+    candles[:, 5] = rng.lognormal(8, 0.5, count)
+    return candles
+
+
+class FakeExchange:
+    """
+    Exchange hors ligne rejouant des bougies enregistrées ou synthétiques
+
+    Reproduit la sémantique de `ccxt.binance` pour `fetch_ohlcv` (500
+    bougies par défaut, 1000 au maximum, à partir de `since` ou les plus
+    récentes) et `fetch_tickers` (statistiques glissantes sur 24h). Chaque
+    requête peut être retardée (`latency`, fixe ou tirée dans un intervalle)
+    et échouer avec une probabilité `error_rate`; les tirages sont
+    reproductibles à `seed` égal. Le poids consommé est exposé dans
+    `last_response_headers` comme chez Binance.
+
+    Version synchrone (ccxt); `AsyncFakeExchange` remplace ccxt.async_support.
+    """
+
+    id = 'binance'
+
+    def __init__(self, candles: CandleSeries, latency: Latency = 0.0, error_rate: float = 0.0,
+                 error_types: Sequence[Type[Exception]] = (ccxt.NetworkError,), seed: int = 42,
+                 weight_window: float = 60.0):
+        """
+        Args:
+            candles: Bougies par (symbole, timeframe), triées par timestamp
+            latency: Délai par requête en secondes, ou intervalle (min, max)
+            error_rate (float): Probabilité qu'une requête échoue
+            error_types: Exceptions ccxt levées au hasard lors des échecs
+            seed (int): Graine des tirages de latence et d'erreurs
+            weight_window (float): Fenêtre du poids exposé dans les en-têtes, en
+                secondes (une minute chez Binance, raccourcie dans les tests)
+        """
+        self.candles = {key: np.asarray(series, dtype=np.float64) for key, series in candles.items()}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_types = list(error_types)
+        self.random = random.Random(seed)
+        self.weight_window = weight_window
+
+        self.symbols = sorted({symbol for symbol, _ in self.candles})
+        self.markets = {
+            symbol: {'symbol': symbol, 'base': symbol.split('/')[0], 'quote': symbol.split('/')[-1],
+                     'type': 'spot', 'spot': True, 'active': True}
+            for symbol in self.symbols
+        }
+        self.timeframes = {timeframe: timeframe for _, timeframe in self.candles}
+
+        # Attributs manipulés par TradingAnalyzer sur les clients ccxt
+        self.session = None
+        self.own_session = False
+        self.last_response_headers = {}
+
+        self._forced_errors: deque = deque()
+        self._weights: deque = deque()
+        self.stats = {'fetch_ohlcv': 0, 'fetch_tickers': 0, 'errors': 0, 'candles_served': 0}
+
+    @classmethod
+    def synthetic(cls, symbols: Iterable[str], timeframes: Iterable[str] = ('1h',), count: int = 1000,
+                  seed: int = 42, **kwargs) -> 'FakeExchange':
+        """Exchange alimenté par des marches aléatoires reproductibles"""
+        timeframes = list(timeframes)
+        candles = {
+            (symbol, timeframe): synthetic_ohlcv(symbol, timeframe, count, seed=seed)
+            for symbol in symbols for timeframe in timeframes
+        }
+        return cls(candles, seed=seed, **kwargs)
+
+    @classmethod
+    def from_cache(cls, cache, symbols: Iterable[str], timeframes: Iterable[str] = ('1h',),
+                   **kwargs) -> 'FakeExchange':
+        """Exchange rejouant les bougies enregistrées dans un OHLCVDiskCache"""
+        candles = {}
+        for symbol in symbols:
+            for timeframe in timeframes:
+                series = cache.read(symbol, timeframe)
+                if len(series):
+                    candles[(symbol, timeframe)] = series
+        return cls(candles, **kwargs)
+
+    def fail_next(self, count: int = 1, error: Type[Exception] = ccxt.NetworkError):
+        """Fait échouer les `count` prochaines requêtes avec `error`"""
+        self._forced_errors.extend([error] * count)
+
+    def load_markets(self, reload: bool = False) -> Dict:
+        return self.markets
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None,
+                    params: Dict = None) -> List[list]:
+        time.sleep(self._prepare_request('klines'))
+        return self._ohlcv(symbol, timeframe, since, limit)
+
+    def fetch_tickers(self, symbols: List[str] = None, params: Dict = None) -> Dict[str, Dict]:
+        symbols = list(symbols) if symbols else self.symbols
+        time.sleep(self._prepare_request('ticker', 0 if len(symbols) == len(self.symbols) else len(symbols)))
+        return self._tickers(symbols)
+
+    def fetch_ticker(self, symbol: str, params: Dict = None) -> Dict:
+        return self.fetch_tickers([symbol])[symbol]
+
+    def close(self):
+        pass
+
+    def _prepare_request(self, endpoint: str, symbols: int = 1) -> float:
+        """Comptabilise le poids, tire une éventuelle erreur et renvoie la latence à simuler"""
+        now = time.monotonic()
+        self._weights.append((now, binance_request_weight(endpoint, symbols)))
+        while self._weights and now - self._weights[0][0] > self.weight_window:
+            self._weights.popleft()
+        self.last_response_headers = {'x-mbx-used-weight-1m': str(sum(weight for _, weight in self._weights))}
+
+        if isinstance(self.latency, tuple):
+            latency = self.random.uniform(*self.latency)
+        else:
+            latency = self.latency
+
+        error = None
+        if self._forced_errors:
+            error = self._forced_errors.popleft()
+        elif self.error_rate and self.random.random() < self.error_rate:
+            error = self.random.choice(self.error_types)
+
+        if error is not None:
+            self.stats['errors'] += 1
+            raise error(f"{self.id} erreur simulée sur {endpoint}")
+        return latency
+
+    def _series(self, symbol: str, timeframe: str) -> np.ndarray:
+        series = self.candles.get((symbol, timeframe))
+        if series is None:
+            if symbol not in self.markets:
+                raise ccxt.BadSymbol(f"{self.id} ne connaît pas le symbole {symbol}")
+            raise ccxt.BadRequest(f"{self.id} n'a pas de bougies {timeframe} pour {symbol}")
+        return series
+
+    def _ohlcv(self, symbol: str, timeframe: str, since: Optional[int], limit: Optional[int]) -> List[list]:
+        series = self._series(symbol, timeframe)
+        limit = min(limit or DEFAULT_FETCH_LIMIT, MAX_FETCH_LIMIT)
+
+        if since is None:
+            rows = series[-limit:]
+        else:
+            first = int(np.searchsorted(series[:, 0], since, side='left'))
+            rows = series[first:first + limit]
+
+        self.stats['fetch_ohlcv'] += 1
+        self.stats['candles_served'] += len(rows)
+        return [[int(row[0]), *row[1:]] for row in rows.tolist()]
+
+    def _tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        self.stats['fetch_tickers'] += 1
+        tickers = {}
+
+        for symbol in symbols:
+            timeframes = [timeframe for (name, timeframe) in self.candles if name == symbol]
+            if not timeframes:
+                raise ccxt.BadSymbol(f"{self.id} ne connaît pas le symbole {symbol}")
+
+            # Fenêtre de 24h sur le timeframe le plus fin disponible
+            timeframe = min(timeframes, key=timeframe_to_ms)
+            series = self._series(symbol, timeframe)
+            window = series[series[:, 0] > series[-1, 0] - 24 * 3600 * 1000]
+
+            timestamp = int(series[-1, 0]) + timeframe_to_ms(timeframe) - 1
+            open_price, last = float(window[0, 1]), float(window[-1, 4])
+            base_volume = float(window[:, 5].sum())
+
+            tickers[symbol] = {
+                'symbol': symbol,
+                'timestamp': timestamp,
+                'datetime': datetime.fromtimestamp(timestamp / 1000, timezone.utc).isoformat(),
+                'open': open_price,
+                'high': float(window[:, 2].max()),
+                'low': float(window[:, 3].min()),
+                'last': last,
+                'close': last,
+                'change': last - open_price,
+                'percentage': (last / open_price - 1) * 100,
+                'baseVolume': base_volume,
+                'quoteVolume': float((window[:, 5] * window[:, 4]).sum())
+            }
+
+        return tickers
+
+
+class AsyncFakeExchange(FakeExchange):
+    """Variante asynchrone de FakeExchange, interchangeable avec ccxt.async_support.binance"""
+
+    async def load_markets(self, reload: bool = False) -> Dict:
+        return self.markets
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None,
+                          params: Dict = None) -> List[list]:
+        await asyncio.sleep(self._prepare_request('klines'))
+        return self._ohlcv(symbol, timeframe, since, limit)
+
+    async def fetch_tickers(self, symbols: List[str] = None, params: Dict = None) -> Dict[str, Dict]:
+        symbols = list(symbols) if symbols else self.symbols
+        await asyncio.sleep(self._prepare_request('ticker', 0 if len(symbols) == len(self.symbols) else len(symbols)))
+        return self._tickers(symbols)
+
+    async def fetch_ticker(self, symbol: str, params: Dict = None) -> Dict:
+        return (await self.fetch_tickers([symbol]))[symbol]
+
+    async def close(self):
+        pass
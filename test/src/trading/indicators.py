@@ -0,0 +1,542 @@
+# Moteur d'indicateurs techniques incrémental (mise à jour en O(1) par bougie)
+#
+# Chaque indicateur reproduit exactement les formules de la librairie `ta`
+# utilisée jusqu'ici par l'analyseur, mais conserve son état entre deux appels:
+# une nouvelle bougie ne coûte qu'une mise à jour au lieu d'un recalcul complet.
+
+import math
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+from market_core.levels import RollingExtreme, SupportResistanceIndex
+
+NAN = float('nan')
+
+
+def _safe_div(numerator: float, denominator: float) -> float:
+    """Division flottante avec la sémantique NumPy (inf/nan au lieu d'une exception)"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class EMA:
+    """Moyenne mobile exponentielle (équivalent de `ewm(adjust=False, min_periods=window)`)"""
+
+    __slots__ = ('alpha', 'min_periods', 'value', 'count')
+
+    def __init__(self, window: int, alpha: float = None):
+        self.alpha = alpha if alpha is not None else 2 / (window + 1)
+        self.min_periods = window
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float, commit: bool = True) -> float:
+        """Intègre une valeur; avec commit=False l'état n'est pas modifié"""
+        value = x if self.count == 0 else (1 - self.alpha) * self.value + self.alpha * x
+
+        if commit:
+            self.value = value
+            self.count += 1
+
+        return value if self.count + (0 if commit else 1) >= self.min_periods else NAN
+
+
+class RollingMean:
+    """Moyenne et écart-type (ddof=0) glissants par sommes cumulées"""
+
+    __slots__ = ('window', 'values', 'shift', 'total', 'total_sq', 'updates')
+
+    # Recalcul exact des sommes à intervalles réguliers pour borner la dérive numérique
+    RESYNC_INTERVAL = 1000
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def update(self, x: float, commit: bool = True):
+        """
+        Returns:
+            tuple: (moyenne, écart-type), NaN tant que la fenêtre n'est pas pleine
+        """
+        shift = x if self.shift is None else self.shift
+        total = self.total + (x - shift)
+        total_sq = self.total_sq + (x - shift) ** 2
+        count = len(self.values) + 1
+
+        if count > self.window:
+            oldest = self.values[0] - shift
+            total -= oldest
+            total_sq -= oldest ** 2
+            count = self.window
+
+        if commit:
+            self.values.append(x)
+            self.shift = shift
+            self.total, self.total_sq = total, total_sq
+            self.updates += 1
+            if self.updates % self.RESYNC_INTERVAL == 0:
+                self._resync()
+
+        if count < self.window:
+            return NAN, NAN
+
+        mean = total / count
+        variance = max(total_sq / count - mean ** 2, 0.0)
+        return shift + mean, math.sqrt(variance)
+
+    def _resync(self):
+        """Recalcule les sommes autour de la moyenne courante"""
+        self.shift = sum(self.values) / len(self.values)
+        self.total = sum(v - self.shift for v in self.values)
+        self.total_sq = sum((v - self.shift) ** 2 for v in self.values)
+
+
+class RSI:
+    """Relative Strength Index (lissage de Wilder, alpha = 1/window)"""
+
+    __slots__ = ('ema_up', 'ema_down', 'prev_close')
+
+    def __init__(self, window: int = 14):
+        self.ema_up = EMA(window, alpha=1 / window)
+        self.ema_down = EMA(window, alpha=1 / window)
+        self.prev_close = None
+
+    def update(self, close: float, commit: bool = True) -> float:
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        up = self.ema_up.update(diff if diff > 0 else 0.0, commit)
+        down = self.ema_down.update(-diff if diff < 0 else 0.0, commit)
+
+        if commit:
+            self.prev_close = close
+
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + _safe_div(up, down))
+
+
+class MACD:
+    """MACD, ligne de signal et histogramme"""
+
+    __slots__ = ('ema_fast', 'ema_slow', 'ema_signal')
+
+    def __init__(self, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9):
+        self.ema_fast = EMA(window_fast)
+        self.ema_slow = EMA(window_slow)
+        self.ema_signal = EMA(window_sign)
+
+    def update(self, close: float, commit: bool = True):
+        """
+        Returns:
+            tuple: (macd, signal, histogramme)
+        """
+        macd = self.ema_fast.update(close, commit) - self.ema_slow.update(close, commit)
+
+        # Comme `ta`, la ligne de signal démarre à la première valeur MACD définie
+        signal = self.ema_signal.update(macd, commit) if not math.isnan(macd) else NAN
+        return macd, signal, macd - signal
+
+
+class BollingerBands:
+    """Bandes de Bollinger (moyenne mobile simple +/- n écarts-types)"""
+
+    __slots__ = ('rolling', 'window_dev')
+
+    def __init__(self, window: int = 20, window_dev: float = 2):
+        self.rolling = RollingMean(window)
+        self.window_dev = window_dev
+
+    def update(self, close: float, commit: bool = True):
+        """
+        Returns:
+            tuple: (bande haute, moyenne, bande basse)
+        """
+        mean, std = self.rolling.update(close, commit)
+        return mean + self.window_dev * std, mean, mean - self.window_dev * std
+
+
+class Stochastic:
+    """Oscillateur stochastique %K et sa moyenne %D"""
+
+    __slots__ = ('highest', 'lowest', 'recent_k', 'smooth_window')
+
+    def __init__(self, window: int = 14, smooth_window: int = 3):
+        self.highest = RollingExtreme(window, 'max')
+        self.lowest = RollingExtreme(window, 'min')
+        self.recent_k = deque(maxlen=smooth_window)
+        self.smooth_window = smooth_window
+
+    def update(self, high: float, low: float, close: float, commit: bool = True):
+        """
+        Returns:
+            tuple: (%K, %D)
+        """
+        highest = self.highest.update(high, commit)
+        lowest = self.lowest.update(low, commit)
+        stoch_k = _safe_div(100 * (close - lowest), highest - lowest)
+
+        recent = list(self.recent_k)[-(self.smooth_window - 1):] + [stoch_k]
+        if commit:
+            self.recent_k.append(stoch_k)
+
+        if len(recent) < self.smooth_window or any(math.isnan(k) for k in recent):
+            return stoch_k, NAN
+        return stoch_k, sum(recent) / self.smooth_window
+
+
+class ADX:
+    """Average Directional Index et indicateurs directionnels +DI / -DI"""
+
+    __slots__ = ('window', 'count', 'prev_high', 'prev_low', 'prev_close',
+                 'trs', 'dip', 'din', 'dx_seed', 'adx')
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.count = 0
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.trs = self.dip = self.din = 0.0
+        self.dx_seed = []
+        self.adx = 0.0
+
+    def update(self, high: float, low: float, close: float, commit: bool = True):
+        """
+        Returns:
+            tuple: (adx, +DI, -DI) - 0 pendant la période de chauffe, comme `ta`
+        """
+        window = self.window
+        count = self.count
+        trs, dip, din = self.trs, self.dip, self.din
+        dx_seed, adx = self.dx_seed, self.adx
+        di_plus = di_minus = 0.0
+
+        if count > 0:
+            true_range = max(high, self.prev_close) - min(low, self.prev_close)
+            diff_up = high - self.prev_high
+            diff_down = self.prev_low - low
+            pos = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+            neg = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+
+            if count <= window:
+                # Amorçage: somme des `window` premières valeurs
+                trs, dip, din = trs + true_range, dip + pos, din + neg
+            else:
+                trs = trs - trs / float(window) + true_range
+                dip = dip - dip / float(window) + pos
+                din = din - din / float(window) + neg
+
+            if count >= window:
+                plus = 100 * _safe_div(dip, trs)
+                minus = 100 * _safe_div(din, trs)
+                dx = 100 * abs(_safe_div(plus - minus, plus + minus))
+
+                if count > window:
+                    di_plus, di_minus = plus, minus
+
+                if len(dx_seed) < window:
+                    dx_seed = dx_seed + [dx]
+                    if len(dx_seed) == window:
+                        adx = float(np.mean(dx_seed))
+                else:
+                    adx = (adx * (window - 1) + dx) / float(window)
+
+        if commit:
+            self.count = count + 1
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            self.trs, self.dip, self.din = trs, dip, din
+            self.dx_seed, self.adx = dx_seed, adx
+
+        return (adx if len(dx_seed) == window else 0.0), di_plus, di_minus
+
+
+class IndicatorEngine:
+    """
+    État incrémental de tous les indicateurs de l'analyseur pour une série
+
+    Les bougies clôturées sont intégrées définitivement avec `update`; la
+    bougie en cours de formation est évaluée avec `preview` sans modifier
+    l'état, puis intégrée une fois clôturée.
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.reset()
+
+    def reset(self):
+        """Réinitialise l'état de tous les indicateurs"""
+        config = self.config
+        self.last_timestamp = None
+        self.rsi = RSI(config['rsi_period'])
+        self.macd = MACD(config['macd_fast'], config['macd_slow'], config['macd_signal'])
+        self.bollinger = BollingerBands(config['bb_period'], config['bb_std'])
+        self.ema_9 = EMA(9)
+        self.ema_21 = EMA(21)
+        self.ema_50 = EMA(50)
+        self.stochastic = Stochastic()
+        self.adx = ADX()
+        self.resistance = RollingExtreme(20, 'max')
+        self.support = RollingExtreme(20, 'min')
+        self.levels = SupportResistanceIndex()
+
+    def update(self, timestamp: int, high: float, low: float, close: float) -> Dict:
+        """Intègre une bougie clôturée"""
+        self.last_timestamp = timestamp
+        self.levels.update(high, low)
+        return self._step(high, low, close, True)
+
+    def preview(self, high: float, low: float, close: float) -> Dict:
+        """Valeurs des indicateurs si la bougie donnée était la suivante"""
+        return self._step(high, low, close, False)
+
+    def sync(self, timestamps, highs, lows, closes) -> Dict:
+        """
+        Met l'état à jour avec une série dont la dernière bougie est en cours
+
+        Seules les bougies clôturées postérieures à la dernière intégrée sont
+        traitées; si la série ne prolonge pas l'état (trou, rechargement),
+        l'état est reconstruit depuis le début de la série.
+
+        Returns:
+            Dict: Indicateurs calculés pour la dernière bougie de la série
+        """
+        start = 0
+        if self.last_timestamp is not None:
+            position = int(np.searchsorted(timestamps, self.last_timestamp))
+            if position < len(timestamps) - 1 and timestamps[position] == self.last_timestamp:
+                start = position + 1
+            else:
+                self.reset()
+
+        for i in range(start, len(timestamps) - 1):
+            self.update(int(timestamps[i]), float(highs[i]), float(lows[i]), float(closes[i]))
+
+        return self.preview(float(highs[-1]), float(lows[-1]), float(closes[-1]))
+
+    def _step(self, high: float, low: float, close: float, commit: bool) -> Dict:
+        indicators = {}
+
+        indicators['rsi'] = self.rsi.update(close, commit)
+
+        macd, macd_signal, macd_histogram = self.macd.update(close, commit)
+        indicators['macd'] = macd
+        indicators['macd_signal'] = macd_signal
+        indicators['macd_histogram'] = macd_histogram
+
+        bb_upper, bb_middle, bb_lower = self.bollinger.update(close, commit)
+        indicators['bb_upper'] = bb_upper
+        indicators['bb_middle'] = bb_middle
+        indicators['bb_lower'] = bb_lower
+        indicators['bb_position'] = _safe_div(close - bb_lower, bb_upper - bb_lower)
+
+        indicators['ema_9'] = self.ema_9.update(close, commit)
+        indicators['ema_21'] = self.ema_21.update(close, commit)
+        indicators['ema_50'] = self.ema_50.update(close, commit)
+
+        indicators['stoch_k'], indicators['stoch_d'] = self.stochastic.update(high, low, close, commit)
+
+        indicators['adx'], indicators['di_plus'], indicators['di_minus'] = self.adx.update(high, low, close, commit)
+
+        resistance = self.resistance.update(high, commit)
+        support = self.support.update(low, commit)
+        indicators['support'] = support
+        indicators['resistance'] = resistance
+        indicators['distance_to_support'] = _safe_div(close - support, close) * 100
+        indicators['distance_to_resistance'] = _safe_div(resistance - close, close) * 100
+
+        return indicators
+
+
+# Calcul vectorisé sur plusieurs séries alignées
+#
+# Les fonctions suivantes opèrent sur des tableaux (symboles x bougies) et
+# renvoient la valeur de chaque indicateur sur la dernière bougie de chaque
+# ligne, avec les mêmes formules que les classes incrémentales ci-dessus.
+
+def ema_rows(values: np.ndarray, window: int, alpha: float = None) -> np.ndarray:
+    """EMA de chaque ligne d'un tableau (N x T), NaN avant `window` valeurs"""
+    alpha = alpha if alpha is not None else 2 / (window + 1)
+    result = np.empty_like(values)
+    current = values[:, 0].copy()
+    result[:, 0] = current
+
+    for t in range(1, values.shape[1]):
+        current = (1 - alpha) * current + alpha * values[:, t]
+        result[:, t] = current
+
+    result[:, :window - 1] = np.nan
+    return result
+
+
+def _adx_rows(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, window: int = 14):
+    """ADX, +DI et -DI sur la dernière bougie de chaque ligne"""
+    rows, length = closes.shape
+    trs = np.zeros(rows)
+    dip = np.zeros(rows)
+    din = np.zeros(rows)
+    plus = minus = np.zeros(rows)
+    dx_seed = []
+    adx = np.zeros(rows)
+
+    for t in range(1, length):
+        prev_close = closes[:, t - 1]
+        true_range = np.maximum(highs[:, t], prev_close) - np.minimum(lows[:, t], prev_close)
+        diff_up = highs[:, t] - highs[:, t - 1]
+        diff_down = lows[:, t - 1] - lows[:, t]
+        pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+        neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+        if t <= window:
+            trs, dip, din = trs + true_range, dip + pos, din + neg
+        else:
+            trs = trs - trs / float(window) + true_range
+            dip = dip - dip / float(window) + pos
+            din = din - din / float(window) + neg
+
+        if t >= window:
+            plus = 100 * (dip / trs)
+            minus = 100 * (din / trs)
+            dx = 100 * np.abs((plus - minus) / (plus + minus))
+
+            if len(dx_seed) < window:
+                dx_seed.append(dx)
+                if len(dx_seed) == window:
+                    adx = np.mean(dx_seed, axis=0)
+            else:
+                adx = (adx * (window - 1) + dx) / float(window)
+
+    if len(dx_seed) < window:
+        adx = np.zeros(rows)
+    if length - 1 <= window:
+        plus = minus = np.zeros(rows)
+
+    return adx, plus, minus
+
+
+def compute_indicators_batch(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                             config: Dict) -> Dict[str, np.ndarray]:
+    """
+    Indicateurs de l'analyseur pour N séries alignées
+
+    Args:
+        highs, lows, closes (np.ndarray): Tableaux (N x T)
+        config (Dict): Configuration des indicateurs de l'analyseur
+
+    Returns:
+        Dict[str, np.ndarray]: Valeur de chaque indicateur (vecteur de taille N)
+    """
+    indicators = {}
+    last_close = closes[:, -1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # RSI
+        period = config['rsi_period']
+        diff = np.diff(closes, axis=1, prepend=closes[:, :1])
+        ema_up = ema_rows(np.where(diff > 0, diff, 0.0), period, 1 / period)[:, -1]
+        ema_down = ema_rows(np.where(diff < 0, -diff, 0.0), period, 1 / period)[:, -1]
+        indicators['rsi'] = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+        # MACD (la ligne de signal démarre à la première valeur MACD définie)
+        slow = config['macd_slow']
+        macd = ema_rows(closes, config['macd_fast']) - ema_rows(closes, slow)
+        macd_signal = np.full(closes.shape[0], np.nan)
+        if closes.shape[1] >= slow:
+            macd_signal = ema_rows(macd[:, slow - 1:], config['macd_signal'])[:, -1]
+        indicators['macd'] = macd[:, -1]
+        indicators['macd_signal'] = macd_signal
+        indicators['macd_histogram'] = macd[:, -1] - macd_signal
+
+        # Bollinger Bands
+        window = closes[:, -config['bb_period']:]
+        mean = window.mean(axis=1)
+        std = window.std(axis=1)
+        indicators['bb_upper'] = mean + config['bb_std'] * std
+        indicators['bb_middle'] = mean
+        indicators['bb_lower'] = mean - config['bb_std'] * std
+        indicators['bb_position'] = (last_close - indicators['bb_lower']) / (indicators['bb_upper'] - indicators['bb_lower'])
+
+        # EMA
+        for period in (9, 21, 50):
+            indicators[f'ema_{period}'] = ema_rows(closes, period)[:, -1]
+
+        # Stochastic (%K sur les 3 dernières bougies pour %D)
+        highest = np.lib.stride_tricks.sliding_window_view(highs[:, -16:], 14, axis=1).max(axis=2)
+        lowest = np.lib.stride_tricks.sliding_window_view(lows[:, -16:], 14, axis=1).min(axis=2)
+        stoch_k = 100 * (closes[:, -3:] - lowest) / (highest - lowest)
+        indicators['stoch_k'] = stoch_k[:, -1]
+        indicators['stoch_d'] = stoch_k.mean(axis=1)
+
+        # ADX
+        indicators['adx'], indicators['di_plus'], indicators['di_minus'] = _adx_rows(highs, lows, closes)
+
+        # Support et résistance
+        resistance = highs[:, -20:].max(axis=1)
+        support = lows[:, -20:].min(axis=1)
+        indicators['support'] = support
+        indicators['resistance'] = resistance
+        indicators['distance_to_support'] = (last_close - support) / last_close * 100
+        indicators['distance_to_resistance'] = (resistance - last_close) / last_close * 100
+
+    return indicators
+
+
+# Historique complet des indicateurs
+#
+# Mêmes formules que ci-dessus, mais chaque indicateur est renvoyé pour toutes
+# les bougies (tableaux N x T, NaN tant que la fenêtre n'est pas remplie).
+
+def rolling_rows(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Applique `reducer` sur une fenêtre glissante de chaque ligne (N x T)"""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+        result[:, window - 1:] = reducer(windows, axis=2)
+    return result
+
+
+def compute_indicator_history(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                              config: Dict) -> Dict[str, np.ndarray]:
+    """
+    RSI, MACD, Bollinger Bands et EMA sur tout l'historique de N séries
+
+    Args:
+        highs, lows, closes (np.ndarray): Tableaux (N x T)
+        config (Dict): Configuration des indicateurs de l'analyseur
+
+    Returns:
+        Dict[str, np.ndarray]: Série de chaque indicateur (N x T)
+    """
+    history = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = config['rsi_period']
+        diff = np.diff(closes, axis=1, prepend=closes[:, :1])
+        ema_up = ema_rows(np.where(diff > 0, diff, 0.0), period, 1 / period)
+        ema_down = ema_rows(np.where(diff < 0, -diff, 0.0), period, 1 / period)
+        history['rsi'] = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+        slow = config['macd_slow']
+        macd = ema_rows(closes, config['macd_fast']) - ema_rows(closes, slow)
+        macd_signal = np.full(closes.shape, np.nan)
+        if closes.shape[1] >= slow:
+            macd_signal[:, slow - 1:] = ema_rows(macd[:, slow - 1:], config['macd_signal'])
+        history['macd'] = macd
+        history['macd_signal'] = macd_signal
+        history['macd_histogram'] = macd - macd_signal
+
+        mean = rolling_rows(closes, config['bb_period'], np.mean)
+        std = rolling_rows(closes, config['bb_period'], np.std)
+        history['bb_upper'] = mean + config['bb_std'] * std
+        history['bb_middle'] = mean
+        history['bb_lower'] = mean - config['bb_std'] * std
+
+        for period in (9, 21, 50):
+            history[f'ema_{period}'] = ema_rows(closes, period)
+
+    return history
@@ -0,0 +1,144 @@
+# Contexte de marché calculé sur l'univers analysé, partagé par les signaux d'un cycle
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Sequence
+
+import numpy as np
+
+from src.trading.candle_store import timeframe_to_ms
+
+# Seuils de classification (volatilité réalisée sur la fenêtre en %, ADX médian)
+VOLATILITY_LEVELS = ((2.0, 'low'), (5.0, 'medium'))
+TREND_STRENGTH_LEVELS = ((20.0, 'weak'), (30.0, 'moderate'))
+
+
+def _classify(value: float, levels, default: str) -> str:
+    for threshold, label in levels:
+        if value < threshold:
+            return label
+    return default
+
+
+class MarketContextEngine:
+    """
+    Contexte général du marché, calculé une fois par cycle d'analyse
+
+    Les indicateurs sont tirés des bougies déjà présentes dans le CandleStore
+    et des dernières analyses de chaque paire, sans requête supplémentaire:
+
+    - largeur du marché: part des paires en hausse sur la fenêtre;
+    - volatilité agrégée: médiane de la volatilité réalisée des paires;
+    - dominance BTC (approximation): part de la paire de référence dans le
+      volume échangé de l'univers sur la fenêtre;
+    - force de tendance: ADX médian des analyses.
+
+    Les analyses du scan de l'univers et celles des symboles suivis par le
+    flux websocket arrivent séparément: la dernière analyse de chaque paire
+    est conservée (tant qu'elle date de moins de deux bougies) pour que le
+    contexte couvre toujours l'ensemble des paires, quel que soit le chemin
+    qui déclenche le calcul. Le résultat est conservé jusqu'au calcul suivant
+    et partagé par tous les signaux générés entre-temps.
+    """
+
+    def __init__(self, candle_store, timeframe: str = '1h', window: str = '1d', reference: str = 'BTC/USDT'):
+        """
+        Args:
+            candle_store: CandleStore de l'analyseur
+            timeframe (str): Timeframe des bougies utilisées
+            window (str): Fenêtre des variations et de la volatilité
+            reference (str): Paire servant au calcul de la dominance
+        """
+        self.candle_store = candle_store
+        self.timeframe = timeframe
+        self.bars = max(timeframe_to_ms(window) // timeframe_to_ms(timeframe), 1)
+        self.reference = reference
+        self.max_age = timedelta(milliseconds=2 * timeframe_to_ms(timeframe))
+        self.context: Dict = {}
+        self._analyses: Dict[str, Dict] = {}
+
+    def compute(self, analyses: Sequence[Dict], symbols: Sequence[str] = ()) -> Dict:
+        """
+        Recalcule le contexte après de nouvelles analyses
+
+        Args:
+            analyses: Analyses venant d'être calculées (scan ou flux)
+            symbols: Paires à inclure même sans analyse récente (bougies du
+                CandleStore uniquement, sans ADX)
+
+        Returns:
+            dict: Contexte partagé (vide si aucune paire n'a assez de bougies)
+        """
+        try:
+            now = datetime.utcnow()
+            for analysis in analyses:
+                if not analysis.get('error') and analysis.get('timeframe', self.timeframe) == self.timeframe:
+                    self._analyses[analysis['symbol']] = analysis
+            self._analyses = {symbol: analysis for symbol, analysis in self._analyses.items()
+                              if now - analysis.get('timestamp', now) <= self.max_age}
+            latest = list(self._analyses.values())
+
+            symbols_with_candles, series = [], []
+            for symbol in dict.fromkeys([*self._analyses, *symbols]):
+                candles = self.candle_store.peek(symbol, self.timeframe, self.bars + 1)
+                if candles is not None and len(candles) == self.bars + 1:
+                    symbols_with_candles.append(symbol)
+                    series.append(candles)
+            symbols = symbols_with_candles
+
+            if not series:
+                return self.context
+
+            stacked = np.stack(series)
+            closes, volumes = stacked[:, :, 4], stacked[:, :, 5]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                changes = (closes[:, -1] / closes[:, 0] - 1) * 100
+                log_returns = np.diff(np.log(closes), axis=1)
+                volatility = log_returns.std(axis=1) * np.sqrt(self.bars) * 100
+                quote_volumes = (closes * volumes).sum(axis=1)
+
+            valid = np.isfinite(changes) & np.isfinite(volatility)
+            if not valid.any():
+                return self.context
+
+            changes, volatility, quote_volumes = changes[valid], volatility[valid], quote_volumes[valid]
+            symbols = [symbol for symbol, keep in zip(symbols, valid) if keep]
+
+            advancing = int((changes > 0).sum())
+            declining = int((changes < 0).sum())
+            breadth = advancing / len(changes) * 100
+            total_volume = quote_volumes.sum()
+            market_change = float(np.average(changes, weights=quote_volumes)) if total_volume > 0 else float(changes.mean())
+
+            reference_volume = quote_volumes[symbols.index(self.reference)] if self.reference in symbols else 0.0
+            adx = [a['indicators']['adx'] for a in latest if np.isfinite(a.get('indicators', {}).get('adx', np.nan))]
+            median_adx = float(np.median(adx)) if adx else 0.0
+            median_volatility = float(np.median(volatility))
+
+            if breadth >= 60 and market_change > 0:
+                trend = 'bullish'
+            elif breadth <= 40 and market_change < 0:
+                trend = 'bearish'
+            else:
+                trend = 'sideways'
+
+            self.context = {
+                'overall_trend': trend,
+                'trend_strength': _classify(median_adx, TREND_STRENGTH_LEVELS, 'strong'),
+                'market_volatility': _classify(median_volatility, VOLATILITY_LEVELS, 'high'),
+                'btc_dominance': round(float(reference_volume / total_volume * 100), 2) if total_volume > 0 else 0.0,
+                'total_market_cap_change': round(market_change, 2),
+                'breadth': round(breadth, 1),
+                'advancing': advancing,
+                'declining': declining,
+                'volatility_pct': round(median_volatility, 2),
+                'median_adx': round(median_adx, 1),
+                'symbols': len(changes),
+                'computed_at': now.isoformat()
+            }
+            return self.context
+
+        except Exception as e:
+            logging.error(f"Erreur lors du calcul du contexte de marché: {e}")
+            return self.context
@@ -0,0 +1,191 @@
+# Flux de marché Binance en websocket (bougies et prix en temps réel)
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import websocket
+
+from src.trading.candle_store import CandleStore
+
+DEFAULT_STREAM_URL = 'wss://stream.binance.com:9443'
+
+# Callback appelé à la clôture d'une bougie: on_bar_close(symbol, timeframe, candle)
+BarCloseCallback = Callable[[str, str, list], Optional[Awaitable[None]]]
+
+
+def stream_symbol(symbol: str) -> str:
+    """Nom de flux Binance d'un symbole ccxt ('BTC/USDT' -> 'btcusdt')"""
+    return symbol.replace('/', '').lower()
+
+
+class MarketDataFeed:
+    """
+    Abonnement aux flux kline et miniTicker de Binance
+
+    La connexion websocket tourne dans un thread (websocket-client est
+    synchrone); chaque message est décodé dans ce thread puis transmis à la
+    boucle asyncio, qui met à jour le CandleStore et déclenche `on_bar_close`
+    dès qu'une bougie se clôture. En cas de coupure, la reconnexion se fait
+    avec un délai exponentiel; le REST comble les bougies manquées.
+    """
+
+    def __init__(self, candle_store: CandleStore, symbols: Iterable[str], timeframes: Iterable[str] = ('1h',),
+                 url: str = DEFAULT_STREAM_URL, tickers: bool = True,
+                 on_bar_close: BarCloseCallback = None, max_backoff: float = 60.0):
+        """
+        Args:
+            candle_store: Stockage des bougies à alimenter
+            symbols: Symboles ccxt à suivre
+            timeframes: Timeframes des flux kline
+            url (str): Adresse du serveur websocket (sans /stream)
+            tickers (bool): Abonnement aux flux miniTicker (dernier prix)
+            on_bar_close: Fonction ou coroutine appelée à chaque bougie clôturée
+            max_backoff (float): Délai maximum entre deux tentatives de reconnexion
+        """
+        self.candle_store = candle_store
+        self.symbols = {stream_symbol(symbol).upper(): symbol for symbol in symbols}
+        self.timeframes = list(timeframes)
+        self.url = url.rstrip('/')
+        self.tickers = tickers
+        self.on_bar_close = on_bar_close
+        self.max_backoff = max_backoff
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+
+        self.stats = {
+            'messages': 0,
+            'candles': 0,
+            'bars_closed': 0,
+            'reconnects': 0,
+            'errors': 0,
+            'last_message_at': None
+        }
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def stream_url(self) -> str:
+        """URL des flux combinés"""
+        streams = []
+        for name in self.symbols:
+            streams.extend(f'{name.lower()}@kline_{timeframe}' for timeframe in self.timeframes)
+            if self.tickers:
+                streams.append(f'{name.lower()}@miniTicker')
+        return f"{self.url}/stream?streams={'/'.join(streams)}"
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        """Démarre le flux dans un thread dédié"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self.loop = loop or asyncio.get_running_loop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='market-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Ferme la connexion et attend la fin du thread"""
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._connected.clear()
+
+    def wait_connected(self, timeout: float = None) -> bool:
+        """Attend (de façon bloquante) l'ouverture de la connexion"""
+        return self._connected.wait(timeout)
+
+    def _run(self):
+        """Boucle de connexion avec reconnexion exponentielle"""
+        attempt = 0
+
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.stream_url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            opened_at = time.monotonic()
+            self._ws.run_forever(ping_interval=60, ping_timeout=20)
+            self._connected.clear()
+
+            if self._stop.is_set():
+                break
+
+            # Une connexion restée ouverte un moment remet le délai à zéro
+            attempt = 0 if time.monotonic() - opened_at > self.max_backoff else attempt + 1
+            delay = min(self.max_backoff, 2 ** attempt) * random.uniform(0.5, 1.0)
+            self.stats['reconnects'] += 1
+            logging.warning(f"Flux de marché interrompu, reconnexion dans {delay:.1f}s")
+            self._stop.wait(delay)
+
+    def _on_open(self, ws):
+        self._connected.set()
+        logging.info(f"Flux de marché connecté ({len(self.symbols)} symboles)")
+
+    def _on_error(self, ws, error):
+        self.stats['errors'] += 1
+        logging.error(f"Erreur du flux de marché: {error}")
+
+    def _on_close(self, ws, status_code, message):
+        self._connected.clear()
+
+    def _on_message(self, ws, message):
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+        except ValueError as e:
+            logging.error(f"Message de flux invalide: {e}")
+            return
+
+        self.stats['messages'] += 1
+        self.stats['last_message_at'] = time.time()
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._dispatch, data)
+
+    def _dispatch(self, data: Dict):
+        """Traitement d'un message dans la boucle asyncio"""
+        try:
+            event = data.get('e')
+            symbol = self.symbols.get(data.get('s'))
+            if symbol is None:
+                return
+
+            if event == 'kline':
+                self._handle_kline(symbol, data['k'])
+            elif event == '24hrMiniTicker':
+                self.candle_store.update_price(symbol, float(data['c']))
+
+        except Exception as e:
+            logging.error(f"Erreur lors du traitement du flux de marché: {e}")
+
+    def _handle_kline(self, symbol: str, kline: Dict):
+        timeframe = kline['i']
+        candle = [
+            int(kline['t']), float(kline['o']), float(kline['h']),
+            float(kline['l']), float(kline['c']), float(kline['v'])
+        ]
+
+        if self.candle_store.apply_stream_candle(symbol, timeframe, candle):
+            self.stats['candles'] += 1
+        self.candle_store.update_price(symbol, candle[4])
+
+        if kline.get('x') and self.on_bar_close is not None:
+            self.stats['bars_closed'] += 1
+            result = self.on_bar_close(symbol, timeframe, candle)
+            if asyncio.iscoroutine(result):
+                self.loop.create_task(result)
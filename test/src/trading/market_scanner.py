@@ -0,0 +1,369 @@
+# Scan de tout l'univers de paires, réparti sur un pool de processus
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.trading.analysis_cache import analysis_key
+from src.trading.analysis_core import AnalysisCore
+from src.trading.candle_store import OHLCV_COLUMNS
+from src.trading.rate_limiter import binance_request_weight
+from src.utils.metrics import ANALYSIS_STAGE_SECONDS, SCAN_SKIPPED_SYMBOLS, timed
+
+# Calculs d'analyse propres à chaque processus du pool (voir _init_worker)
+_worker_analyzer: Optional[AnalysisCore] = None
+
+
+def _init_worker(indicators_config: Dict, ml_model):
+    """
+    Initialisation d'un processus du pool avec la configuration de l'analyseur principal
+
+    Les processus ne font que des calculs: seul AnalysisCore est construit,
+    sans client d'exchange, session HTTP ni chargement du modèle depuis le disque.
+    """
+    global _worker_analyzer
+    _worker_analyzer = AnalysisCore(indicators_config, ml_model)
+
+
+def select_broadcast(analyses: Sequence[Dict], core_symbols: Sequence[str], max_signals: int,
+                     min_confidence: float) -> List[Dict]:
+    """
+    Analyses d'un scan à diffuser sur Discord
+
+    Les symboles principaux sont tous conservés (comme avant le scan de
+    l'univers); pour les autres paires, seuls les `max_signals` signaux
+    BUY/SELL les plus confiants au-dessus de `min_confidence` sont retenus,
+    pour rester dans les limites d'envoi de Discord à chaque cycle.
+    """
+    core = set(core_symbols)
+    candidates = [
+        analysis for analysis in analyses
+        if analysis['symbol'] not in core and not analysis.get('error')
+        and analysis.get('signal', 'HOLD') != 'HOLD' and analysis.get('confidence', 0) >= min_confidence
+    ]
+    candidates.sort(key=lambda analysis: analysis['confidence'], reverse=True)
+    return [analysis for analysis in analyses if analysis['symbol'] in core] + candidates[:max(max_signals, 0)]
+
+
+def analyze_rows(analyzer, symbols: Sequence[str], timeframe: str, stacked: np.ndarray) -> List[Dict]:
+    """
+    Analyse vectorisée d'un lot de séries de même longueur (N x T x 6)
+
+    Un échec renvoie une réponse d'erreur par symbole plutôt qu'une
+    exception, pour que le lot ne garde aucune référence à `stacked`.
+    """
+    try:
+        stage = analyzer._analyze_batch(stacked)
+        ml_signals = analyzer._get_ml_predictions(stage['features'])
+        return analyzer._finalize_batch(symbols, timeframe, stage, ml_signals)
+    except Exception as e:
+        logging.error(f"Erreur lors de l'analyse groupée de {len(symbols)} symboles: {e}")
+        return [analyzer._get_error_response(symbol, str(e)) for symbol in symbols]
+
+
+def _analyze_shard(block_name: str, shape: Tuple[int, int, int], start: int, stop: int,
+                   symbols: List[str], timeframe: str) -> List[Dict]:
+    """Tâche d'un processus du pool: lignes [start, stop) du bloc partagé, lues sans copie"""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        return analyze_rows(_worker_analyzer, symbols, timeframe,
+                            np.ndarray(shape, dtype=np.float64, buffer=block.buf)[start:stop])
+    finally:
+        block.close()
+
+
+class MarketScanner:
+    """
+    Analyse périodique de toutes les paires d'une devise de cotation
+
+    Chaque cycle récupère les bougies par le CandleStore de l'analyseur
+    (ordonnanceur de requêtes, cache disque), les copie une seule fois dans
+    un bloc de mémoire partagée (symboles x bougies x 6), puis répartit des
+    tranches de lignes entre les processus du pool, qui lisent le bloc sans
+    copie et ne renvoient que les résultats. Le cycle est borné par
+    `budget` secondes: les symboles non récupérés ou non analysés à temps
+    sont signalés comme ignorés et passent en tête du cycle suivant.
+    """
+
+    def __init__(self, analyzer, interval: float = 300, budget: float = None, workers: int = None,
+                 shard_size: int = 50, quote: str = 'USDT', max_symbols: int = 0,
+                 fetch_share: float = 0.7, universe_ttl: float = 3600):
+        """
+        Args:
+            analyzer: TradingAnalyzer fournissant les bougies et les calculs
+            interval (float): Intervalle entre deux cycles, en secondes
+            budget (float): Durée maximale d'un cycle (80% de l'intervalle par défaut)
+            workers (int): Processus de calcul (par défaut un par coeur, moins celui de la
+                boucle asyncio; 0 pour calculer dans le processus principal)
+            shard_size (int): Symboles par tâche envoyée au pool
+            quote (str): Devise de cotation des paires scannées
+            max_symbols (int): Limite de l'univers, par volume décroissant (0 = toutes)
+            fetch_share (float): Part du budget réservée à la récupération des bougies
+            universe_ttl (float): Durée de validité de la liste des paires, en secondes
+        """
+        self.analyzer = analyzer
+        self.interval = interval
+        self.budget = budget if budget is not None else interval * 0.8
+        self.workers = max((os.cpu_count() or 1) - 1, 0) if workers is None else workers
+        self.shard_size = shard_size
+        self.quote = quote
+        self.max_symbols = max_symbols
+        self.fetch_share = fetch_share
+        self.universe_ttl = universe_ttl
+
+        self.universe: List[str] = []
+        self._universe_loaded = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Symboles ignorés au cycle précédent, traités en priorité
+        self._backlog: List[str] = []
+        self.last_scan: Dict = {}
+
+    async def load_universe(self, reload: bool = False) -> List[str]:
+        """Paires spot actives de la devise de cotation, par volume sur 24h décroissant"""
+        if self.universe and not reload and time.monotonic() - self._universe_loaded < self.universe_ttl:
+            return self.universe
+
+        exchange = self.analyzer._get_exchange('binance')
+        scheduler = self.analyzer.request_scheduler
+        try:
+            await scheduler.acquire(binance_request_weight('exchange_info'))
+            markets = await exchange.load_markets(reload=True)
+            symbols = [
+                symbol for symbol, market in markets.items()
+                if market.get('quote') == self.quote and market.get('active', True) and market.get('spot', True)
+            ]
+        except Exception as e:
+            logging.error(f"Erreur lors du chargement des marchés: {e}")
+            return self.universe
+
+        try:
+            await scheduler.acquire(binance_request_weight('ticker', 0))
+            tickers = await exchange.fetch_tickers()
+            symbols.sort(key=lambda symbol: -((tickers.get(symbol) or {}).get('quoteVolume') or 0))
+        except Exception as e:
+            logging.error(f"Erreur lors de la récupération des volumes: {e}")
+            symbols.sort()
+
+        self.universe = symbols[:self.max_symbols] if self.max_symbols else symbols
+        self._universe_loaded = time.monotonic()
+        logging.info(f"Univers de scan: {len(self.universe)} paires {self.quote}")
+        return self.universe
+
+    async def scan(self, timeframe: str = '1h', limit: int = 200, exclude: Sequence[str] = ()) -> Dict:
+        """
+        Cycle complet sur l'univers, terminé en `budget` secondes au plus
+
+        Args:
+            timeframe (str): Timeframe d'analyse
+            limit (int): Nombre de bougies par symbole
+            exclude: Symboles analysés par ailleurs (flux websocket)
+
+        Returns:
+            dict: 'analyses' (résultats valides, dans l'ordre de l'univers),
+                'skipped' (raison par symbole ignoré) et 'stats'
+        """
+        started = time.monotonic()
+        deadline = started + self.budget
+        universe = await self.load_universe()
+
+        excluded, backlog = set(exclude), set(self._backlog)
+        symbols = [symbol for symbol in universe if symbol in backlog and symbol not in excluded]
+        symbols += [symbol for symbol in universe if symbol not in backlog and symbol not in excluded]
+        results: Dict[str, Dict] = {}
+        skipped: Dict[str, str] = {}
+
+        # Analyses encore valides pour la bougie en cours
+        to_fetch = []
+        for symbol in symbols:
+            cached = self.analyzer.analysis_cache.get(analysis_key(symbol, timeframe, limit, scanned=True))
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                to_fetch.append(symbol)
+
+        with timed(ANALYSIS_STAGE_SECONDS, stage='scan_fetch'):
+            fetched = await self._fetch(to_fetch, timeframe, limit, started + self.budget * self.fetch_share,
+                                        skipped)
+        fetch_seconds = time.monotonic() - started
+
+        with timed(ANALYSIS_STAGE_SECONDS, stage='scan_compute'):
+            analyses = await self._compute(fetched, timeframe, limit, deadline, skipped)
+
+        for symbol, analysis in analyses.items():
+            if analysis.get('error'):
+                skipped[symbol] = 'analysis_error'
+            else:
+                results[symbol] = analysis
+                self.analyzer.analysis_cache.put(analysis_key(symbol, timeframe, limit, scanned=True), analysis)
+
+        for reason in skipped.values():
+            SCAN_SKIPPED_SYMBOLS.labels(reason=reason).inc()
+        self._backlog = [symbol for symbol in symbols if symbol in skipped]
+
+        duration = time.monotonic() - started
+        stats = {
+            'universe': len(symbols),
+            'cached': len(symbols) - len(to_fetch),
+            'analyzed': len(results),
+            'skipped': len(skipped),
+            'workers': self.workers,
+            'fetch_seconds': round(fetch_seconds, 3),
+            'compute_seconds': round(duration - fetch_seconds, 3),
+            'duration': round(duration, 3)
+        }
+        self.last_scan = {'stats': stats, 'skipped': dict(skipped)}
+
+        if skipped:
+            logging.warning(f"Scan {timeframe}: {len(skipped)} symboles ignorés sur {len(symbols)} "
+                            f"({', '.join(sorted(set(skipped.values())))})")
+
+        return {
+            'analyses': [results[symbol] for symbol in symbols if symbol in results],
+            'skipped': skipped,
+            'stats': stats
+        }
+
+    async def _fetch(self, symbols: List[str], timeframe: str, limit: int, deadline: float,
+                     skipped: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Bougies des symboles récupérées avant `deadline`, les autres sont ignorés"""
+        if not symbols:
+            return {}
+
+        durations = {}
+        tasks = {
+            asyncio.create_task(self.analyzer._fetch_with_deadline(
+                symbol, timeframe, limit, self.analyzer.symbol_timeout, durations
+            )): symbol
+            for symbol in symbols
+        }
+        done, pending = await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+
+        for task in pending:
+            task.cancel()
+            skipped[tasks[task]] = 'fetch_timeout'
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        fetched = {}
+        for task in done:
+            symbol = tasks[task]
+            if task.exception() is not None:
+                skipped[symbol] = 'fetch_error'
+            else:
+                fetched[symbol] = np.asarray(task.result(), dtype=np.float64)
+
+        # Ordre de l'univers conservé pour le découpage en tranches
+        return {symbol: fetched[symbol] for symbol in symbols if symbol in fetched}
+
+    async def _compute(self, fetched: Dict[str, np.ndarray], timeframe: str, limit: int, deadline: float,
+                       skipped: Dict[str, str]) -> Dict[str, Dict]:
+        """Analyses des séries récupérées, celles non terminées avant `deadline` sont ignorées"""
+        analyses = {}
+        full = []
+
+        # Séries courtes (paires récemment listées): analyse unitaire dans le processus principal
+        for symbol, ohlcv in fetched.items():
+            if len(ohlcv) == limit and limit >= self.analyzer.MIN_BATCH_CANDLES:
+                full.append(symbol)
+                continue
+            try:
+                analyses[symbol] = self.analyzer._analyze_ohlcv(symbol, timeframe, ohlcv)
+            except Exception as e:
+                logging.error(f"Erreur lors de l'analyse de {symbol}: {e}")
+                analyses[symbol] = self.analyzer._get_error_response(symbol, str(e))
+
+        if not full:
+            return analyses
+
+        shape = (len(full), limit, OHLCV_COLUMNS)
+        shards = [(start, min(start + self.shard_size, len(full))) for start in range(0, len(full), self.shard_size)]
+
+        if self.workers <= 0:
+            stacked = np.stack([fetched[symbol] for symbol in full])
+            for start, stop in shards:
+                if time.monotonic() >= deadline:
+                    skipped.update((symbol, 'compute_timeout') for symbol in full[start:stop])
+                    continue
+                analyses.update(zip(full[start:stop],
+                                    analyze_rows(self.analyzer, full[start:stop], timeframe, stacked[start:stop])))
+            return analyses
+
+        # Une seule copie des bougies, dans le bloc partagé lu par les processus
+        block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            rows = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+            for row, symbol in enumerate(full):
+                rows[row] = fetched[symbol]
+            del rows
+
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            futures = {
+                loop.run_in_executor(pool, _analyze_shard, block.name, shape, start, stop,
+                                     full[start:stop], timeframe): (start, stop)
+                for start, stop in shards
+            }
+            done, pending = await asyncio.wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+            for future in pending:
+                future.cancel()
+                start, stop = futures[future]
+                skipped.update((symbol, 'compute_timeout') for symbol in full[start:stop])
+
+            for future in done:
+                start, stop = futures[future]
+                try:
+                    analyses.update(zip(full[start:stop], future.result()))
+                except BrokenProcessPool as e:
+                    logging.error(f"Erreur du pool de calcul: {e}")
+                    self._reset_pool()
+                    skipped.update((symbol, 'worker_error') for symbol in full[start:stop])
+                except Exception as e:
+                    logging.error(f"Erreur lors de l'analyse d'une tranche du scan: {e}")
+                    skipped.update((symbol, 'worker_error') for symbol in full[start:stop])
+        finally:
+            # Les processus encore en cours gardent leur projection après unlink
+            block.close()
+            block.unlink()
+
+        return analyses
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Pool créé à la demande; 'spawn' évite de dupliquer les threads du bot (websocket, métriques)"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.analyzer.indicators_config, self.analyzer.ml_model)
+            )
+        return self._pool
+
+    def _reset_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def start(self):
+        """Démarre les processus du pool avant le premier cycle (import des modules, modèle ML)"""
+        if self.workers <= 0:
+            return
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(self.workers)))
+        except Exception as e:
+            logging.error(f"Erreur lors du démarrage du pool de scan: {e}")
+            self._reset_pool()
+
+    async def close(self):
+        """Arrêt du pool de processus"""
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown, wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,255 @@
+# Entraînement, sauvegarde et chargement du modèle ML des signaux
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.trading.indicators import IndicatorEngine
+from src.trading.patterns import detect_pattern_history, patterns_at
+
+MODEL_NAME = 'signal_model'
+
+# Ordre des features produites par TradingAnalyzer._prepare_features
+FEATURE_NAMES = [
+    'rsi', 'macd', 'bb_position', 'stoch_k', 'adx',
+    'volume_ratio', 'price_change', 'pattern_balance'
+]
+
+# Classes prédites par le modèle
+SIGNAL_LABELS = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
+
+# Bougies ignorées en début de série, le temps que les indicateurs se stabilisent
+WARMUP_CANDLES = 50
+
+
+def label_forward_returns(closes: np.ndarray, horizon: int, threshold: float) -> np.ndarray:
+    """
+    Étiquette chaque bougie selon la variation du prix sur `horizon` bougies
+
+    Returns:
+        np.ndarray: 2 (BUY) au-dessus de +threshold, 0 (SELL) sous -threshold,
+            1 (HOLD) sinon; -1 pour les bougies sans horizon complet
+    """
+    labels = np.full(len(closes), -1, dtype=np.int64)
+    if len(closes) <= horizon:
+        return labels
+
+    returns = closes[horizon:] / closes[:-horizon] - 1
+    labels[:-horizon] = np.where(returns > threshold, 2, np.where(returns < -threshold, 0, 1))
+    return labels
+
+
+def build_training_set(analyzer, ohlcv: np.ndarray, horizon: int = 24,
+                       threshold: float = 0.01) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Construit les features et étiquettes d'une série de bougies clôturées
+
+    Les indicateurs sont calculés bougie par bougie comme en production et les
+    patterns de toutes les bougies en une passe (detect_pattern_history, mêmes
+    règles que _detect_patterns), puis transformés avec
+    `analyzer._prepare_features` pour garantir des features identiques à
+    l'entraînement et à l'inférence.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matrice (n x features) et étiquettes
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    closes = ohlcv[:, 4]
+    labels = label_forward_returns(closes, horizon, threshold)
+    engine = IndicatorEngine(analyzer.indicators_config)
+    pattern_masks = detect_pattern_history(ohlcv[:, 2], ohlcv[:, 3], closes, analyzer.indicators_config)
+
+    features, targets = [], []
+    for i, (timestamp, _, high, low, close, _) in enumerate(ohlcv):
+        indicators = engine.update(int(timestamp), high, low, close)
+        if i < WARMUP_CANDLES or labels[i] < 0:
+            continue
+
+        row = analyzer._prepare_features({'close': closes[i - 1:i + 1]}, indicators, patterns_at(pattern_masks, i))
+        if len(row) == len(FEATURE_NAMES):
+            features.append(row)
+            targets.append(labels[i])
+
+    return (np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)),
+            np.asarray(targets, dtype=np.int64))
+
+
+def train_model(features: np.ndarray, labels: np.ndarray, test_size: float = 0.2,
+                **params) -> Tuple[RandomForestClassifier, Dict]:
+    """
+    Entraîne le classifieur sur la partie ancienne des données
+
+    Les dernières observations servent d'échantillon de validation (pas de
+    mélange, pour ne pas entraîner sur le futur).
+
+    Returns:
+        Tuple[RandomForestClassifier, Dict]: Modèle et métriques de validation
+    """
+    split = int(len(features) * (1 - test_size))
+    model = RandomForestClassifier(
+        n_estimators=params.get('n_estimators', 100),
+        max_depth=params.get('max_depth', 10),
+        random_state=params.get('random_state', 42),
+        n_jobs=params.get('n_jobs', -1)
+    )
+    model.fit(features[:split], labels[:split])
+
+    metrics = {
+        'train_samples': int(split),
+        'test_samples': int(len(features) - split),
+        'accuracy': float(model.score(features[split:], labels[split:])) if split < len(features) else None,
+        'class_balance': {SIGNAL_LABELS[c]: int(n) for c, n in zip(*np.unique(labels, return_counts=True))}
+    }
+    return model, metrics
+
+
+class ForestModel:
+    """
+    Forêt de décision compilée en tableaux plats
+
+    Les noeuds de tous les arbres sont concaténés dans des tableaux NumPy,
+    ce qui permet de les charger mappés en mémoire (sans copie ni
+    désérialisation) et de parcourir tous les arbres pour toutes les lignes
+    en une seule boucle vectorisée de profondeur `max_depth`.
+    """
+
+    ARRAYS = ('left', 'right', 'feature', 'threshold', 'proba', 'roots', 'classes_')
+
+    def __init__(self, left: np.ndarray, right: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 proba: np.ndarray, roots: np.ndarray, classes_: np.ndarray, max_depth: int):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.proba = proba
+        self.roots = roots
+        self.classes_ = classes_
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, model: RandomForestClassifier) -> 'ForestModel':
+        """Compile une forêt scikit-learn entraînée"""
+        left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            values = tree.value[:, 0, :]
+            proba.append(values / values.sum(axis=1, keepdims=True))
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(left).astype(np.int32),
+            np.concatenate(right).astype(np.int32),
+            np.concatenate(feature).astype(np.int32),
+            np.concatenate(threshold).astype(np.float64),
+            np.concatenate(proba).astype(np.float64),
+            np.asarray(roots, dtype=np.int32),
+            np.asarray(model.classes_, dtype=np.int64),
+            max(estimator.tree_.max_depth for estimator in model.estimators_)
+        )
+
+    def predict_proba(self, features) -> np.ndarray:
+        """Probabilités par classe (ordre de `classes_`), moyenne des arbres"""
+        # Même précision que scikit-learn, qui compare les features en float32
+        X = np.asarray(features, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(left < 0, nodes, np.where(go_left, left, self.right[nodes]))
+
+        return self.proba[nodes].mean(axis=1)
+
+    def predict(self, features) -> np.ndarray:
+        """Classe la plus probable pour chaque ligne"""
+        return self.classes_[self.predict_proba(features).argmax(axis=1)]
+
+    def save(self, path: str):
+        """Écrit chaque tableau dans un fichier .npy du dossier `path`"""
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: str, max_depth: int, mmap_mode: Optional[str] = 'r') -> 'ForestModel':
+        """Charge les tableaux d'un dossier, mappés en mémoire par défaut"""
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in cls.ARRAYS}
+        return cls(max_depth=max_depth, **arrays)
+
+
+def _artifact_versions(model_dir: str) -> List[int]:
+    """Versions de modèle présentes dans le dossier"""
+    if not os.path.isdir(model_dir):
+        return []
+
+    pattern = re.compile(rf'^{MODEL_NAME}_v(\d+)$')
+    return sorted(int(match.group(1)) for match in map(pattern.match, os.listdir(model_dir))
+                  if match and os.path.exists(os.path.join(model_dir, match.group(0), 'metadata.json')))
+
+
+def save_model(model: RandomForestClassifier, metadata: Dict, model_dir: str) -> str:
+    """
+    Sauvegarde une nouvelle version du modèle et de ses métadonnées
+
+    Returns:
+        str: Dossier de l'artefact créé
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    versions = _artifact_versions(model_dir)
+    version = versions[-1] + 1 if versions else 1
+
+    path = os.path.join(model_dir, f'{MODEL_NAME}_v{version}')
+    forest = ForestModel.from_sklearn(model)
+    forest.save(path)
+
+    metadata = {
+        **metadata,
+        'version': version,
+        'features': FEATURE_NAMES,
+        'labels': SIGNAL_LABELS,
+        'max_depth': forest.max_depth,
+        'created_at': datetime.utcnow().isoformat()
+    }
+    # Les métadonnées sont écrites en dernier: elles marquent l'artefact comme complet
+    with open(os.path.join(path, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    logging.info(f"Modèle ML v{version} sauvegardé: {path}")
+    return path
+
+
+def load_latest_model(model_dir: str) -> Tuple[Optional[ForestModel], Optional[Dict]]:
+    """
+    Charge la version la plus récente du modèle, tableaux mappés en mémoire
+
+    Returns:
+        Tuple: (modèle, métadonnées), ou (None, None) si aucun modèle compatible
+    """
+    versions = _artifact_versions(model_dir)
+    if not versions:
+        return None, None
+
+    path = os.path.join(model_dir, f'{MODEL_NAME}_v{versions[-1]}')
+    with open(os.path.join(path, 'metadata.json')) as f:
+        metadata = json.load(f)
+
+    if metadata.get('features') != FEATURE_NAMES:
+        logging.warning(f"Modèle ML {path} ignoré: features incompatibles")
+        return None, None
+
+    return ForestModel.load(path, metadata['max_depth']), metadata
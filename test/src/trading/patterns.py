@@ -0,0 +1,124 @@
+# Détection vectorisée des patterns de trading
+#
+# Chaque pattern est calculé comme une série booléenne sur tout l'historique
+# des bougies (tableaux N x T). L'analyse temps réel ne lit que la dernière
+# colonne; les backtests peuvent réutiliser les mêmes tableaux sans recalcul
+# bougie par bougie.
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.trading.indicators import compute_indicator_history
+
+# Nombre de bougies examinées pour les doubles sommets/creux
+DOUBLE_PATTERN_WINDOW = 5
+
+# Écart relatif maximum entre les deux sommets (ou creux)
+DOUBLE_PATTERN_TOLERANCE = 0.02
+
+# Largeur relative des bandes de Bollinger en dessous de laquelle on parle de squeeze
+BB_SQUEEZE_WIDTH = 0.05
+
+PatternMasks = Dict[str, List[Tuple[str, np.ndarray]]]
+
+
+def detect_double_patterns(highs: np.ndarray, lows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Doubles sommets et doubles creux sur des fenêtres glissantes de 5 bougies
+
+    Le plus haut des 3 premières bougies est comparé au plus haut des 3
+    dernières (idem pour les creux). Un double creux n'est retenu que si la
+    fenêtre n'est pas déjà un double sommet.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Masques (N x T) double_top, double_bottom,
+            False sur les 4 premières bougies
+    """
+    window = DOUBLE_PATTERN_WINDOW
+    double_top = np.zeros(highs.shape, dtype=bool)
+    double_bottom = np.zeros(lows.shape, dtype=bool)
+
+    if highs.shape[-1] < window:
+        return double_top, double_bottom
+
+    high_windows = np.lib.stride_tricks.sliding_window_view(highs, window, axis=-1)
+    low_windows = np.lib.stride_tricks.sliding_window_view(lows, window, axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_peak = high_windows[..., :3].max(axis=-1)
+        first_valley = low_windows[..., :3].min(axis=-1)
+        top = np.abs(first_peak - high_windows[..., 2:].max(axis=-1)) / first_peak < DOUBLE_PATTERN_TOLERANCE
+        bottom = np.abs(first_valley - low_windows[..., 2:].min(axis=-1)) / first_valley < DOUBLE_PATTERN_TOLERANCE
+
+    double_top[..., window - 1:] = top
+    double_bottom[..., window - 1:] = ~top & bottom
+    return double_top, double_bottom
+
+
+def classify_patterns(indicators: Dict[str, np.ndarray], double_top: np.ndarray,
+                      double_bottom: np.ndarray) -> PatternMasks:
+    """
+    Applique les règles de patterns à des tableaux d'indicateurs de même forme
+
+    Returns:
+        PatternMasks: Par catégorie, liste ordonnée de (nom du pattern, masque)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ema_9, ema_21, ema_50 = indicators['ema_9'], indicators['ema_21'], indicators['ema_50']
+        macd, macd_signal, histogram = indicators['macd'], indicators['macd_signal'], indicators['macd_histogram']
+        rsi = indicators['rsi']
+        bb_width = (indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']
+
+        macd_bullish = (macd > macd_signal) & (histogram > 0)
+
+        return {
+            'bullish_patterns': [
+                ('golden_cross', (ema_9 > ema_21) & (ema_21 > ema_50)),
+                ('macd_bullish_crossover', macd_bullish)
+            ],
+            'bearish_patterns': [
+                ('death_cross', (ema_9 < ema_21) & (ema_21 < ema_50)),
+                ('macd_bearish_crossover', ~macd_bullish & (macd < macd_signal) & (histogram < 0))
+            ],
+            'continuation_patterns': [
+                ('bb_squeeze', bb_width < BB_SQUEEZE_WIDTH)
+            ],
+            'reversal_patterns': [
+                ('rsi_oversold', rsi < 30),
+                ('rsi_overbought', rsi > 70),
+                ('double_top', double_top),
+                ('double_bottom', double_bottom)
+            ]
+        }
+
+
+def detect_pattern_history(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                           config: Dict) -> PatternMasks:
+    """
+    Tous les patterns de l'analyseur sur tout l'historique, en une passe
+
+    Args:
+        highs, lows, closes (np.ndarray): Tableaux (N x T) ou séries (T)
+        config (Dict): Configuration des indicateurs de l'analyseur
+
+    Returns:
+        PatternMasks: Masques de même forme que `closes`
+    """
+    squeeze = np.ndim(closes) == 1
+    highs, lows, closes = (np.atleast_2d(np.asarray(a, dtype=np.float64)) for a in (highs, lows, closes))
+
+    history = compute_indicator_history(highs, lows, closes, config)
+    masks = classify_patterns(history, *detect_double_patterns(highs, lows))
+
+    if squeeze:
+        masks = {category: [(name, mask[0]) for name, mask in detected] for category, detected in masks.items()}
+    return masks
+
+
+def patterns_at(masks: PatternMasks, index=-1) -> Dict[str, List[str]]:
+    """Noms des patterns actifs à une position donnée des masques"""
+    return {
+        category: [name for name, mask in detected if mask[index]]
+        for category, detected in masks.items()
+    }
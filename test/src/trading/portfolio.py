@@ -117,7 +117,22 @@ class PortfolioManager:
         prices = {}
 
         try:
-            # Simulation des prix - dans un vrai système, utiliser une API crypto
+            if self.analyzer is not None:
+                # Prix issus du cache de bougies partagé avec l'analyseur
+                results = await asyncio.gather(
+                    *(self.analyzer.candle_store.get_latest_price(symbol) for symbol in symbols),
+                    return_exceptions=True
+                )
+
+                for symbol, price in zip(symbols, results):
+                    if isinstance(price, Exception):
+                        logging.error(f"Erreur lors de la récupération du prix de {symbol}: {price}")
+                    elif price:
+                        prices[symbol] = price
+
+                return prices
+
+            # Simulation des prix - sans analyseur, pas d'accès aux données de marché
             for symbol in symbols:
                 # Prix simulé avec variation aléatoire
                 base_prices = {
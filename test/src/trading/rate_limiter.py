@@ -0,0 +1,222 @@
+# Ordonnanceur des requêtes vers l'exchange (token buckets avec priorités)
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Priorités (la plus petite valeur est servie en premier)
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 10
+
+PRIORITY_NAMES = {PRIORITY_USER: 'user', PRIORITY_BACKGROUND: 'background'}
+
+# Poids des endpoints publics spot Binance (limite: 6000 par minute et par IP)
+BINANCE_WEIGHTS = {
+    'klines': 2,
+    'exchange_info': 20
+}
+
+# Priorité des requêtes émises dans le contexte courant (commande, boucle de fond...)
+_request_priority: ContextVar[int] = ContextVar('request_priority', default=PRIORITY_BACKGROUND)
+
+
+def binance_request_weight(endpoint: str, symbols: int = 1) -> int:
+    """
+    Poids Binance d'une requête publique spot
+
+    Args:
+        endpoint (str): 'klines', 'ticker' ou 'exchange_info'
+        symbols (int): Nombre de symboles demandés (ticker), 0 pour tous
+    """
+    if endpoint == 'ticker':
+        return 80 if symbols == 0 or symbols > 100 else 40 if symbols > 20 else 2
+    return BINANCE_WEIGHTS.get(endpoint, 1)
+
+
+def current_priority() -> int:
+    """Priorité des requêtes du contexte courant"""
+    return _request_priority.get()
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Applique une priorité aux requêtes émises dans le bloc (et aux tâches qu'il crée)"""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def set_request_priority(priority: int):
+    """Fixe la priorité pour le reste de la tâche courante"""
+    _request_priority.set(priority)
+
+
+class TokenBucket:
+    """Seau de jetons: `capacity` jetons au maximum, `capacity` rechargés par `period` secondes"""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float = None) -> float:
+        """Secondes à attendre avant de disposer de `amount` jetons"""
+        self._refill(now if now is not None else time.monotonic())
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0) / self.rate
+
+    def consume(self, amount: float):
+        self._refill(time.monotonic())
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self, used: float = None):
+        """Retire des jetons: tous, ou jusqu'à ne laisser que `capacity - used`"""
+        self._refill(time.monotonic())
+        self.tokens = 0 if used is None else min(self.tokens, self.capacity - used)
+
+
+class RequestScheduler:
+    """
+    File d'attente des requêtes exchange, par priorité puis ordre d'arrivée
+
+    Une requête part dès que tous les seaux disposent de son poids: les
+    rafales restent possibles dans les limites de l'exchange, seules les
+    requêtes en excès attendent. Une requête prioritaire passe devant les
+    requêtes de fond en attente.
+    """
+
+    def __init__(self, buckets: Dict[str, TokenBucket]):
+        """
+        Args:
+            buckets: Seaux à respecter, par nom ('weight', 'requests'...).
+                Le poids d'une requête est prélevé sur 'weight', 1 jeton sur les autres.
+        """
+        self.buckets = buckets
+        self._queue: List = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.stats = {
+            name: {'requests': 0, 'queued': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.stats['throttled'] = 0
+
+    @classmethod
+    def for_binance(cls, weight_per_minute: int = 4800, requests_per_second: int = 20) -> 'RequestScheduler':
+        """Limites spot Binance: poids par minute et rafale de requêtes par seconde"""
+        return cls({
+            'weight': TokenBucket(weight_per_minute, 60),
+            'requests': TokenBucket(requests_per_second, 1)
+        })
+
+    @property
+    def queue_size(self) -> int:
+        return sum(1 for *_, future in self._queue if not future.done())
+
+    async def acquire(self, weight: int = 1, priority: int = None) -> float:
+        """
+        Attend que la requête puisse partir sans dépasser les limites
+
+        Returns:
+            float: Temps passé en file d'attente, en secondes
+        """
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+
+        if not self._queue and self._delay(weight) <= 0:
+            self._consume(weight)
+            self._record(priority, 0.0, queued=False)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), weight, future))
+        self._notify()
+
+        await future
+        waited = time.monotonic() - started
+        self._record(priority, waited, queued=True)
+        return waited
+
+    def throttle(self, used_weight: int = None):
+        """
+        Signale la réponse de l'exchange
+
+        Sans argument (erreur 429/418), les seaux sont vidés pour laisser
+        l'exchange respirer; avec le poids déjà consommé (en-tête
+        X-MBX-USED-WEIGHT-1M), le seau de poids est recalé dessus.
+        """
+        if used_weight is None:
+            self.stats['throttled'] += 1
+            for bucket in self.buckets.values():
+                bucket.drain()
+        elif 'weight' in self.buckets:
+            self.buckets['weight'].drain(used_weight)
+
+    def get_stats(self) -> Dict:
+        """Compteurs et temps d'attente par priorité, jetons disponibles"""
+        stats = {'queue_size': self.queue_size, 'throttled': self.stats['throttled']}
+        for name in PRIORITY_NAMES.values():
+            entry = self.stats[name]
+            stats[name] = {
+                **entry,
+                'avg_wait': entry['total_wait'] / entry['requests'] if entry['requests'] else 0.0
+            }
+        stats['tokens'] = {name: round(bucket.tokens, 1) for name, bucket in self.buckets.items()}
+        return stats
+
+    def _delay(self, weight: int) -> float:
+        now = time.monotonic()
+        return max(bucket.delay(weight if name == 'weight' else 1, now) for name, bucket in self.buckets.items())
+
+    def _consume(self, weight: int):
+        for name, bucket in self.buckets.items():
+            bucket.consume(weight if name == 'weight' else 1)
+
+    def _record(self, priority: int, waited: float, queued: bool):
+        entry = self.stats[PRIORITY_NAMES.get(priority, 'background')]
+        entry['requests'] += 1
+        entry['queued'] += int(queued)
+        entry['total_wait'] += waited
+        entry['max_wait'] = max(entry['max_wait'], waited)
+
+    def _notify(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        """Libère les requêtes en tête de file à mesure que les jetons reviennent"""
+        while self._queue:
+            priority, _, weight, future = self._queue[0]
+            if future.done():
+                # Appelant annulé pendant l'attente
+                heapq.heappop(self._queue)
+                continue
+
+            delay = self._delay(weight)
+            if delay <= 0:
+                heapq.heappop(self._queue)
+                self._consume(weight)
+                future.set_result(None)
+                continue
+
+            # Réveil anticipé si une requête plus prioritaire arrive
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
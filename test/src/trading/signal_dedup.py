@@ -0,0 +1,89 @@
+# Déduplication des signaux à l'échelle de la bougie
+
+import time
+from typing import Dict, NamedTuple, Tuple
+
+from src.trading.analysis_cache import next_bar_close_ms
+from src.utils.metrics import SIGNALS_SUPPRESSED
+
+# Clé d'état: (symbole, timeframe)
+StateKey = Tuple[str, str]
+
+# Au-delà, les états des bougies déjà clôturées sont purgés
+MAX_TRACKED_PAIRS = 1024
+
+
+class BarSignal(NamedTuple):
+    """Dernier signal émis pour un (symbole, timeframe)"""
+    bar_close: int
+    action: str
+    confidence: float
+
+
+class SignalDeduplicator:
+    """
+    Filtre les signaux répétés sur une même bougie
+
+    Le scan du marché tourne toutes les 5 minutes sur des bougies horaires:
+    sans filtre, le même signal est régénéré, enregistré et diffusé jusqu'à
+    12 fois par bougie. Un signal (symbole, timeframe, clôture de bougie,
+    action) n'est émis qu'une fois, sauf si sa confiance a varié d'au moins
+    `min_confidence_change` points depuis la dernière émission.
+
+    Un changement d'action (BUY -> SELL) est une transition d'état et donne
+    lieu à une émission. Un HOLD n'efface pas le dernier signal émis: un
+    BUY -> HOLD -> BUY sur la même bougie n'est diffusé qu'une fois.
+
+    `should_emit` ne fait que consulter l'état; il n'est mis à jour par
+    `record` qu'une fois le signal généré et enregistré, pour qu'un échec ne
+    supprime pas le vrai signal jusqu'à la fin de la bougie.
+    """
+
+    def __init__(self, min_confidence_change: float = 10.0):
+        """
+        Args:
+            min_confidence_change (float): Variation de confiance (en points)
+                justifiant une nouvelle émission sur la même bougie
+        """
+        self.min_confidence_change = min_confidence_change
+        self._emitted: Dict[StateKey, BarSignal] = {}
+
+    def __len__(self) -> int:
+        return len(self._emitted)
+
+    @staticmethod
+    def _current(signal: Dict, action_key: str, now_ms: int = None) -> Tuple[StateKey, BarSignal]:
+        key = (signal['symbol'], signal.get('timeframe', '1h'))
+        return key, BarSignal(
+            next_bar_close_ms(key[1], now_ms),
+            signal.get(action_key, 'HOLD'),
+            float(signal.get('confidence', 0))
+        )
+
+    def should_emit(self, analysis: Dict, now_ms: int = None) -> bool:
+        """Indique si le signal d'une analyse doit être généré et diffusé"""
+        key, current = self._current(analysis, 'signal', now_ms)
+        if current.action == 'HOLD':
+            return False
+
+        emitted = self._emitted.get(key)
+        if (emitted is not None and emitted.bar_close == current.bar_close and emitted.action == current.action
+                and abs(current.confidence - emitted.confidence) < self.min_confidence_change):
+            SIGNALS_SUPPRESSED.labels(reason='repeat').inc()
+            return False
+
+        return True
+
+    def record(self, signal: Dict, now_ms: int = None):
+        """Enregistre un signal effectivement généré et sauvegardé"""
+        key, current = self._current(signal, 'action', now_ms)
+        if current.action != 'HOLD':
+            self._emitted[key] = current
+
+        # Les signaux de bougies déjà clôturées n'ont plus d'effet
+        if len(self._emitted) > MAX_TRACKED_PAIRS:
+            now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+            self._emitted = {k: v for k, v in self._emitted.items() if v.bar_close > now_ms}
+
+    def clear(self):
+        self._emitted.clear()
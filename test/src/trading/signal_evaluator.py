@@ -0,0 +1,212 @@
+# Évaluation des signaux émis (take profit / stop loss) sur les bougies stockées
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.trading.candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+# Statut d'un signal après évaluation
+OPEN, PROFITABLE, LOSS, EXPIRED = 0, 1, 2, 3
+OUTCOMES = {PROFITABLE: 'profitable', LOSS: 'loss', EXPIRED: 'expired'}
+
+
+def evaluate_outcomes(candles: np.ndarray, created_ms: np.ndarray, directions: np.ndarray, entries: np.ndarray,
+                      take_profits: np.ndarray, stop_losses: np.ndarray, horizon: int, timeframe_ms: int,
+                      closed_count: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Résultat de tous les signaux d'une série en une passe vectorisée
+
+    Chaque signal est suivi sur les bougies ouvertes dans les `horizon`
+    périodes qui suivent sa création (matrice signaux x horizon), bornées
+    par timestamp: un trou dans la série n'allonge pas la fenêtre. Le
+    premier franchissement du take profit ou du stop loss le clôture, le
+    stop étant retenu si les deux sont touchés dans la même bougie. Sans
+    franchissement, le signal expire au cours de clôture de la dernière
+    bougie observée dans l'horizon, une fois l'horizon entièrement clôturé.
+
+    Args:
+        candles (np.ndarray): Bougies (T x 6) triées par timestamp
+        created_ms (np.ndarray): Date de création des signaux (ms)
+        directions (np.ndarray): 1 pour BUY, -1 pour SELL
+        entries, take_profits, stop_losses (np.ndarray): Niveaux des signaux
+        horizon (int): Durée de vie d'un signal, en bougies
+        timeframe_ms (int): Durée d'une bougie (ms)
+        closed_count (int): Nombre de bougies clôturées (toutes par défaut)
+
+    Returns:
+        tuple: Statuts (OPEN, PROFITABLE, LOSS, EXPIRED) et profit/perte en %
+    """
+    count = len(candles)
+    closed_count = count if closed_count is None else closed_count
+    status = np.full(len(created_ms), OPEN, dtype=np.int8)
+    profit_loss = np.full(len(created_ms), np.nan)
+    if count == 0 or len(created_ms) == 0:
+        return status, profit_loss
+
+    timestamps = candles[:, 0]
+    horizon_ms = horizon * timeframe_ms
+    starts = np.searchsorted(timestamps, created_ms, side='right')
+    ends = np.searchsorted(timestamps, created_ms + horizon_ms, side='right')
+    window = starts[:, None] + np.arange(horizon)
+    observed = window < ends[:, None]
+    window = np.minimum(window, count - 1)
+
+    highs, lows = candles[window, 2], candles[window, 3]
+    longs = (directions > 0)[:, None]
+    tp_hit = observed & np.where(longs, highs >= take_profits[:, None], lows <= take_profits[:, None])
+    sl_hit = observed & np.where(longs, lows <= stop_losses[:, None], highs >= stop_losses[:, None])
+
+    first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), horizon)
+    first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), horizon)
+
+    status[first_tp < first_sl] = PROFITABLE
+    status[(first_sl < horizon) & (first_sl <= first_tp)] = LOSS
+    # Horizon clôturé: la bougie ouverte dans sa dernière période est close
+    last_closed = timestamps[closed_count - 1] if closed_count > 0 else -np.inf
+    status[(status == OPEN) & (ends > starts) & (last_closed > created_ms + horizon_ms - timeframe_ms)] = EXPIRED
+
+    exits = np.select(
+        [status == PROFITABLE, status == LOSS, status == EXPIRED],
+        [take_profits, stop_losses, candles[np.maximum(ends - 1, 0), 4]],
+        np.nan
+    )
+    profit_loss = directions * (exits / entries - 1) * 100
+    return status, profit_loss
+
+
+class SignalEvaluator:
+    """
+    Clôture périodique des signaux ouverts
+
+    Les signaux non évalués sont chargés en une requête, regroupés par
+    (symbole, timeframe) et confrontés aux bougies déjà présentes dans le
+    CandleStore (complétées par le cache disque pour les plus anciens), sans
+    requête à l'exchange. Les signaux dont la série n'est disponible ni en
+    mémoire ni sur disque sont comptés à part ('unavailable'): ils ne sont
+    pas évalués et ne doivent pas biaiser les statistiques. Les résultats
+    sont écrits en une seule transaction et reportés dans le suivi de
+    performance du générateur de signaux.
+    """
+
+    def __init__(self, db_manager, analyzer, signal_generator=None, horizon: int = 48, max_age_days: int = 30):
+        """
+        Args:
+            db_manager: DatabaseManager contenant les signaux
+            analyzer: TradingAnalyzer fournissant les bougies
+            signal_generator: SignalGenerator dont le suivi de performance est mis à jour
+            horizon (int): Durée de vie d'un signal, en bougies de son timeframe
+            max_age_days (int): Âge au-delà duquel un signal n'est plus évalué
+        """
+        self.db_manager = db_manager
+        self.analyzer = analyzer
+        self.signal_generator = signal_generator
+        self.horizon = horizon
+        self.max_age_days = max_age_days
+
+    async def evaluate(self) -> Dict:
+        """
+        Évalue tous les signaux ouverts
+
+        Returns:
+            dict: Nombre de signaux 'open', 'profitable', 'loss', 'expired',
+                'unavailable' (série sans bougies stockées) et 'evaluated'
+                (écrits en base) pour ce passage
+        """
+        signals = self.db_manager.get_open_signals(self.max_age_days)
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for signal in signals:
+            groups.setdefault((signal['symbol'], signal['timeframe']), []).append(signal)
+
+        outcomes = []
+        unavailable = {}
+        for (symbol, timeframe), group in groups.items():
+            try:
+                group_outcomes = await self._evaluate_group(symbol, timeframe, group)
+                if group_outcomes is None:
+                    unavailable[f'{symbol} {timeframe}'] = len(group)
+                else:
+                    outcomes.extend(group_outcomes)
+            except Exception as e:
+                logging.error(f"Erreur lors de l'évaluation des signaux {symbol} {timeframe}: {e}")
+
+        summary = {name: 0 for name in OUTCOMES.values()}
+        for _, outcome, _ in outcomes:
+            summary[outcome] += 1
+        summary['unavailable'] = sum(unavailable.values())
+        summary['open'] = len(signals) - len(outcomes) - summary['unavailable']
+        summary['evaluated'] = self.db_manager.update_signal_outcomes(outcomes)
+
+        if self.signal_generator is not None:
+            for signal_id, outcome, profit_loss in outcomes:
+                if signal_id in self.signal_generator.signal_history:
+                    await self.signal_generator.update_signal_performance(signal_id, outcome, profit_loss)
+
+        if outcomes:
+            logging.info(f"Évaluation des signaux: {summary['profitable']} gagnants, {summary['loss']} perdants, "
+                         f"{summary['expired']} expirés, {summary['open']} ouverts")
+        if unavailable:
+            logging.warning(f"Évaluation des signaux: {summary['unavailable']} signaux sans bougies stockées "
+                            f"({', '.join(sorted(unavailable))})")
+        return summary
+
+    async def _evaluate_group(self, symbol: str, timeframe: str,
+                              signals: List[Dict]) -> Optional[List[Tuple[str, str, float]]]:
+        """
+        Résultats des signaux clôturés d'une série (signal_id, résultat, profit/perte)
+
+        Returns:
+            list: Signaux clôturés, None si la série n'a aucune bougie stockée
+        """
+        created_ms = np.array([self._to_ms(signal['created_at']) for signal in signals], dtype=np.int64)
+        candles = self._load_candles(symbol, timeframe, int(created_ms.min()))
+        if not len(candles):
+            return None
+
+        # La dernière bougie du CandleStore est en cours de formation
+        timeframe_ms = timeframe_to_ms(timeframe)
+        now_ms = int(time.time() * 1000)
+        closed_count = int(np.searchsorted(candles[:, 0], now_ms - timeframe_ms, side='right'))
+
+        status, profit_loss = evaluate_outcomes(
+            candles, created_ms,
+            np.array([1.0 if signal['action'] == 'BUY' else -1.0 for signal in signals]),
+            np.array([signal['price'] for signal in signals], dtype=np.float64),
+            np.array([signal['take_profit'] for signal in signals], dtype=np.float64),
+            np.array([signal['stop_loss'] for signal in signals], dtype=np.float64),
+            self.horizon, timeframe_ms, closed_count
+        )
+
+        return [
+            (signal['id'], OUTCOMES[int(code)], round(float(pnl), 4))
+            for signal, code, pnl in zip(signals, status, profit_loss) if code != OPEN
+        ]
+
+    def _load_candles(self, symbol: str, timeframe: str, since_ms: int) -> np.ndarray:
+        """
+        Bougies depuis `since_ms`, sans appel réseau
+
+        Les bougies déjà chargées par le CandleStore (analyses, flux) sont
+        complétées par le cache disque pour la période antérieure. Une série
+        absente des deux laisse ses signaux ouverts jusqu'au passage suivant,
+        sans consommer le budget de requêtes de l'exchange.
+        """
+        candles = self.analyzer.candle_store.peek(symbol, timeframe)
+        candles = candles[candles[:, 0] >= since_ms] if candles is not None else np.empty((0, OHLCV_COLUMNS))
+
+        cache = self.analyzer.ohlcv_cache
+        if cache is not None and (not len(candles) or candles[0, 0] > since_ms):
+            older = cache.read(symbol, timeframe, since=since_ms,
+                               until=int(candles[0, 0]) if len(candles) else None)
+            candles = np.concatenate([older, candles]) if len(candles) else older
+        return candles
+
+    @staticmethod
+    def _to_ms(created_at) -> int:
+        """Timestamp (ms) d'une date SQLite enregistrée en UTC"""
+        if not isinstance(created_at, datetime):
+            created_at = datetime.fromisoformat(str(created_at))
+        return int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
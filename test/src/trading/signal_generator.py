@@ -2,16 +2,22 @@
 
 import logging
 from datetime import datetime, timedelta
-import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 import json
+from src.trading.signal_history import SignalHistory
+from src.trading.signal_ids import SignalIdGenerator
+from src.trading.signal_record import SignalRecord
 
 class SignalGenerator:
-    def __init__(self):
+    def __init__(self, history_size: int = 1000):
         """Initialisation du générateur de signaux"""
-        self.signal_history = []
+        # Derniers signaux, indexés par identifiant et par symbole
+        self.signal_history = SignalHistory(capacity=history_size)
         self.performance_tracker = {}
+        self.market_context: Dict = {}
+        # Identifiants croissants, sans collision lors des rafales de signaux
+        self._generate_signal_id = SignalIdGenerator()
 
         # Configuration des seuils de confiance
         self.confidence_thresholds = {
@@ -38,6 +44,27 @@ class SignalGenerator:
         Returns:
             Dict: Signal de trading complet
         """
+        return self._build_signal(symbol, analysis, await self._get_market_context(symbol))
+
+    async def generate_signals(self, analyses: List[Dict]) -> List[Dict]:
+        """
+        Génère les signaux de toutes les analyses d'un cycle
+
+        Le contexte de marché est lu une seule fois et partagé par tous les
+        signaux; l'enregistrement en base se fait ensuite en un lot
+        (DatabaseManager.save_signals).
+
+        Args:
+            analyses (List[Dict]): Résultats de l'analyse technique
+
+        Returns:
+            List[Dict]: Signaux, dans l'ordre des analyses
+        """
+        market_context = await self._get_market_context(None)
+        return [self._build_signal(analysis['symbol'], analysis, market_context) for analysis in analyses]
+
+    def _build_signal(self, symbol: str, analysis: Dict, market_context: Dict) -> Dict:
+        """Assemblage d'un signal à partir de son analyse et du contexte de marché"""
         try:
             signal = {
                 'id': self._generate_signal_id(),
@@ -57,7 +84,7 @@ class SignalGenerator:
             signal.update(self._calculate_risk_levels(signal))
 
             # Ajout du contexte de marché
-            signal['market_context'] = await self._get_market_context(symbol)
+            signal['market_context'] = market_context
 
             # Ajout des recommandations
             signal['recommendations'] = self._generate_recommendations(signal)
@@ -68,19 +95,18 @@ class SignalGenerator:
             # Calcul du sizing de position recommandé
             signal['position_sizing'] = self._calculate_position_sizing(signal)
 
+            # Forme compacte conservée dans l'historique (lisible comme un dict)
+            record = SignalRecord.from_dict(signal)
+
             # Sauvegarde du signal
-            self._save_signal(signal)
+            self._save_signal(record)
 
-            return signal
+            return record
 
         except Exception as e:
             logging.error(f"Erreur lors de la génération du signal pour {symbol}: {e}")
             return self._get_error_signal(symbol, str(e))
 
-    def _generate_signal_id(self) -> str:
-        """Génère un ID unique pour le signal"""
-        return f"SIG_{int(datetime.utcnow().timestamp())}_{np.random.randint(1000, 9999)}"
-
     def _calculate_risk_levels(self, signal: Dict) -> Dict:
         """Calcul des niveaux de risk management"""
         try:
@@ -134,39 +160,14 @@ class SignalGenerator:
             logging.error(f"Erreur lors du calcul des niveaux de risque: {e}")
             return {}
 
-    async def _get_market_context(self, symbol: str) -> Dict:
-        """Récupère le contexte général du marché"""
-        try:
-            # Simulation du contexte de marché
-            # Dans un vrai système, cela devrait récupérer:
-            # - Sentiment général du marché crypto
-            # - Volume global
-            # - Dominance Bitcoin
-            # - Nouvelles importantes
-
-            market_contexts = [
-                {'trend': 'bullish', 'strength': 'strong', 'volatility': 'high'},
-                {'trend': 'bearish', 'strength': 'moderate', 'volatility': 'medium'},
-                {'trend': 'sideways', 'strength': 'weak', 'volatility': 'low'},
-                {'trend': 'bullish', 'strength': 'moderate', 'volatility': 'medium'},
-                {'trend': 'bearish', 'strength': 'strong', 'volatility': 'high'}
-            ]
-
-            # Sélection aléatoire pour la simulation
-            context = np.random.choice(market_contexts)
-
-            return {
-                'overall_trend': context['trend'],
-                'trend_strength': context['strength'],
-                'market_volatility': context['volatility'],
-                'btc_dominance': np.random.uniform(40, 60),
-                'total_market_cap_change': np.random.uniform(-5, 5),
-                'fear_greed_index': np.random.randint(20, 80)
-            }
+    def set_market_context(self, context: Dict):
+        """Contexte de marché du cycle en cours (MarketContextEngine), partagé par ses signaux"""
+        self.market_context = context
 
-        except Exception as e:
-            logging.error(f"Erreur lors de la récupération du contexte de marché: {e}")
-            return {}
+    async def _get_market_context(self, symbol: Optional[str]) -> Dict:
+        """Récupère le contexte général du marché"""
+        # Calculé une fois par cycle sur tout l'univers analysé: aucun coût par signal
+        return self.market_context
 
     def _generate_recommendations(self, signal: Dict) -> List[str]:
         """Génère des recommandations contextuelles"""
@@ -296,10 +297,7 @@ class SignalGenerator:
     def _save_signal(self, signal: Dict):
         """Sauvegarde le signal dans l'historique"""
         try:
-            # Limitation de la taille de l'historique
-            if len(self.signal_history) >= 1000:
-                self.signal_history = self.signal_history[-800:]  # Garde les 800 plus récents
-
+            # Historique borné: le plus ancien signal est évincé quand il est plein
             self.signal_history.append(signal)
 
             # Mise à jour des statistiques de performance
@@ -357,15 +355,8 @@ class SignalGenerator:
     def get_signal_history(self, limit: int = 50, symbol: str = None) -> List[Dict]:
         """Récupère l'historique des signaux"""
         try:
-            history = self.signal_history
-
-            if symbol:
-                history = [s for s in history if s['symbol'] == symbol]
-
-            # Tri par timestamp décroissant et limitation
-            history = sorted(history, key=lambda x: x['timestamp'], reverse=True)
-
-            return history[:limit]
+            # L'historique est déjà ordonné par timestamp: lecture des plus récents uniquement
+            return self.signal_history.recent(limit, symbol)
 
         except Exception as e:
             logging.error(f"Erreur lors de la récupération de l'historique: {e}")
@@ -375,11 +366,7 @@ class SignalGenerator:
         """Met à jour la performance d'un signal après exécution"""
         try:
             # Trouve le signal dans l'historique
-            signal = None
-            for s in self.signal_history:
-                if s['id'] == signal_id:
-                    signal = s
-                    break
+            signal = self.signal_history.get(signal_id)
 
             if not signal:
                 logging.warning(f"Signal {signal_id} non trouvé dans l'historique")
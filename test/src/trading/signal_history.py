@@ -0,0 +1,76 @@
+# Historique borné des signaux, indexé par identifiant et par symbole
+
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional
+
+
+class SignalHistory:
+    """
+    Historique des derniers signaux, du plus ancien au plus récent
+
+    Les signaux sont conservés dans leur ordre de génération (donc de
+    timestamp) dans une file bornée: l'ajout et l'éviction du plus ancien
+    sont en O(1), sans recopie de l'historique. Un index par identifiant et
+    une file par symbole permettent de retrouver un signal ou les N derniers
+    signaux d'un symbole sans parcourir tout l'historique.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity (int): Nombre maximum de signaux conservés
+        """
+        self.capacity = capacity
+        self._signals: Deque[Dict] = deque()
+        self._by_id: Dict[str, Dict] = {}
+        self._by_symbol: Dict[str, Deque[Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._signals)
+
+    def __contains__(self, signal_id: str) -> bool:
+        return signal_id in self._by_id
+
+    def append(self, signal: Dict):
+        """Ajoute le signal le plus récent, en évinçant le plus ancien si l'historique est plein"""
+        if len(self._signals) >= self.capacity:
+            self._evict_oldest()
+
+        self._signals.append(signal)
+        self._by_id[signal['id']] = signal
+        self._by_symbol.setdefault(signal['symbol'], deque()).append(signal)
+
+    def _evict_oldest(self):
+        signal = self._signals.popleft()
+
+        # Le plus ancien de l'historique est aussi le plus ancien de son symbole
+        symbol_signals = self._by_symbol[signal['symbol']]
+        symbol_signals.popleft()
+        if not symbol_signals:
+            del self._by_symbol[signal['symbol']]
+
+        # Un identifiant réutilisé pointe vers le signal plus récent, à conserver
+        if self._by_id.get(signal['id']) is signal:
+            del self._by_id[signal['id']]
+
+    def get(self, signal_id: str) -> Optional[Dict]:
+        """Signal par identifiant (le plus récent si l'identifiant a été réutilisé)"""
+        return self._by_id.get(signal_id)
+
+    def recent(self, limit: int = 50, symbol: str = None) -> List[Dict]:
+        """Les `limit` derniers signaux (d'un symbole si précisé), du plus récent au plus ancien"""
+        signals = self._signals if symbol is None else self._by_symbol.get(symbol, ())
+        return list(islice(reversed(signals), max(limit, 0)))
+
+    def symbols(self) -> List[str]:
+        """Symboles ayant au moins un signal dans l'historique"""
+        return list(self._by_symbol)
+
+    def clear(self):
+        self._signals.clear()
+        self._by_id.clear()
+        self._by_symbol.clear()
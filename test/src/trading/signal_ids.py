@@ -0,0 +1,35 @@
+# Identifiants de signaux uniques et croissants
+
+import threading
+import time
+
+
+class SignalIdGenerator:
+    """
+    Identifiants de signaux strictement croissants
+
+    Un identifiant est dérivé de l'horloge en microsecondes; deux demandes
+    dans la même microseconde (ou après un recul de l'horloge) reçoivent la
+    valeur suivante du dernier identifiant émis. Contrairement à un suffixe
+    aléatoire, deux signaux d'une même rafale ne peuvent pas entrer en
+    collision, et l'ordre des identifiants suit celui de leur génération.
+    """
+
+    def __init__(self, prefix: str = 'SIG'):
+        """
+        Args:
+            prefix (str): Préfixe des identifiants
+        """
+        self.prefix = prefix
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next_value(self) -> int:
+        """Valeur numérique du prochain identifiant"""
+        with self._lock:
+            self._last = max(time.time_ns() // 1000, self._last + 1)
+            return self._last
+
+    def __call__(self) -> str:
+        # 16 chiffres jusqu'en 2286: l'ordre lexicographique suit l'ordre numérique
+        return f"{self.prefix}_{self.next_value()}"
@@ -0,0 +1,283 @@
+# Représentation compacte des signaux (mémoire et stockage)
+
+import math
+import struct
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from src.trading.volume import classify_volume
+
+# Indicateurs du moteur (IndicatorEngine / compute_batch_indicators), dans l'ordre de stockage
+INDICATOR_FIELDS = (
+    'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower', 'bb_position',
+    'ema_9', 'ema_21', 'ema_50', 'stoch_k', 'stoch_d',
+    'adx', 'di_plus', 'di_minus',
+    'support', 'resistance', 'distance_to_support', 'distance_to_resistance'
+)
+
+# Patterns de classify_patterns: un bit chacun, dans l'ordre des catégories
+PATTERN_FIELDS = (
+    ('bullish_patterns', 'golden_cross'),
+    ('bullish_patterns', 'macd_bullish_crossover'),
+    ('bearish_patterns', 'death_cross'),
+    ('bearish_patterns', 'macd_bearish_crossover'),
+    ('continuation_patterns', 'bb_squeeze'),
+    ('reversal_patterns', 'rsi_oversold'),
+    ('reversal_patterns', 'rsi_overbought'),
+    ('reversal_patterns', 'double_top'),
+    ('reversal_patterns', 'double_bottom')
+)
+PATTERN_CATEGORIES = tuple(dict.fromkeys(category for category, _ in PATTERN_FIELDS))
+PATTERN_BITS = {field: 1 << bit for bit, field in enumerate(PATTERN_FIELDS)}
+
+# Après les indicateurs: volume (ratio, VPT) puis prédiction ML (confiance, probabilités)
+VOLUME_RATIO, VPT, ML_CONFIDENCE, ML_SELL, ML_HOLD, ML_BUY = range(len(INDICATOR_FIELDS), len(INDICATOR_FIELDS) + 6)
+VALUE_COUNT = len(INDICATOR_FIELDS) + 6
+
+ACTIONS = ('HOLD', 'BUY', 'SELL')
+PRIORITIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+RISK_PROFILES = (None, 'conservative', 'moderate', 'aggressive')
+
+# Encodage binaire: version, action, priorité, profil de risque, action ML, patterns,
+# confiance, prix, take profit, stop loss, risk/reward, risque max, sizing (2),
+# longueur des recommandations; suivis des valeurs float64 puis des recommandations UTF-8
+PAYLOAD_VERSION = 2
+PAYLOAD_HEADER = struct.Struct('<BBBBBHddddddddH')
+# Type des valeurs par version (la version 1, en float32, reste lisible)
+PAYLOAD_VALUE_TYPES = {1: np.float32, 2: np.float64}
+
+# Clés de la vue dict, dans l'ordre du signal généré par SignalGenerator
+VIEW_KEYS = (
+    'id', 'timestamp', 'symbol', 'action', 'confidence', 'price', 'timeframe',
+    'indicators', 'patterns', 'volume_analysis', 'volume_change', 'ml_prediction',
+    'take_profit', 'stop_loss', 'risk_reward', 'max_risk_pct', 'risk_profile',
+    'market_context', 'recommendations', 'priority', 'position_sizing'
+)
+# Champs renseignés après coup par le suivi de performance
+OUTCOME_KEYS = ('actual_outcome', 'profit_loss', 'performance_updated')
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class SignalRecord(Mapping):
+    """
+    Signal de trading compact
+
+    Les champs scalaires occupent des slots; les 20 indicateurs, le volume et
+    la prédiction ML sont regroupés dans un seul vecteur float64 et les
+    patterns dans un masque de bits. Le contexte de marché est une référence
+    au dict partagé par tous les signaux du cycle.
+
+    L'enregistrement se lit comme le dict produit auparavant par
+    SignalGenerator (`signal['indicators']['rsi']`, `signal.get(...)`): les
+    sous-dicts sont reconstruits à la demande, pour les embeds et les
+    commandes. `encode` / `decode` en donnent une forme binaire pour la base.
+    """
+
+    __slots__ = (
+        'id', 'timestamp', 'symbol', 'timeframe', 'action', 'confidence', 'price',
+        'take_profit', 'stop_loss', 'risk_reward', 'max_risk_pct', 'risk_profile',
+        'priority', 'recommended_risk_pct', 'max_portfolio_pct', 'patterns_mask', 'values',
+        'ml_action', 'recommendations', 'market_context',
+        'actual_outcome', 'profit_loss', 'performance_updated'
+    )
+
+    def __init__(self, signal_id: str, timestamp: datetime, symbol: str, timeframe: str, action: str,
+                 confidence: float, price: float, values: np.ndarray, patterns_mask: int = 0,
+                 ml_action: str = 'HOLD', take_profit: float = None, stop_loss: float = None,
+                 risk_reward: float = None, max_risk_pct: float = None, risk_profile: str = None,
+                 priority: str = 'LOW', recommended_risk_pct: float = None, max_portfolio_pct: float = None,
+                 recommendations: tuple = (), market_context: Dict = None):
+        self.id = signal_id
+        self.timestamp = timestamp
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.action = action
+        self.confidence = confidence
+        self.price = price
+        self.values = values
+        self.patterns_mask = patterns_mask
+        self.ml_action = ml_action
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.risk_reward = risk_reward
+        self.max_risk_pct = max_risk_pct
+        self.risk_profile = risk_profile
+        self.priority = priority
+        self.recommended_risk_pct = recommended_risk_pct
+        self.max_portfolio_pct = max_portfolio_pct
+        self.recommendations = recommendations
+        self.market_context = market_context if market_context is not None else {}
+        self.actual_outcome = None
+        self.profit_loss = None
+        self.performance_updated = None
+
+    @classmethod
+    def from_dict(cls, signal: Dict) -> 'SignalRecord':
+        """Conversion d'un signal complet (dict de SignalGenerator)"""
+        values = np.full(VALUE_COUNT, np.nan, dtype=np.float64)
+
+        indicators = signal.get('indicators') or {}
+        for i, name in enumerate(INDICATOR_FIELDS):
+            value = indicators.get(name)
+            if value is not None:
+                values[i] = value
+
+        # Volume inconnu (échec de l'analyse): stocké en NaN, relu comme 'unknown'
+        volume = signal.get('volume_analysis') or {}
+        if volume.get('volume_trend', 'unknown') != 'unknown':
+            values[VOLUME_RATIO] = volume.get('volume_ratio', np.nan)
+            values[VPT] = volume.get('vpt', np.nan)
+
+        ml = signal.get('ml_prediction') or {}
+        probabilities = ml.get('probabilities') or {}
+        values[ML_CONFIDENCE] = ml.get('confidence', np.nan)
+        values[ML_SELL] = probabilities.get('sell', np.nan)
+        values[ML_HOLD] = probabilities.get('hold', np.nan)
+        values[ML_BUY] = probabilities.get('buy', np.nan)
+
+        patterns_mask = 0
+        for category, names in (signal.get('patterns') or {}).items():
+            for name in names:
+                patterns_mask |= PATTERN_BITS.get((category, name), 0)
+
+        sizing = signal.get('position_sizing') or {}
+        return cls(
+            signal['id'], signal['timestamp'], signal['symbol'], signal.get('timeframe', '1h'),
+            signal.get('action', 'HOLD'), float(signal.get('confidence', 0)), float(signal.get('price', 0)),
+            values, patterns_mask, ml.get('prediction', 'HOLD'),
+            signal.get('take_profit'), signal.get('stop_loss'), signal.get('risk_reward'),
+            signal.get('max_risk_pct'), signal.get('risk_profile'), signal.get('priority', 'LOW'),
+            sizing.get('recommended_risk_pct'), sizing.get('max_portfolio_pct'),
+            tuple(signal.get('recommendations', ())), signal.get('market_context')
+        )
+
+    # Vue dict
+
+    @property
+    def indicators(self) -> Dict[str, float]:
+        return dict(zip(INDICATOR_FIELDS, self.values[:len(INDICATOR_FIELDS)].tolist()))
+
+    @property
+    def patterns(self) -> Dict[str, list]:
+        patterns = {category: [] for category in PATTERN_CATEGORIES}
+        for (category, name), bit in PATTERN_BITS.items():
+            if self.patterns_mask & bit:
+                patterns[category].append(name)
+        return patterns
+
+    @property
+    def volume_analysis(self) -> Dict:
+        return classify_volume(float(self.values[VOLUME_RATIO]), float(self.values[VPT]))
+
+    @property
+    def volume_change(self) -> float:
+        """Volume de la bougie par rapport à sa moyenne, en %"""
+        ratio = float(self.values[VOLUME_RATIO])
+        return 0.0 if math.isnan(ratio) else (ratio - 1) * 100
+
+    @property
+    def ml_prediction(self) -> Dict:
+        confidence = float(self.values[ML_CONFIDENCE])
+        if math.isnan(confidence):
+            return {}
+        prediction = {'prediction': self.ml_action, 'confidence': confidence}
+        if not math.isnan(self.values[ML_BUY]):
+            prediction['probabilities'] = {
+                'sell': float(self.values[ML_SELL]),
+                'hold': float(self.values[ML_HOLD]),
+                'buy': float(self.values[ML_BUY])
+            }
+        return prediction
+
+    @property
+    def position_sizing(self) -> Dict:
+        if self.recommended_risk_pct is None:
+            return {}
+        return {
+            'recommended_risk_pct': self.recommended_risk_pct,
+            'max_portfolio_pct': self.max_portfolio_pct,
+            'sizing_rationale': f"Basé sur confiance {self.confidence}% et profil "
+                                f"{self.risk_profile or 'conservative'}"
+        }
+
+    def _keys(self):
+        if self.actual_outcome is None and self.performance_updated is None:
+            return VIEW_KEYS
+        return VIEW_KEYS + OUTCOME_KEYS
+
+    def __getitem__(self, key: str):
+        if key in VIEW_KEYS or key in OUTCOME_KEYS:
+            value = getattr(self, key)
+            return list(value) if key == 'recommendations' else value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        # Seuls les champs de suivi de performance évoluent après la génération
+        if key not in OUTCOME_KEYS:
+            raise KeyError(f"Champ non modifiable: {key}")
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"SignalRecord({self.id}, {self.symbol}, {self.action}, {self.confidence:.1f}%)"
+
+    def to_dict(self) -> Dict:
+        """Signal complet sous forme de dict"""
+        return dict(self.items())
+
+    # Encodage binaire
+
+    def encode(self) -> bytes:
+        """Forme binaire des champs qui n'ont pas de colonne dédiée en base"""
+        recommendations = '\n'.join(self.recommendations).encode('utf-8')
+        header = PAYLOAD_HEADER.pack(
+            PAYLOAD_VERSION,
+            ACTIONS.index(self.action),
+            PRIORITIES.index(self.priority),
+            RISK_PROFILES.index(self.risk_profile),
+            ACTIONS.index(self.ml_action),
+            self.patterns_mask,
+            self.confidence,
+            self.price,
+            *(math.nan if value is None else value
+              for value in (self.take_profit, self.stop_loss, self.risk_reward, self.max_risk_pct,
+                            self.recommended_risk_pct, self.max_portfolio_pct)),
+            len(recommendations)
+        )
+        return header + self.values.tobytes() + recommendations
+
+    @classmethod
+    def decode(cls, payload: bytes, signal_id: str, timestamp, symbol: str, timeframe: str,
+               market_context: Dict = None) -> 'SignalRecord':
+        """Reconstruction d'un signal encodé par `encode`"""
+        (version, action, priority, risk_profile, ml_action, patterns_mask, confidence, price,
+         take_profit, stop_loss, risk_reward, max_risk_pct, recommended_risk_pct, max_portfolio_pct,
+         recommendations_size) = PAYLOAD_HEADER.unpack_from(payload)
+        if version not in PAYLOAD_VALUE_TYPES:
+            raise ValueError(f"Version d'encodage de signal non supportée: {version}")
+
+        offset = PAYLOAD_HEADER.size
+        stored = np.frombuffer(payload, dtype=PAYLOAD_VALUE_TYPES[version], count=VALUE_COUNT, offset=offset)
+        values = stored.astype(np.float64)
+        offset += stored.nbytes
+        recommendations = payload[offset:offset + recommendations_size].decode('utf-8')
+
+        return cls(
+            signal_id, timestamp, symbol, timeframe, ACTIONS[action], confidence, price, values,
+            patterns_mask, ACTIONS[ml_action], _optional(take_profit), _optional(stop_loss),
+            _optional(risk_reward), _optional(max_risk_pct), RISK_PROFILES[risk_profile], PRIORITIES[priority],
+            _optional(recommended_risk_pct), _optional(max_portfolio_pct),
+            tuple(recommendations.split('\n')) if recommendations else (), market_context
+        )
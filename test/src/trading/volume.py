@@ -0,0 +1,29 @@
+# Classification du volume, commune à l'analyse et aux signaux stockés
+
+import math
+from typing import Dict
+
+
+def classify_volume(volume_ratio: float, vpt: float) -> Dict:
+    """
+    Analyse de volume à partir du ratio volume récent / long terme
+
+    Un ratio inconnu (NaN, échec du calcul) donne la tendance 'unknown',
+    neutre pour le signal final.
+
+    Args:
+        volume_ratio (float): Volume moyen des 10 dernières bougies / des 50 dernières
+        vpt (float): Volume Price Trend de la dernière bougie
+
+    Returns:
+        Dict: volume_ratio, volume_trend, vpt et volume_confirmation
+    """
+    if volume_ratio is None or math.isnan(volume_ratio):
+        return {'volume_ratio': 1, 'volume_trend': 'unknown', 'vpt': 0, 'volume_confirmation': False}
+
+    return {
+        'volume_ratio': volume_ratio,
+        'volume_trend': 'increasing' if volume_ratio > 1.2 else 'decreasing' if volume_ratio < 0.8 else 'stable',
+        'vpt': vpt,
+        'volume_confirmation': volume_ratio > 1.1  # Volume confirme le mouvement
+    }
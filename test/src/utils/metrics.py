@@ -0,0 +1,115 @@
+# Métriques Prometheus du bot (latences par étape, appels externes, boucles)
+
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+# Bornes adaptées aux étapes de calcul (sub-milliseconde) comme aux appels réseau
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+ANALYSIS_STAGE_SECONDS = Histogram(
+    'trading_bot_analysis_stage_seconds', "Durée des étapes d'analyse", ['stage'], buckets=LATENCY_BUCKETS
+)
+EXCHANGE_REQUEST_SECONDS = Histogram(
+    'trading_bot_exchange_request_seconds', "Durée des requêtes vers l'exchange",
+    ['exchange', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+EXCHANGE_ERRORS = Counter(
+    'trading_bot_exchange_errors_total', "Requêtes exchange en échec", ['exchange', 'endpoint', 'error']
+)
+DB_QUERY_SECONDS = Histogram(
+    'trading_bot_db_query_seconds', "Durée des opérations en base", ['operation'], buckets=LATENCY_BUCKETS
+)
+DISCORD_SEND_SECONDS = Histogram(
+    'trading_bot_discord_send_seconds', "Durée des envois de messages Discord", ['kind'], buckets=LATENCY_BUCKETS
+)
+DISCORD_SEND_ERRORS = Counter(
+    'trading_bot_discord_send_errors_total', "Envois Discord en échec", ['kind']
+)
+COMMAND_SECONDS = Histogram(
+    'trading_bot_command_seconds', "Temps de traitement des commandes slash", ['command'], buckets=LATENCY_BUCKETS
+)
+SCAN_SKIPPED_SYMBOLS = Counter(
+    'trading_bot_scan_skipped_symbols_total', "Symboles ignorés par le scan de l'univers", ['reason']
+)
+SIGNALS_SUPPRESSED = Counter(
+    'trading_bot_signals_suppressed_total', "Signaux non diffusés car déjà émis sur la bougie", ['reason']
+)
+LOOP_DURATION_SECONDS = Histogram(
+    'trading_bot_loop_duration_seconds', "Durée d'un cycle des tâches périodiques", ['loop'], buckets=LATENCY_BUCKETS
+)
+LOOP_OVERRUNS = Counter(
+    'trading_bot_loop_overruns_total', "Cycles plus longs que l'intervalle de la tâche", ['loop']
+)
+LOOP_LAST_RUN = Gauge(
+    'trading_bot_loop_last_run_timestamp_seconds', "Fin du dernier cycle de chaque tâche", ['loop']
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Mesure la durée du bloc dans l'histogramme (même en cas d'exception)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def timed_operation(histogram: Histogram, label: str = 'operation'):
+    """Décorateur: mesure chaque appel, le nom de la fonction servant d'étiquette"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed(histogram, **{label: func.__name__}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(histogram, **{label: func.__name__}):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+async def send_message(destination, kind: str, **kwargs):
+    """Envoi Discord (canal, utilisateur ou webhook) mesuré par type de message"""
+    try:
+        with timed(DISCORD_SEND_SECONDS, kind=kind):
+            return await destination.send(**kwargs)
+    except Exception:
+        DISCORD_SEND_ERRORS.labels(kind=kind).inc()
+        raise
+
+
+@contextmanager
+def track_loop(name: str, interval: float):
+    """Durée d'un cycle de tâche périodique; un cycle plus long que `interval` est un dépassement"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        LOOP_DURATION_SECONDS.labels(loop=name).observe(duration)
+        LOOP_LAST_RUN.labels(loop=name).set_to_current_time()
+        if duration > interval:
+            LOOP_OVERRUNS.labels(loop=name).inc()
+            logging.warning(f"Tâche {name}: cycle de {duration:.1f}s pour un intervalle de {interval:.0f}s")
+
+
+def start_metrics_server(port: int, address: str = '0.0.0.0') -> bool:
+    """Expose /metrics dans un thread du processus"""
+    try:
+        start_http_server(port, addr=address)
+        logging.info(f"Métriques Prometheus exposées sur le port {port}")
+        return True
+    except OSError as e:
+        logging.error(f"Erreur lors du démarrage du serveur de métriques: {e}")
+        return False
@@ -99,15 +99,951 @@ def test_config():
 def test_database():
     """Test de la base de données"""
     try:
+        import os
+        import tempfile
         from src.database.db_manager import DatabaseManager
-        db = DatabaseManager()
-        db.init_database()
+
+        # Base temporaire: les migrations ne doivent pas réécrire trading_bot.db
+        with tempfile.TemporaryDirectory() as directory:
+            db = DatabaseManager(os.path.join(directory, 'trading_bot.db'))
+            db.init_database()
         print("✅ Base de données initialisée")
         return True
     except Exception as e:
         print(f"❌ Erreur base de données: {e}")
         return False
 
+def test_indicator_engine():
+    """Test du moteur d'indicateurs incrémental face à la librairie ta"""
+    try:
+        import numpy as np
+        import pandas as pd
+        import ta
+        from src.trading.indicators import IndicatorEngine
+
+        config = {'rsi_period': 14, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9, 'bb_period': 20, 'bb_std': 2.0}
+
+        # Série synthétique reproductible
+        rng = np.random.default_rng(42)
+        close = pd.Series(30000 * np.exp(np.cumsum(rng.normal(0, 0.01, 200))))
+        high = close * (1 + rng.uniform(0, 0.01, 200))
+        low = close * (1 - rng.uniform(0, 0.01, 200))
+
+        engine = IndicatorEngine(config)
+        values = engine.sync(np.arange(200), high.values, low.values, close.values)
+
+        macd = ta.trend.MACD(close, window_fast=12, window_slow=26, window_sign=9)
+        bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+        stoch = ta.momentum.StochasticOscillator(high, low, close)
+        adx = ta.trend.ADXIndicator(high, low, close)
+
+        expected = {
+            'rsi': ta.momentum.RSIIndicator(close, window=14).rsi().iloc[-1],
+            'macd': macd.macd().iloc[-1],
+            'macd_signal': macd.macd_signal().iloc[-1],
+            'bb_upper': bb.bollinger_hband().iloc[-1],
+            'bb_lower': bb.bollinger_lband().iloc[-1],
+            'ema_50': ta.trend.EMAIndicator(close, window=50).ema_indicator().iloc[-1],
+            'stoch_k': stoch.stoch().iloc[-1],
+            'stoch_d': stoch.stoch_signal().iloc[-1],
+            'adx': adx.adx().iloc[-1],
+            'di_plus': adx.adx_pos().iloc[-1],
+            'di_minus': adx.adx_neg().iloc[-1],
+            'resistance': high.rolling(20).max().iloc[-1],
+            'support': low.rolling(20).min().iloc[-1]
+        }
+
+        mismatches = [name for name, value in expected.items() if not np.isclose(values[name], value, rtol=1e-9)]
+        if mismatches:
+            print(f"❌ Indicateurs différents de ta: {', '.join(mismatches)}")
+            return False
+
+        print("✅ Moteur d'indicateurs conforme à ta")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur moteur d'indicateurs: {e}")
+        return False
+
+def test_rolling_extremes():
+    """Test des extrêmes glissants vectorisés face à pandas et à la file monotone"""
+    try:
+        import numpy as np
+        import pandas as pd
+        from market_core.levels import RollingExtreme, rolling_extreme
+
+        rng = np.random.default_rng(11)
+        values = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        values[::7] = values[1::7].min()  # égalités dans la fenêtre
+
+        for mode in ('max', 'min'):
+            vectorized = rolling_extreme(values, 20, mode)
+            rolling = getattr(pd.Series(values).rolling(20), mode)().to_numpy()
+            extreme = RollingExtreme(20, mode)
+            incremental = np.array([extreme.update(value) for value in values])
+
+            if not (np.array_equal(vectorized, rolling, equal_nan=True)
+                    and np.array_equal(vectorized, incremental, equal_nan=True)):
+                print(f"❌ Extrêmes glissants ({mode}) différents de pandas ou de RollingExtreme")
+                return False
+
+        if not np.isnan(rolling_extreme(values[:5], 20)).all():
+            print("❌ Série plus courte que la fenêtre: NaN attendus")
+            return False
+
+        print("✅ Extrêmes glissants conformes à pandas")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur extrêmes glissants: {e}")
+        return False
+
+def test_batch_indicators():
+    """Test de l'analyse groupée face à l'analyse symbole par symbole"""
+    try:
+        import numpy as np
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.candles import Candles
+
+        rng = np.random.default_rng(3)
+        symbols, count = ['A/USDT', 'B/USDT', 'C/USDT', 'D/USDT'], 200
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(symbols), count)), axis=1))
+        high = close * (1 + rng.uniform(0, 0.01, close.shape))
+        low = close * (1 - rng.uniform(0, 0.01, close.shape))
+        timestamps = np.broadcast_to(np.arange(count) * 3600000.0, close.shape)
+        stacked = np.stack([timestamps, close, high, low, close, np.ones(close.shape)], axis=2)
+
+        analyzer = TradingAnalyzer()
+        expected = [analyzer._calculate_indicators(Candles.from_ohlcv(ohlcv)) for ohlcv in stacked]
+
+        # A et C ont un moteur chaud (flux ou analyse précédente), B et D passent par le calcul vectorisé
+        keys = [(symbol, '1h') for symbol in symbols]
+        for row in (0, 2):
+            analyzer._calculate_indicators(Candles.from_ohlcv(stacked[row, :-1]), keys[row])
+
+        for stage in (analyzer._analyze_batch(stacked), analyzer._analyze_batch(stacked, keys)):
+            mismatches = [
+                (symbols[row], name) for row in range(len(symbols)) for name, value in expected[row].items()
+                if not np.isclose(stage['indicators'][name][row], value, rtol=1e-9, equal_nan=True)
+            ]
+            if mismatches:
+                print(f"❌ Analyse groupée différente de l'analyse par symbole: {mismatches[:5]}")
+                return False
+
+        if analyzer.indicator_engines[keys[0]].last_timestamp != stacked[0, -2, 0] or keys[1] in analyzer.indicator_engines:
+            print("❌ Moteurs d'indicateurs chauds non réutilisés par l'analyse groupée")
+            return False
+
+        print("✅ Analyse groupée conforme à l'analyse par symbole")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur analyse groupée: {e}")
+        return False
+
+def test_batch_levels():
+    """Test des niveaux pivots de l'analyse groupée face à analyze_symbol, moteur chaud"""
+    try:
+        import numpy as np
+        from src.trading.analyzer import TradingAnalyzer
+
+        rng = np.random.default_rng(5)
+        symbols, count, window = ['A/USDT', 'B/USDT'], 600, 200
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(symbols), count)), axis=1))
+        high = close * (1 + rng.uniform(0, 0.01, close.shape))
+        low = close * (1 - rng.uniform(0, 0.01, close.shape))
+        timestamps = np.broadcast_to(np.arange(count) * 3600000.0, close.shape)
+        ohlcv = np.stack([timestamps, close, high, low, close, np.ones(close.shape)], axis=2)
+
+        # A a un moteur chaud sur tout l'historique, plus long que la fenêtre analysée; B est froid
+        analyzer = TradingAnalyzer()
+        analyzer._analyze_ohlcv(symbols[0], '1h', ohlcv[0, :-1])
+
+        stacked = ohlcv[:, -window:]
+        stage = analyzer._analyze_batch(stacked, [(symbol, '1h') for symbol in symbols])
+        ml_signals = analyzer._get_ml_predictions(stage['features'])
+        batch = analyzer._finalize_batch(symbols, '1h', stage, ml_signals)
+
+        warm = analyzer._analyze_ohlcv(symbols[0], '1h', stacked[0])
+        cold = TradingAnalyzer()._analyze_ohlcv(symbols[1], '1h', stacked[1])
+
+        for expected, actual in ((warm, batch[0]), (cold, batch[1])):
+            if expected['levels'] != actual['levels'] or expected['signal'] != actual['signal']:
+                print(f"❌ Niveaux de {actual['symbol']} différents de l'analyse par symbole")
+                return False
+
+        if not warm['levels']['supports'] and not warm['levels']['resistances']:
+            print("❌ Aucun niveau pivot détecté")
+            return False
+
+        print("✅ Niveaux pivots de l'analyse groupée conformes à l'analyse par symbole")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur niveaux de l'analyse groupée: {e}")
+        return False
+
+def test_market_feed():
+    """Test du flux websocket face à un serveur local simulant Binance"""
+    try:
+        import asyncio
+        import base64
+        import hashlib
+        import json
+        import time
+        import numpy as np
+        from src.trading.candle_store import CandleStore
+        from src.trading.market_feed import MarketDataFeed
+
+        hour = 3600000
+        start = int(time.time() * 1000) // hour * hour - 49 * hour
+        history = [[start + i * hour, 100.0, 101.0, 99.0, 100.0, 10.0] for i in range(50)]
+        last = history[-1][0]
+
+        def kline(timestamp, close, closed):
+            data = {'e': 'kline', 's': 'BTCUSDT', 'k': {
+                't': timestamp, 'i': '1h', 'o': '100.0', 'h': '102.0', 'l': '99.0',
+                'c': str(close), 'v': '12.0', 'x': closed}}
+            return json.dumps({'stream': 'btcusdt@kline_1h', 'data': data})
+
+        async def serve(reader, writer):
+            # Poignée de main websocket minimale puis trames texte non masquées
+            request = await reader.readuntil(b'\r\n\r\n')
+            key = next(line.split(b':', 1)[1].strip() for line in request.split(b'\r\n')
+                       if line.lower().startswith(b'sec-websocket-key'))
+            accept = base64.b64encode(hashlib.sha1(key + b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11').digest())
+            writer.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                         b'Connection: Upgrade\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+            for message in (kline(last, 100.5, False), kline(last, 101.5, True), kline(last + hour, 101.6, False)):
+                payload = message.encode()
+                writer.write(bytes([0x81, 126]) + len(payload).to_bytes(2, 'big') + payload)
+            await writer.drain()
+            await reader.read()
+            writer.close()
+
+        async def fetcher(symbol, timeframe, since=None, limit=None):
+            return [candle for candle in history if since is None or candle[0] >= since]
+
+        async def run():
+            server = await asyncio.start_server(serve, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            store = CandleStore(fetcher)
+            await store.get_ohlcv('BTC/USDT', '1h', 50)
+
+            closed = asyncio.Event()
+            received = {}
+
+            def on_bar_close(symbol, timeframe, candle):
+                received['delay'] = time.perf_counter() - sent_at
+                closed.set()
+
+            feed = MarketDataFeed(store, ['BTC/USDT'], url=f'ws://127.0.0.1:{port}',
+                                  tickers=False, on_bar_close=on_bar_close)
+            sent_at = time.perf_counter()
+            feed.start()
+            try:
+                await asyncio.wait_for(closed.wait(), 5)
+                await asyncio.sleep(0.05)
+                ohlcv = await store.get_ohlcv('BTC/USDT', '1h', 50)
+            finally:
+                await asyncio.to_thread(feed.stop)
+                server.close()
+            return ohlcv, store.stats, received['delay']
+
+        ohlcv, stats, delay = asyncio.run(run())
+
+        if not (ohlcv[-1, 0] == last + hour and ohlcv[-2, 4] == 101.5 and np.isclose(ohlcv[-1, 4], 101.6)):
+            print("❌ Bougies du flux non intégrées au CandleStore")
+            return False
+        if stats['full_loads'] != 1 or stats['incremental_fetches'] != 0:
+            print("❌ Appels REST superflus avec le flux connecté")
+            return False
+
+        print(f"✅ Flux websocket opérationnel (clôture traitée en {delay * 1000:.0f}ms)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur flux websocket: {e}")
+        return False
+
+def test_fake_exchange():
+    """Test de l'analyse complète hors ligne avec l'exchange simulé"""
+    try:
+        import asyncio
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.fake_exchange import AsyncFakeExchange
+
+        symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+
+        async def run():
+            analyzer = TradingAnalyzer()
+            analyzer.ohlcv_cache = None
+            exchange = AsyncFakeExchange.synthetic(symbols, ['1h'], count=1200, latency=0.001)
+            analyzer.exchanges['binance'] = exchange
+
+            # Une requête en échec ne doit pas empêcher l'analyse des autres symboles
+            exchange.fail_next(1)
+            analyses = await analyzer.analyze_many(symbols, '1h', limit=300)
+            pages = await exchange.fetch_ohlcv('BTC/USDT', '1h', since=0, limit=5000)
+            await analyzer.close()
+            return analyses, len(pages)
+
+        analyses, page_size = asyncio.run(run())
+        failed = [analysis for analysis in analyses if analysis.get('error')]
+
+        if len(failed) != 1 or page_size != 1000:
+            print(f"❌ Exchange simulé incohérent ({len(failed)} échecs, page de {page_size} bougies)")
+            return False
+
+        print("✅ Analyse hors ligne avec l'exchange simulé")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur exchange simulé: {e}")
+        return False
+
+def test_timeframes_history():
+    """Test de l'analyse multi-timeframes: requêtes bornées à froid, historique lu sur disque"""
+    try:
+        import asyncio
+        import tempfile
+        import numpy as np
+        from market_core.ohlcv_cache import OHLCVDiskCache
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.candle_store import resample_ohlcv
+        from src.trading.fake_exchange import AsyncFakeExchange
+
+        timeframes = ['1h', '4h', '1d']
+
+        async def run(cache):
+            analyzer = TradingAnalyzer()
+            analyzer.ohlcv_cache = cache
+            exchange = AsyncFakeExchange.synthetic(['BTC/USDT'], ['1h'], count=6000)
+            analyzer.exchanges['binance'] = exchange
+            if cache is not None:
+                cache.append('BTC/USDT', '1h', exchange.candles[('BTC/USDT', '1h')][:-1].tolist())
+            try:
+                analyses = await analyzer.analyze_timeframes('BTC/USDT', timeframes)
+            finally:
+                await analyzer.close()
+            return analyses, exchange.stats['fetch_ohlcv'], exchange.candles[('BTC/USDT', '1h')]
+
+        # Démarrage à froid sans cache disque: seule la chauffe du 1d est téléchargée
+        cold, cold_requests, _ = asyncio.run(run(None))
+        with tempfile.TemporaryDirectory() as directory:
+            warm, warm_requests, series = asyncio.run(run(OHLCVDiskCache(directory)))
+
+        daily = resample_ohlcv(series[-(200 * 24 + 24):], '1h', '1d')[-200:]
+        expected = TradingAnalyzer()._analyze_ohlcv('BTC/USDT', '1d', daily)
+
+        if any(analysis.get('error') for analysis in (*cold.values(), *warm.values())):
+            print("❌ Analyse multi-timeframes en erreur")
+            return False
+        if cold_requests > 2 or warm_requests > 1:
+            print(f"❌ Trop de requêtes ({cold_requests} à froid, {warm_requests} avec le cache disque)")
+            return False
+        if not all(np.isclose(warm['1d']['indicators'][name], value, rtol=1e-9, equal_nan=True)
+                   for name, value in expected['indicators'].items()):
+            print("❌ Historique 1d incomplet malgré le cache disque")
+            return False
+
+        print(f"✅ Multi-timeframes: {cold_requests} requêtes à froid, {warm_requests} avec le cache disque")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur analyse multi-timeframes: {e}")
+        return False
+
+def test_request_scheduler():
+    """Test de l'ordonnanceur de requêtes face au poids exposé par l'exchange simulé"""
+    try:
+        import asyncio
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.fake_exchange import AsyncFakeExchange
+        from src.trading.rate_limiter import PRIORITY_USER, RequestScheduler, TokenBucket, request_priority
+
+        background = [f'COIN{i}/USDT' for i in range(260)]
+        user = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+
+        async def run():
+            # Échelle réduite: 400 de poids par seconde, pour une limite exchange de 500 (4800 / 6000 chez Binance)
+            analyzer = TradingAnalyzer()
+            analyzer.ohlcv_cache = None
+            exchange = AsyncFakeExchange.synthetic(background + user, ['1h'], count=20, weight_window=1.0)
+            analyzer.exchanges['binance'] = exchange
+            analyzer.request_scheduler = RequestScheduler({'weight': TokenBucket(400, 1.0)})
+            served, used = [], []
+
+            async def fetch(symbol):
+                await analyzer._fetch_exchange_ohlcv(symbol, '1h', limit=10)
+                served.append(symbol)
+                used.append(int(exchange.last_response_headers['x-mbx-used-weight-1m']))
+
+            try:
+                # Rafale de fond au-delà des jetons disponibles, puis commandes utilisateur
+                tasks = [asyncio.create_task(fetch(symbol)) for symbol in background]
+                await asyncio.sleep(0)
+                with request_priority(PRIORITY_USER):
+                    tasks += [asyncio.create_task(fetch(symbol)) for symbol in user]
+                await asyncio.gather(*tasks)
+                return served, used, analyzer.request_scheduler.get_stats()
+            finally:
+                await analyzer.close()
+
+        served, used, stats = asyncio.run(run())
+        waiting = background[len(background) - stats['background']['queued']:]
+        ahead = all(served.index(symbol) < served.index(queued) for symbol in user for queued in waiting)
+
+        if len(served) != len(background) + len(user) or not waiting or not ahead:
+            print(f"❌ Ordre des requêtes incorrect ({stats['background']['queued']} requêtes de fond en attente)")
+            return False
+        if max(used) > 500:
+            print(f"❌ Limite de poids de l'exchange dépassée: {max(used)}")
+            return False
+
+        print(f"✅ Requêtes utilisateur prioritaires, poids maximal {max(used)}/500")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur ordonnanceur de requêtes: {e}")
+        return False
+
+def test_market_scanner():
+    """Test du scan de l'univers réparti sur un processus de calcul"""
+    try:
+        import asyncio
+        from src.trading.analysis_cache import analysis_key
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.fake_exchange import AsyncFakeExchange
+        from src.trading.market_scanner import MarketScanner
+
+        symbols = [f'COIN{i}/USDT' for i in range(40)] + ['BTC/EUR']
+
+        async def run():
+            analyzer = TradingAnalyzer()
+            analyzer.ohlcv_cache = None
+            exchange = AsyncFakeExchange.synthetic(symbols, ['1h'], count=300)
+            analyzer.exchanges['binance'] = exchange
+
+            scanner = MarketScanner(analyzer, workers=1, budget=30, shard_size=16)
+            try:
+                # Un symbole en échec est signalé comme ignoré, sans bloquer le cycle
+                await scanner.load_universe()
+                exchange.fail_next(1)
+                scan = await scanner.scan('1h', limit=200)
+                # Résultats du scan (calcul froid) rangés à part de ceux d'analyze_symbol
+                cache = analyzer.analysis_cache
+                separate = all(
+                    cache.get(analysis_key(symbol, '1h', 200)) is None
+                    and cache.get(analysis_key(symbol, '1h', 200, scanned=True)) is not None
+                    for symbol in (analysis['symbol'] for analysis in scan['analyses'])
+                )
+                return scan, separate
+            finally:
+                await scanner.close()
+                await analyzer.close()
+
+        scan, separate = asyncio.run(run())
+        analyzed = {analysis['symbol'] for analysis in scan['analyses']}
+
+        if len(analyzed) != 39 or list(scan['skipped'].values()) != ['fetch_error'] or 'BTC/EUR' in analyzed:
+            print(f"❌ Scan incohérent ({len(analyzed)} analyses, ignorés: {scan['skipped']})")
+            return False
+
+        if not separate:
+            print("❌ Résultats du scan rangés sous la clé d'analyze_symbol")
+            return False
+
+        print(f"✅ Scan de {scan['stats']['universe']} paires en {scan['stats']['duration']:.1f}s")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur scan du marché: {e}")
+        return False
+
+def test_ohlcv_cache():
+    """Test du cache disque: ajouts, segments disjoints et écriture interrompue"""
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from market_core.ohlcv_cache import OHLCVDiskCache
+
+        hour = 3600000
+        origin = 1577836800000  # 2020-01-01
+
+        def candles(first, count):
+            timestamps = origin + np.arange(first, first + count) * hour
+            return [[int(t), 1.0, 2.0, 0.5, float(i), 10.0] for i, t in enumerate(timestamps, first)]
+
+        def stored(cache):
+            return cache.read('BTC/USDT', '1h')[:, 4].astype(int).tolist()
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = OHLCVDiskCache(directory)
+
+            # Création puis prolongement en fin de fichier (recouvrement ignoré)
+            cache.append('BTC/USDT', '1h', candles(100, 50))
+            written = cache.append('BTC/USDT', '1h', candles(140, 20))
+            if written != 10 or stored(cache) != list(range(100, 160)) or cache.stats['appends'] != 1:
+                print("❌ Cache OHLCV: prolongement incorrect")
+                return False
+
+            # Bloc antérieur recouvrant le début: fusion
+            cache.append('BTC/USDT', '1h', candles(80, 30))
+            merged_segment = (origin + 80 * hour, origin + 160 * hour)
+            if stored(cache) != list(range(80, 160)) or cache.segments('BTC/USDT', '1h') != [merged_segment]:
+                print("❌ Cache OHLCV: ajout antérieur incorrect")
+                return False
+
+            # Bloc disjoint plus récent (bot arrêté longtemps): nouveau segment, historique conservé
+            cache.append('BTC/USDT', '1h', candles(300, 20))
+            # Bloc disjoint plus ancien: conservé lui aussi
+            cache.append('BTC/USDT', '1h', candles(10, 5))
+            expected = list(range(10, 15)) + list(range(80, 160)) + list(range(300, 320))
+            segments = cache.segments('BTC/USDT', '1h')
+            if stored(cache) != expected or len(segments) != 3:
+                print(f"❌ Cache OHLCV: bougies perdues sur bloc disjoint ({len(segments)} segments)")
+                return False
+            if cache.coverage('BTC/USDT', '1h', at=origin + 200 * hour) is not None \
+                    or cache.coverage('BTC/USDT', '1h') != (origin + 300 * hour, origin + 320 * hour):
+                print("❌ Cache OHLCV: couverture par segment incorrecte")
+                return False
+
+            # Bloc comblant le trou: les segments fusionnent
+            cache.append('BTC/USDT', '1h', candles(160, 140))
+            expected = list(range(10, 15)) + list(range(80, 320))
+            if stored(cache) != expected or len(cache.segments('BTC/USDT', '1h')) != 2:
+                print("❌ Cache OHLCV: trou mal comblé")
+                return False
+
+            # Écriture interrompue après les colonnes, avant l'index: octets en trop ignorés puis tronqués
+            path = os.path.join(directory, 'BTC-USDT', '1h')
+            for name in os.listdir(path):
+                if name.endswith('.bin'):
+                    with open(os.path.join(path, name), 'ab') as f:
+                        f.write(b'\xff' * 8 * 3)
+            reopened = OHLCVDiskCache(directory)
+            before = stored(reopened)
+            reopened.append('BTC/USDT', '1h', candles(320, 2))
+            if before != stored(cache) or stored(OHLCVDiskCache(directory))[-3:] != [319, 320, 321]:
+                print("❌ Cache OHLCV: écriture interrompue mal récupérée")
+                return False
+
+        print("✅ Cache OHLCV: ajouts, segments disjoints et reprise après interruption")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur cache OHLCV: {e}")
+        return False
+
+def test_candle_store_history():
+    """Test du CandleStore sur une paire récemment listée, en bougies hebdomadaires"""
+    try:
+        import asyncio
+        import time
+        from market_core.timeframes import timeframe_origin_ms, timeframe_to_ms
+        from src.trading.candle_store import CandleStore
+
+        week, origin = timeframe_to_ms('1w'), timeframe_origin_ms('1w')
+        now_ms = int(time.time() * 1000)
+        current = now_ms - (now_ms - origin) % week
+        # Paire listée il y a 20 semaines: l'exchange n'a pas plus d'historique
+        listed = [current - i * week for i in range(19, -1, -1)]
+        requests = []
+
+        async def fetcher(symbol, timeframe, since=None, limit=None):
+            requests.append(since)
+            return [[ts, 1.0, 1.0, 1.0, 1.0, 1.0] for ts in listed if since is None or ts >= since][:limit]
+
+        async def run():
+            store = CandleStore(fetcher, min_refresh_seconds=0)
+            lengths = [len(await store.get_ohlcv('NEW/USDT', '1w', 200)) for _ in range(3)]
+            return store.stats, lengths
+
+        stats, lengths = asyncio.run(run())
+
+        if stats['full_loads'] != 1 or stats['incremental_fetches'] != 2 or lengths != [20, 20, 20]:
+            print(f"❌ Série courte rechargée à chaque accès ({stats['full_loads']} chargements complets)")
+            return False
+        if (requests[0] - origin) % week != 0:
+            print("❌ Fenêtre 1w non alignée sur l'ouverture des bougies hebdomadaires")
+            return False
+
+        print("✅ Historique court: un seul chargement complet, fenêtre 1w alignée")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur historique court des bougies: {e}")
+        return False
+
+def test_market_context():
+    """Test du contexte de marché calculé sur le scan et les symboles du flux"""
+    try:
+        import asyncio
+        import time
+        from datetime import datetime
+        import numpy as np
+        from src.trading.candle_store import CandleStore
+        from src.trading.market_context import MarketContextEngine
+
+        hour = 3600000
+        start = int(time.time() * 1000) // hour * hour - 99 * hour
+        # BTC en forte hausse avec un gros volume, les autres paires en légère baisse
+        drifts = {'BTC/USDT': 0.01, 'ETH/USDT': -0.001, 'COIN1/USDT': -0.002, 'COIN2/USDT': -0.001}
+
+        async def fetcher(symbol, timeframe, since=None, limit=None):
+            closes = 100 * np.exp(drifts[symbol] * np.arange(100))
+            volume = 1000.0 if symbol == 'BTC/USDT' else 10.0
+            return [[start + i * hour, c, c, c, c, volume] for i, c in enumerate(closes)]
+
+        def analysis(symbol, adx):
+            return {'symbol': symbol, 'timeframe': '1h', 'timestamp': datetime.utcnow(), 'indicators': {'adx': adx}}
+
+        async def run():
+            store = CandleStore(fetcher)
+            for symbol in drifts:
+                await store.get_ohlcv(symbol, '1h', 100)
+            engine = MarketContextEngine(store, timeframe='1h')
+
+            # Scan excluant les symboles du flux: ceux-ci sont tout de même pris en compte
+            scan = [analysis('COIN1/USDT', 40.0), analysis('COIN2/USDT', 40.0), {'symbol': 'ERR/USDT', 'error': True}]
+            first = dict(engine.compute(scan, symbols=['BTC/USDT', 'ETH/USDT']))
+            # Clôture de bougie du flux: les paires du dernier scan restent dans le contexte
+            second = engine.compute([analysis('BTC/USDT', 10.0)], symbols=['BTC/USDT', 'ETH/USDT'])
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        if first['symbols'] != 4 or first['btc_dominance'] < 90 or first['advancing'] != 1 or first['declining'] != 3:
+            print(f"❌ Contexte incomplet sans les symboles du flux: {first}")
+            return False
+        if second['symbols'] != 4 or second['median_adx'] != 40.0 or second['overall_trend'] != 'sideways':
+            print(f"❌ Contexte recalculé sans les paires du scan: {second}")
+            return False
+
+        print(f"✅ Contexte de marché: {second['symbols']} paires, dominance BTC {second['btc_dominance']:.0f}%")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur contexte de marché: {e}")
+        return False
+
+def test_pattern_history():
+    """Test des patterns sur tout l'historique face à la détection bougie par bougie"""
+    try:
+        import numpy as np
+        from src.trading.analyzer import TradingAnalyzer
+        from src.trading.candles import Candles
+        from src.trading.indicators import IndicatorEngine
+        from src.trading.ml_model import WARMUP_CANDLES
+        from src.trading.patterns import detect_pattern_history, patterns_at
+
+        # Série oscillante pour déclencher surachat, survente et doubles sommets
+        rng = np.random.default_rng(7)
+        count = 240
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)) + 0.08 * np.sin(np.arange(count) / 6))
+        high = close * (1 + rng.uniform(0, 0.01, count))
+        low = close * (1 - rng.uniform(0, 0.01, count))
+        ohlcv = np.column_stack([np.arange(count) * 3600000, close, high, low, close, np.ones(count)])
+
+        analyzer = TradingAnalyzer()
+        masks = detect_pattern_history(high, low, close, analyzer.indicators_config)
+        engine = IndicatorEngine(analyzer.indicators_config)
+
+        mismatches, detected = [], 0
+        for t in range(count):
+            indicators = engine.update(int(ohlcv[t, 0]), high[t], low[t], close[t])
+            if t < WARMUP_CANDLES:
+                continue
+            expected = analyzer._detect_patterns(Candles.from_ohlcv(ohlcv[:t + 1]), indicators)
+            actual = patterns_at(masks, t)
+            detected += sum(len(names) for names in expected.values())
+            if actual != expected:
+                mismatches.append(t)
+
+        if mismatches or detected == 0:
+            print(f"❌ Historique des patterns incohérent (bougies {mismatches[:5]}, {detected} détections)")
+            return False
+
+        print(f"✅ Historique des patterns conforme à la détection par bougie ({detected} détections)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur historique des patterns: {e}")
+        return False
+
+def test_signal_record():
+    """Test de l'encodage binaire des signaux et de leur relecture en base"""
+    try:
+        import os
+        import tempfile
+        from datetime import datetime
+        import numpy as np
+        from src.database.db_manager import DatabaseManager
+        from src.trading.signal_record import INDICATOR_FIELDS, PAYLOAD_HEADER, SignalRecord
+
+        signal = {
+            'id': 'SIG_1', 'timestamp': datetime.utcnow(), 'symbol': 'BTC/USDT', 'action': 'BUY',
+            'confidence': 82.5, 'price': 30000.0, 'timeframe': '1h',
+            # Valeurs non représentables en float32 (prix à nombreux chiffres, VPT/OBV élevés)
+            'indicators': {name: 30123.456789 + i / 7 for i, name in enumerate(INDICATOR_FIELDS)},
+            'patterns': {'bullish_patterns': ['golden_cross'], 'bearish_patterns': [],
+                         'continuation_patterns': [], 'reversal_patterns': ['rsi_oversold', 'double_bottom']},
+            'volume_analysis': {'volume_ratio': 1.25, 'volume_trend': 'increasing', 'vpt': 1234567891.0123,
+                                'volume_confirmation': True},
+            'ml_prediction': {'prediction': 'BUY', 'confidence': 0.75,
+                              'probabilities': {'sell': 0.125, 'hold': 0.125, 'buy': 0.75}},
+            'take_profit': 31800.0, 'stop_loss': 29400.0, 'risk_reward': 3.0, 'max_risk_pct': 2.0,
+            'risk_profile': 'aggressive', 'market_context': {'overall_trend': 'bullish'},
+            'recommendations': ['Signal fort', 'Volume élevé'], 'priority': 'HIGH',
+            'position_sizing': {'recommended_risk_pct': 1.5, 'max_portfolio_pct': 10.0,
+                                'sizing_rationale': 'Basé sur confiance 82.5% et profil aggressive'}
+        }
+        unknown_volume = {**signal, 'id': 'SIG_2', 'action': 'SELL', 'risk_profile': None, 'position_sizing': {},
+                          'volume_analysis': {'volume_ratio': 1, 'volume_trend': 'unknown', 'vpt': 0,
+                                              'volume_confirmation': False}}
+
+        def differences(expected, actual):
+            return [
+                key for key, value in expected.items() if key != 'timestamp'
+                and not (actual.get(key) == value or isinstance(value, dict) and all(
+                    actual[key][name] == item for name, item in value.items()
+                ))
+            ]
+
+        for original in (signal, unknown_volume):
+            record = SignalRecord.from_dict(original)
+            decoded = SignalRecord.decode(record.encode(), original['id'], original['timestamp'], original['symbol'],
+                                          original['timeframe'], original['market_context'])
+            mismatches = differences(original, decoded)
+            if mismatches:
+                print(f"❌ Encodage du signal {original['id']} incomplet: {', '.join(mismatches)}")
+                return False
+
+        # Signaux enregistrés avant le passage en float64 (version 1, valeurs float32)
+        record = SignalRecord.from_dict(signal)
+        payload = record.encode()
+        legacy = (bytes([1]) + payload[1:PAYLOAD_HEADER.size] + record.values.astype(np.float32).tobytes()
+                  + payload[PAYLOAD_HEADER.size + record.values.nbytes:])
+        decoded = SignalRecord.decode(legacy, signal['id'], signal['timestamp'], signal['symbol'], signal['timeframe'])
+        if decoded.recommendations != record.recommendations or \
+                not np.allclose(decoded.values, record.values, rtol=1e-6, equal_nan=True):
+            print("❌ Signal encodé en version 1 mal relu")
+            return False
+
+        with tempfile.TemporaryDirectory() as directory:
+            db = DatabaseManager(os.path.join(directory, 'signals.db'))
+            if len(db.save_signals([SignalRecord.from_dict(signal), SignalRecord.from_dict(unknown_volume)])) != 2:
+                print("❌ Sauvegarde des signaux en échec")
+                return False
+            stored = {row['id']: row for row in db.get_signals()}
+
+        for original in (signal, unknown_volume):
+            mismatches = differences(original, stored[original['id']])
+            if mismatches:
+                print(f"❌ Signal {original['id']} relu incomplet: {', '.join(mismatches)}")
+                return False
+
+        print("✅ Signaux encodés et relus sans perte")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur encodage des signaux: {e}")
+        return False
+
+def test_signal_history():
+    """Test de l'historique borné des signaux et de ses index"""
+    try:
+        from src.trading.signal_history import SignalHistory
+
+        history = SignalHistory(capacity=4)
+        # (identifiant, symbole): SIG_1 est réutilisé par un signal plus récent
+        entries = [('SIG_0', 'A'), ('SIG_1', 'B'), ('SIG_2', 'A'), ('SIG_1', 'C'),
+                   ('SIG_4', 'A'), ('SIG_5', 'B'), ('SIG_6', 'A'), ('SIG_7', 'A')]
+        signals = [{'id': signal_id, 'symbol': symbol} for signal_id, symbol in entries]
+
+        def consistent():
+            # Index par identifiant et files par symbole reflètent exactement la file principale
+            kept = list(history)
+            latest = {signal['id']: signal for signal in kept}
+            by_symbol = {symbol: [s for s in reversed(kept) if s['symbol'] == symbol] for symbol in history.symbols()}
+            return (all(history.get(signal_id) is signal for signal_id, signal in latest.items())
+                    and all(history.recent(10, symbol) == by_symbol[symbol] for symbol in by_symbol)
+                    and set(history.symbols()) == {signal['symbol'] for signal in kept}
+                    and sum(len(history.recent(10, symbol)) for symbol in by_symbol) == len(kept))
+
+        for signal in signals[:6]:
+            history.append(signal)
+        # SIG_0 et le premier SIG_1 évincés; l'index de SIG_1 pointe toujours vers le signal de C
+        first = (list(history) == signals[2:6] and history.get('SIG_1') is signals[3]
+                 and 'SIG_0' not in history and history.recent(2, 'B') == [signals[5]] and consistent())
+
+        for signal in signals[6:]:
+            history.append(signal)
+        # Le signal de C évincé emporte son symbole et l'identifiant SIG_1
+        second = (len(history) == 4 and 'SIG_1' not in history and 'C' not in history.symbols()
+                  and history.recent(2) == [signals[7], signals[6]] and consistent())
+
+        if not (first and second):
+            print(f"❌ Historique des signaux incohérent: {[signal['id'] for signal in history]}")
+            return False
+
+        print("✅ Historique borné: éviction, files par symbole et identifiants réutilisés")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur historique des signaux: {e}")
+        return False
+
+def test_signal_ids():
+    """Test des identifiants de signaux et de leur insertion groupée"""
+    try:
+        import os
+        import tempfile
+        from datetime import datetime
+        import numpy as np
+        from src.database.db_manager import DatabaseManager
+        from src.trading.signal_ids import SignalIdGenerator
+        from src.trading.signal_record import SignalRecord, VALUE_COUNT
+
+        generator = SignalIdGenerator()
+        ids = [generator() for _ in range(500)]
+        if len(set(ids)) != 500 or ids != sorted(ids):
+            print("❌ Identifiants de signaux non uniques ou non croissants")
+            return False
+
+        def record(signal_id):
+            return SignalRecord(signal_id, datetime.utcnow(), 'BTC/USDT', '1h', 'BUY', 80.0, 30000.0,
+                                np.full(VALUE_COUNT, np.nan, dtype=np.float64))
+
+        with tempfile.TemporaryDirectory() as directory:
+            db = DatabaseManager(os.path.join(directory, 'signals.db'))
+            saved = db.save_signals([record(signal_id) for signal_id in ids])
+            # Un identifiant déjà enregistré n'écarte que son signal, pas le reste du lot
+            fresh = generator()
+            collision = db.save_signals([record(fresh), record(ids[0])])
+            stored = [row['id'] for row in db.get_signals(limit=1000)]
+
+        if len(saved) != 500 or [signal['id'] for signal in collision] != [fresh] or sorted(stored) != ids + [fresh]:
+            print(f"❌ Insertion groupée incorrecte ({len(saved)} enregistrés, collision: "
+                  f"{[signal['id'] for signal in collision]}, {len(stored)} lus)")
+            return False
+
+        print("✅ 500 identifiants uniques et croissants, insertion groupée")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur identifiants de signaux: {e}")
+        return False
+
+def test_signal_evaluator():
+    """Test de l'évaluation des signaux (take profit / stop loss) sur les bougies stockées"""
+    try:
+        import asyncio
+        import tempfile
+        import time
+        from datetime import datetime
+        from types import SimpleNamespace
+        import numpy as np
+        from src.trading.candle_store import CandleStore
+        from market_core.ohlcv_cache import OHLCVDiskCache
+        from src.trading.signal_evaluator import EXPIRED, LOSS, OPEN, PROFITABLE, SignalEvaluator, evaluate_outcomes
+
+        hour = 3600000
+        # Bougies plates à 100, sauf: bougie 2 haute à 106, bougie 4 basse à 94, bougie 6 touche les deux
+        candles = np.array([[i * hour, 100.0, 101.0, 99.0, 100.0, 10.0] for i in range(10)])
+        candles[[2, 6], 2] = 106.0
+        candles[[4, 6], 3] = 94.0
+
+        # BUY et SELL sur la même hausse, stop et objectif dans la même bougie,
+        # signal trop récent pour être observé, expiration au cours de clôture
+        created = np.array([0, 0, 4, 8, 0]) * hour
+        directions = np.array([1.0, -1.0, 1.0, 1.0, 1.0])
+        entries = np.full(5, 100.0)
+        take_profits = np.array([105.0, 95.0, 105.0, 105.0, 200.0])
+        stop_losses = np.array([95.0, 105.0, 95.0, 95.0, 50.0])
+
+        levels = (directions, entries, take_profits, stop_losses)
+        status, profit_loss = evaluate_outcomes(candles, created, *levels, 4, hour)
+        partial, _ = evaluate_outcomes(candles, created, *levels, 4, hour, 4)
+        # Bougies 1 à 3 absentes: l'horizon de 4h s'arrête à la bougie 4, sans atteindre la hausse de la bougie 6
+        gapped, gapped_pnl = evaluate_outcomes(candles[[0, 4, 5, 6, 7, 8, 9]], created[4:], *(
+            values[4:] for values in levels), 4, hour)
+
+        if (status.tolist() != [PROFITABLE, LOSS, LOSS, OPEN, EXPIRED]
+                or not np.allclose(profit_loss, [5, -5, -5, np.nan, 0], equal_nan=True)
+                or partial[4] != OPEN or gapped.tolist() != [EXPIRED] or gapped_pnl[0] != 0):
+            print(f"❌ Résultats des signaux incorrects: {status.tolist()} {profit_loss.tolist()} {gapped.tolist()}")
+            return False
+
+        # Chargement des bougies: CandleStore puis cache disque, sans appel à l'exchange
+        now = int(time.time() * 1000) // hour * hour
+        history = [[now - (99 - i) * hour, 100.0, 101.0, 99.0, 100.0, 10.0] for i in range(100)]
+        fetches = []
+
+        async def fetcher(symbol, timeframe, since=None, limit=None):
+            fetches.append(limit)
+            return history[-limit:]
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = OHLCVDiskCache(directory)
+            cache.append('BTC/USDT', '1h', history[:-1])
+            store = CandleStore(fetcher, capacity=30)
+            asyncio.run(store.get_ohlcv('BTC/USDT', '1h', 30))
+            evaluator = SignalEvaluator(None, SimpleNamespace(candle_store=store, ohlcv_cache=cache))
+
+            loaded = evaluator._load_candles('BTC/USDT', '1h', history[10][0])
+            missing = evaluator._load_candles('ETH/USDT', '1h', history[10][0])
+
+            # Série jamais chargée: signal compté à part, ni ouvert ni expiré
+            created_at = datetime.utcfromtimestamp(history[10][0] / 1000)
+            open_signals = [
+                {'id': f'SIG_{symbol}', 'symbol': symbol, 'timeframe': '1h', 'created_at': created_at,
+                 'action': 'BUY', 'price': 100.0, 'take_profit': 105.0, 'stop_loss': 95.0}
+                for symbol in ('BTC/USDT', 'ETH/USDT')
+            ]
+            evaluator.db_manager = SimpleNamespace(get_open_signals=lambda days: open_signals,
+                                                   update_signal_outcomes=len)
+            summary = asyncio.run(evaluator.evaluate())
+
+        if len(fetches) != 1 or len(loaded) != 90 or np.any(np.diff(loaded[:, 0]) != hour) or len(missing):
+            print(f"❌ Chargement des bougies incorrect ({len(loaded)} bougies, {len(fetches)} requêtes)")
+            return False
+
+        if summary['expired'] != 1 or summary['unavailable'] != 1 or summary['open'] != 0:
+            print(f"❌ Signaux sans bougies mal comptés: {summary}")
+            return False
+
+        print("✅ Évaluation des signaux sur les bougies stockées")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur évaluation des signaux: {e}")
+        return False
+
+def test_signal_dedup():
+    """Test de la déduplication des signaux par bougie"""
+    try:
+        from src.trading.signal_dedup import SignalDeduplicator
+
+        hour = 3600000
+        now = 1000 * hour + 60000
+        dedup = SignalDeduplicator(min_confidence_change=10)
+
+        def cycle(action, confidence, minutes, generated=True):
+            # Un cycle de 5 minutes: consultation, puis enregistrement si le signal a été produit
+            analysis = {'symbol': 'BTC/USDT', 'timeframe': '1h', 'signal': action, 'confidence': confidence}
+            at = now + minutes * 60000
+            emit = dedup.should_emit(analysis, now_ms=at)
+            if emit and generated:
+                dedup.record({**analysis, 'action': action}, now_ms=at)
+            return emit
+
+        emitted = [
+            cycle('BUY', 60, 0, generated=False),  # échec de génération: rien n'est mémorisé
+            cycle('BUY', 60, 5),                    # premier signal réellement émis
+            cycle('BUY', 65, 10),                   # répétition
+            cycle('HOLD', 0, 15),
+            cycle('BUY', 62, 20),                   # BUY -> HOLD -> BUY sur la même bougie
+            cycle('BUY', 72, 25),                   # confiance nettement différente
+            cycle('SELL', 70, 30),                  # transition d'état
+            cycle('SELL', 70, 60)                   # bougie suivante
+        ]
+
+        if emitted != [True, True, False, False, False, True, True, True]:
+            print(f"❌ Déduplication incorrecte: {emitted}")
+            return False
+
+        print("✅ Déduplication des signaux par bougie")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur déduplication: {e}")
+        return False
+
 def main():
     """Test principal"""
     print("🧪 Tests du Trading Bot Premium")
@@ -117,7 +1053,25 @@ def main():
         ("Importations principales", test_imports),
         ("Modules locaux", test_modules),
         ("Configuration", test_config),
-        ("Base de données", test_database)
+        ("Base de données", test_database),
+        ("Moteur d'indicateurs", test_indicator_engine),
+        ("Extrêmes glissants", test_rolling_extremes),
+        ("Analyse groupée", test_batch_indicators),
+        ("Niveaux de l'analyse groupée", test_batch_levels),
+        ("Flux websocket", test_market_feed),
+        ("Exchange simulé", test_fake_exchange),
+        ("Analyse multi-timeframes", test_timeframes_history),
+        ("Ordonnanceur de requêtes", test_request_scheduler),
+        ("Scan du marché", test_market_scanner),
+        ("Cache OHLCV", test_ohlcv_cache),
+        ("Historique court des bougies", test_candle_store_history),
+        ("Contexte de marché", test_market_context),
+        ("Historique des patterns", test_pattern_history),
+        ("Historique des signaux", test_signal_history),
+        ("Encodage des signaux", test_signal_record),
+        ("Identifiants des signaux", test_signal_ids),
+        ("Évaluation des signaux", test_signal_evaluator),
+        ("Déduplication des signaux", test_signal_dedup)
     ]
 
     results = []
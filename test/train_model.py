@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Entraînement hors ligne du modèle ML utilisé par TradingAnalyzer
+Construit un jeu de données à partir de l'historique Binance et sauvegarde
+une nouvelle version du modèle dans ML_MODEL_DIR
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Ajout du chemin pour les imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.trading.analyzer import TradingAnalyzer
+from src.trading.ml_model import build_training_set, save_model, train_model
+
+DEFAULT_SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'ADA/USDT', 'SOL/USDT', 'MATIC/USDT', 'DOT/USDT']
+
+
+async def collect_dataset(analyzer, symbols, timeframe, candles, horizon, threshold):
+    """Features et étiquettes de tous les symboles, bougie en cours exclue"""
+    features, labels = [], []
+
+    for symbol in symbols:
+        try:
+            ohlcv = await analyzer.candle_store.get_ohlcv(symbol, timeframe, candles + 1)
+            X, y = build_training_set(analyzer, ohlcv[:-1], horizon, threshold)
+            features.append(X)
+            labels.append(y)
+            print(f"✅ {symbol}: {len(y)} échantillons")
+        except Exception as e:
+            print(f"❌ {symbol}: {e}")
+
+    if not features:
+        raise RuntimeError("Aucune donnée d'entraînement")
+
+    return np.concatenate(features), np.concatenate(labels)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Entraînement du modèle ML des signaux")
+    parser.add_argument('--symbols', nargs='+', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--candles', type=int, default=5000, help="Bougies d'historique par symbole")
+    parser.add_argument('--horizon', type=int, default=24, help="Horizon de l'étiquette en bougies")
+    parser.add_argument('--threshold', type=float, default=0.01, help="Variation minimale pour BUY/SELL")
+    parser.add_argument('--model-dir', default=os.getenv('ML_MODEL_DIR', 'data/models'))
+    args = parser.parse_args()
+
+    analyzer = TradingAnalyzer()
+    try:
+        features, labels = await collect_dataset(
+            analyzer, args.symbols, args.timeframe, args.candles, args.horizon, args.threshold
+        )
+    finally:
+        await analyzer.close()
+
+    model, metrics = train_model(features, labels)
+    # Pas de précision sans jeu de validation (historique trop court pour le découpage)
+    if metrics['accuracy'] is None:
+        print("⚠️  Aucun échantillon de validation, précision non mesurée")
+    else:
+        print(f"📊 Précision validation: {metrics['accuracy']:.3f} ({metrics['test_samples']} échantillons)")
+
+    path = save_model(model, {
+        'symbols': args.symbols,
+        'timeframe': args.timeframe,
+        'candles': args.candles,
+        'horizon': args.horizon,
+        'threshold': args.threshold,
+        **metrics
+    }, args.model_dir)
+    print(f"💾 Modèle sauvegardé: {path}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())